@@ -0,0 +1 @@
+# Async entry point (Quart + Motor), see aio/app.py
@@ -0,0 +1,116 @@
+"""
+Async entry point (ASGI)
+Quart app serving the I/O-bound endpoints (sessions, workout sets,
+workouts) on Motor, so one process can hold thousands of requests that
+are waiting on MongoDB or Gemini. Every other path is handed to the
+Flask app (app.py) through a WSGI adapter, which runs it on a thread.
+
+Run from backend/:
+    hypercorn aio.app:asgi_app --bind 0.0.0.0:8080
+    python -m aio.app
+"""
+from quart import Quart, jsonify, g, request
+from quart_cors import cors
+from hypercorn.middleware import AsyncioWSGIMiddleware
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import RequestRedirect
+from config import Config
+from json_provider import FastJSONProvider
+from aio.mongodb import AsyncMongoDB
+from aio.routes import session_bp, workout_set_bp, workout_bp
+from routes.auth_context import authenticate
+from routes.instrumentation import new_request_id
+from app import app as flask_app
+import asyncio
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+app = Quart(__name__)
+app.config.from_object(Config)
+# Same encoder as the Flask app (ObjectId, WIB datetimes, document views)
+app.json = FastJSONProvider(app)
+
+# Same CORS policy as the Flask app
+app = cors(
+    app,
+    allow_origin=re.compile(r'https?://.*'),
+    allow_methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
+    allow_headers=['Accept', 'Authorization', 'Content-Type', 'X-CSRF-Token'],
+    expose_headers=['Link', 'ETag', 'X-Next-Cursor', 'Server-Timing', 'X-Request-ID'],
+    allow_credentials=True,
+    max_age=300
+)
+
+app.register_blueprint(session_bp)
+app.register_blueprint(workout_set_bp)
+app.register_blueprint(workout_bp)
+
+@app.before_serving
+async def connect_database():
+    """Open the Motor pool inside the server's event loop"""
+    try:
+        await AsyncMongoDB.ping()
+        logger.info("✅ Motor connection initialized")
+    except Exception as e:
+        logger.error(f"❌ Failed to connect to MongoDB (async): {e}")
+        logger.error("⚠️  Server will start but database operations will fail")
+
+@app.after_serving
+async def close_database():
+    AsyncMongoDB.close()
+
+@app.before_request
+async def assign_request_id():
+    """Request id for log correlation (see routes.instrumentation)"""
+    g.request_id = new_request_id(request.headers.get('X-Request-ID'))
+
+@app.after_request
+async def echo_request_id(response):
+    response.headers['X-Request-ID'] = g.request_id
+    return response
+
+@app.before_request
+async def load_user_context():
+    """Verify the bearer token once per request (see routes.auth_context)"""
+    g.user_id, g.auth_error = authenticate(request.headers.get('Authorization'))
+
+@app.errorhandler(500)
+async def internal_error(error):
+    logger.error(f"❌ Internal server error: {error}")
+    return jsonify({'error': 'Internal server error'}), 500
+
+# Flask app for every path Quart does not serve (runs on a worker thread);
+# the body limit leaves room for the largest import upload
+flask_fallback = AsyncioWSGIMiddleware(
+    flask_app,
+    max_body_size=(Config.IMPORT_MAX_UPLOAD_MB + 1) * 1024 * 1024
+)
+
+def _is_async_route(scope):
+    """Whether Quart has a rule for the request's path and method"""
+    try:
+        app.url_map.bind('localhost').match(scope['path'], method=scope.get('method', 'GET'))
+        return True
+    except RequestRedirect:
+        # Trailing-slash redirect of one of our rules
+        return True
+    except HTTPException:
+        return False
+
+async def asgi_app(scope, receive, send):
+    """ASGI entry point: Quart routes first, the Flask app for the rest"""
+    if scope['type'] != 'http' or _is_async_route(scope):
+        await app(scope, receive, send)
+    else:
+        await flask_fallback(scope, receive, send)
+
+if __name__ == '__main__':
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config as HypercornConfig
+
+    server_config = HypercornConfig()
+    server_config.bind = [f"0.0.0.0:{Config.PORT}"]
+    logger.info(f"🚀 Starting EverGain Backend (async) on port {Config.PORT}")
+    asyncio.run(serve(asgi_app, server_config))
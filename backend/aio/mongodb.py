@@ -0,0 +1,84 @@
+"""
+Async MongoDB (Motor)
+Process-wide Motor client for the async entry point, with the same pool
+and timeout settings as the sync client in database.mongodb. The client
+is created on first use, inside the server's event loop.
+"""
+from motor.motor_asyncio import AsyncIOMotorClient
+from config import Config
+from database.mongodb import MongoDB
+from database.workout_sets import WORKOUT_SETS_COLLECTION
+from database.personal_records import PERSONAL_RECORDS_COLLECTION
+from database.rollups import ROLLUPS_COLLECTION
+import asyncio
+import functools
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncMongoDB:
+    """Motor client manager (recreated after a fork, like MongoDB)"""
+    client = None
+    db = None
+    _pid = None
+
+    @classmethod
+    def get_db(cls):
+        """Get database instance (no round-trip to the server)"""
+        if cls.db is None or cls._pid != os.getpid():
+            # Command latencies go to the shared metrics (not per request:
+            # Motor runs the driver on its own threads)
+            listeners = [MongoDB.command_metrics] if Config.METRICS_ENABLED else []
+            cls.client = AsyncIOMotorClient(Config.MONGODB_URI, event_listeners=listeners, **MongoDB.client_options())
+            cls.db = cls.client[Config.DB_NAME]
+            cls._pid = os.getpid()
+            logger.info(f"✅ Motor client ready for database: {Config.DB_NAME}")
+        return cls.db
+
+    @classmethod
+    async def ping(cls):
+        """Round-trip to the server (startup check)"""
+        await cls.get_db().client.admin.command('ping')
+
+    @classmethod
+    def close(cls):
+        """Close the Motor client"""
+        if cls.client:
+            cls.client.close()
+            cls.client = None
+            cls.db = None
+            cls._pid = None
+            logger.info("Motor client closed")
+
+
+async def run_sync(fn, *args, **kwargs):
+    """Run a blocking call (sync layer, catalog refresh) on the default thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+# Collection accessors
+def get_workouts_collection():
+    """Get workouts collection"""
+    return AsyncMongoDB.get_db()[Config.WORKOUTS_COLLECTION]
+
+def get_sessions_collection():
+    """Get sessions collection"""
+    return AsyncMongoDB.get_db()[Config.SESSIONS_COLLECTION]
+
+def get_session_types_collection():
+    """Get session types collection"""
+    return AsyncMongoDB.get_db()[Config.SESSION_TYPES_COLLECTION]
+
+def get_workout_sets_collection():
+    """Get workout sets collection (of the active layout)"""
+    return AsyncMongoDB.get_db()[WORKOUT_SETS_COLLECTION]
+
+def get_personal_records_collection():
+    """Get personal records collection"""
+    return AsyncMongoDB.get_db()[PERSONAL_RECORDS_COLLECTION]
+
+def get_rollups_collection():
+    """Get rollups collection"""
+    return AsyncMongoDB.get_db()[ROLLUPS_COLLECTION]
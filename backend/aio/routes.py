@@ -0,0 +1,368 @@
+"""
+Async Routes
+Quart versions of the I/O-bound endpoints (sessions, workout sets,
+workouts). URLs, status codes and response bodies match routes/*; the
+other endpoints are served by the Flask app (see aio.app).
+"""
+from quart import Blueprint, request, jsonify, g
+from config import Config
+from aio.session_service import AsyncSessionService
+from aio.workout_service import AsyncWorkoutService, async_analysis_pipeline
+from aio import workout_sets
+from routes.auth_context import resolve_user_id
+from routes.workout_set_routes import workout_set_from_payload
+from services.session_service import SESSION_FIELDS
+from services.workout_service import PENDING_STATE
+from services.progress_classifier import progress_classifier
+from services.ai_cache import ai_response_cache
+from services.gemini_client import gemini_client
+from database.workout_sets import WORKOUT_SET_FIELDS
+from database.pagination import clamp_page_size, parse_fields
+import logging
+
+logger = logging.getLogger(__name__)
+
+session_bp = Blueprint('aio_session', __name__, url_prefix='/api/sessions')
+workout_set_bp = Blueprint('aio_workout_set', __name__, url_prefix='/api/workout-sets')
+workout_bp = Blueprint('aio_workout', __name__, url_prefix='/api/workouts')
+
+session_service = AsyncSessionService()
+workout_service = AsyncWorkoutService(async_analysis_pipeline)
+
+def current_user_id(fallback=None):
+    """User id of the current request (see routes.auth_context.current_user_id)"""
+    return resolve_user_id(g.get('user_id'), g.get('auth_error'), fallback)
+
+# Sessions
+
+@session_bp.route('/start', methods=['POST'])
+async def start_session():
+    """Start a new workout session"""
+    try:
+        data = await request.get_json()
+
+        if not data or 'session_type' not in data:
+            return jsonify({'error': 'session_type is required'}), 400
+
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(data.get('user_id', 'default_user'))
+
+        session = await session_service.start_session(user_id, data['session_type'])
+
+        return jsonify(session.to_json()), 201
+
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Start session error: {e}")
+        return jsonify({'error': 'Failed to start session'}), 500
+
+@session_bp.route('/end', methods=['POST'])
+async def end_session():
+    """End current active session"""
+    try:
+        data = await request.get_json()
+
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(data.get('user_id', 'default_user') if data else 'default_user')
+
+        session = await session_service.end_session(user_id)
+
+        return jsonify(session.to_json()), 200
+
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"End session error: {e}")
+        return jsonify({'error': 'Failed to end session'}), 500
+
+@session_bp.route('/active', methods=['GET'])
+async def get_active_session():
+    """Get user's active session"""
+    try:
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(request.args.get('user_id', 'default_user'))
+
+        session = await session_service.get_active_session(user_id)
+
+        if not session:
+            return jsonify({'active': False, 'session': None}), 200
+
+        return jsonify({
+            'active': True,
+            'session': session.to_json()
+        }), 200
+
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except Exception as e:
+        logger.error(f"Get active session error: {e}")
+        return jsonify({'error': 'Failed to get active session'}), 500
+
+@session_bp.route('/history', methods=['GET'])
+async def get_session_history():
+    """Get one page of the user's session history (see routes.session_routes)"""
+    try:
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(request.args.get('user_id', 'default_user'))
+        limit = clamp_page_size(
+            request.args.get('limit'),
+            default=20,
+            maximum=Config.SESSION_HISTORY_MAX_PAGE_SIZE
+        )
+        fields = parse_fields(request.args.get('fields'), SESSION_FIELDS)
+
+        sessions, next_cursor = await session_service.get_session_history(
+            user_id,
+            limit=limit,
+            cursor=request.args.get('cursor'),
+            fields=fields
+        )
+
+        response = jsonify(sessions)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+
+        return response, 200
+
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Get session history error: {e}")
+        return jsonify({'error': 'Failed to get session history'}), 500
+
+@session_bp.route('/<session_id>/workout-sets', methods=['GET'])
+async def get_session_workout_sets_route(session_id):
+    """Get workout sets for a specific session (paginated, see /api/workout-sets/session)"""
+    return await session_sets_page_response(session_id)
+
+# Workout sets
+
+@workout_set_bp.route('/log', methods=['POST'])
+async def log_set():
+    """Log a workout set"""
+    try:
+        data = await request.get_json()
+
+        if not data:
+            return jsonify({'error': 'Invalid request payload'}), 400
+
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(data.get('user_id', 'default_user'))
+
+        # Validate and create workout set (set number is assigned when recording)
+        workout_set = workout_set_from_payload(data)
+
+        saved_set = await workout_sets.record_workout_set(workout_set, user_id)
+        if saved_set is None:
+            return jsonify({'error': 'Session not found'}), 404
+
+        response = saved_set.to_json()
+        response['is_pr'] = bool(saved_set.new_records)
+        response['new_records'] = saved_set.new_records
+
+        return jsonify(response), 201
+
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"❌ Error logging set: {e}")
+        return jsonify({'error': 'Failed to log workout set'}), 500
+
+async def session_sets_page_response(session_id):
+    """Paginated set listing shared by both set listing endpoints"""
+    try:
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(request.args.get('user_id', 'default_user'))
+        limit = clamp_page_size(
+            request.args.get('limit'),
+            default=Config.WORKOUT_SETS_DEFAULT_PAGE_SIZE,
+            maximum=Config.WORKOUT_SETS_MAX_PAGE_SIZE
+        )
+        fields = parse_fields(request.args.get('fields'), WORKOUT_SET_FIELDS)
+
+        sets, next_cursor = await workout_sets.get_session_workout_sets_page(
+            session_id,
+            user_id,
+            limit=limit,
+            cursor=request.args.get('cursor'),
+            fields=fields
+        )
+
+        response = jsonify(sets)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response, 200
+
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"❌ Error getting session sets: {e}")
+        return jsonify({'error': 'Failed to get workout sets'}), 500
+
+@workout_set_bp.route('/session/<session_id>', methods=['GET'])
+async def get_session_sets(session_id):
+    """Get workout sets for a session"""
+    return await session_sets_page_response(session_id)
+
+@workout_set_bp.route('/last-set', methods=['GET'])
+async def get_last_set():
+    """Get the last set for a specific exercise in a session"""
+    try:
+        session_id = request.args.get('session_id')
+        exercise_name = request.args.get('exercise_name')
+
+        if not session_id or not exercise_name:
+            return jsonify({'error': 'session_id and exercise_name are required'}), 400
+
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(request.args.get('user_id', 'default_user'))
+
+        last_set = await workout_sets.get_last_set_for_exercise(session_id, user_id, exercise_name)
+
+        if not last_set:
+            return jsonify({'last_set': None}), 200
+
+        return jsonify(last_set), 200
+
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except Exception as e:
+        logger.error(f"❌ Error getting last set: {e}")
+        return jsonify({'error': 'Failed to get last set'}), 500
+
+@workout_set_bp.route('/count', methods=['GET'])
+async def get_set_count():
+    """Get the count of sets for an exercise in a session"""
+    try:
+        session_id = request.args.get('session_id')
+        exercise_name = request.args.get('exercise_name')
+
+        if not session_id or not exercise_name:
+            return jsonify({'error': 'session_id and exercise_name are required'}), 400
+
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(request.args.get('user_id', 'default_user'))
+
+        count = await workout_sets.count_sets_for_exercise(session_id, user_id, exercise_name)
+
+        return jsonify({'count': count}), 200
+
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except Exception as e:
+        logger.error(f"❌ Error counting sets: {e}")
+        return jsonify({'error': 'Failed to count sets'}), 500
+
+# Workouts
+
+@workout_bp.route('/', methods=['POST'])
+async def submit_workout():
+    """Submit new workout session endpoint"""
+    try:
+        data = await request.get_json()
+
+        if not data:
+            return jsonify({'error': 'Invalid input'}), 400
+
+        for field in ['weight', 'reps', 'sets']:
+            if field not in data:
+                return jsonify({'error': f'Missing required field: {field}'}), 400
+
+        user_id = current_user_id()
+
+        # Submit workout (AI analysis runs as a background task)
+        workout = await workout_service.submit_workout(user_id, data)
+
+        response = workout.to_json()
+        response['analysis_url'] = f"/api/workouts/{workout._id}/analysis"
+
+        return jsonify(response), 201
+
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Workout submission error: {e}")
+        return jsonify({'error': f'Processing failed: {str(e)}'}), 500
+
+@workout_bp.route('/', methods=['GET'])
+async def get_history():
+    """Get one page of the user's workout history (see routes.workout_routes)"""
+    try:
+        user_id = current_user_id()
+        limit = clamp_page_size(
+            request.args.get('limit'),
+            default=20,
+            maximum=Config.WORKOUT_HISTORY_MAX_PAGE_SIZE
+        )
+
+        workouts, next_cursor = await workout_service.get_history(
+            user_id,
+            limit=limit,
+            cursor=request.args.get('cursor')
+        )
+
+        response = jsonify(workouts)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+
+        return response, 200
+
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Get history error: {e}")
+        return jsonify({'error': 'Failed to fetch history'}), 500
+
+@workout_bp.route('/<workout_id>/analysis', methods=['GET'])
+async def get_analysis(workout_id):
+    """AI analysis of a workout, optionally long-polling up to ?wait= seconds"""
+    try:
+        user_id = current_user_id()
+        wait = float(request.args.get('wait', 0))
+        wait = max(0.0, min(wait, Config.ANALYSIS_LONG_POLL_MAX_SECONDS))
+
+        if wait:
+            workout = await workout_service.wait_for_analysis(user_id, workout_id, wait)
+        else:
+            workout = await workout_service.get_workout(user_id, workout_id)
+
+        if not workout:
+            return jsonify({'error': 'Workout not found'}), 404
+
+        return jsonify({
+            'status': 'pending' if workout.progress_state == PENDING_STATE else 'complete',
+            'workout': workout.to_json()
+        }), 200
+
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Get analysis error: {e}")
+        return jsonify({'error': 'Failed to fetch analysis'}), 500
+
+@workout_bp.route('/analysis-stats', methods=['GET'])
+async def get_analysis_stats():
+    """AI task pipeline, fast path / LLM split, response cache and Gemini client counters"""
+    return jsonify({
+        'pipeline': async_analysis_pipeline.snapshot(),
+        'classifier': progress_classifier.metrics(),
+        'cache': ai_response_cache.metrics(),
+        'gemini': gemini_client.snapshot()
+    }), 200
@@ -0,0 +1,132 @@
+"""
+Async Session Service
+Motor mirror of the request-path methods of services.session_service.
+"""
+from aio.mongodb import get_rollups_collection, get_sessions_collection, get_session_types_collection, run_sync
+from models.session import Session, WIB
+from database.rollups import increment_requests, session_increments
+from database.pagination import encode_cursor, keyset_filter, page_sort
+from database.views import SessionView
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime, timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AsyncSessionService:
+    """Session management service (async)"""
+
+    async def start_session(self, user_id, session_type):
+        """
+        Start a new workout session
+
+        Returns:
+            Session object
+        """
+        from services.catalog_service import catalog_cache
+
+        # Check if user has an active session
+        if await self.get_active_session(user_id):
+            raise ValueError("User already has an active session. Please end it first.")
+
+        # Verify session type exists (catalog cache first, database if the cache is stale)
+        catalog = await run_sync(catalog_cache.get)
+        if (session_type not in catalog.session_type_names
+                and not await get_session_types_collection().find_one({"name": session_type})):
+            raise ValueError(f"Invalid session type: {session_type}")
+
+        session = Session(
+            user_id=user_id,
+            session_type=session_type
+        )
+
+        # Save to database (a unique partial index rejects a second active session)
+        try:
+            result = await get_sessions_collection().insert_one(session.to_dict())
+        except DuplicateKeyError:
+            raise ValueError("User already has an active session. Please end it first.")
+        session._id = result.inserted_id
+
+        logger.info("✅ Started %s session for user %s", session_type, user_id)
+
+        return session
+
+    async def end_session(self, user_id):
+        """
+        End current active session (one update, then the analytics rollups)
+
+        Returns:
+            Updated Session object
+        """
+        from services.catalog_service import catalog_cache
+
+        # Current WIB time, stored as UTC
+        ended_at = datetime.now(WIB).astimezone(timezone.utc).replace(tzinfo=None)
+
+        session_data = await get_sessions_collection().find_one_and_update(
+            {'user_id': user_id, 'is_active': True},
+            {'$set': {'ended_at': ended_at, 'is_active': False}},
+            return_document=ReturnDocument.AFTER
+        )
+        if not session_data:
+            raise ValueError("No active session found")
+
+        ended_session = Session.from_dict(session_data)
+        try:
+            catalog = await run_sync(catalog_cache.get)
+            increments = session_increments([session_data], catalog.muscle_group_by_exercise)
+            if increments:
+                await get_rollups_collection().bulk_write(increment_requests(increments), ordered=False)
+        except Exception as e:
+            logger.error(f"❌ Error updating rollups for session {session_data.get('_id')}: {e}")
+
+        duration = (ended_session.ended_at - ended_session.started_at).total_seconds() / 60
+        logger.info("✅ Ended session for user %s. Duration: %.1f minutes, Exercises: %s", user_id, duration, len(ended_session.exercises_performed))
+
+        return ended_session
+
+    async def get_active_session(self, user_id):
+        """
+        Get user's active session if exists
+
+        Returns:
+            Session object or None
+        """
+        session_data = await get_sessions_collection().find_one({
+            'user_id': user_id,
+            'is_active': True
+        })
+
+        if not session_data:
+            return None
+
+        return Session.from_dict(session_data)
+
+    async def get_session_history(self, user_id, limit=20, cursor=None, fields=None):
+        """
+        Get one page of a user's session history, newest first
+
+        Returns:
+            (list of SessionView, next cursor or None)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query = {'user_id': user_id}
+        if cursor:
+            query.update(keyset_filter('started_at', cursor))
+
+        # One extra document tells whether there is a next page
+        sessions_data = await (get_sessions_collection().find(query, SessionView.projection(fields))
+                               .sort(page_sort('started_at'))
+                               .limit(limit + 1)
+                               .to_list(length=limit + 1))
+
+        next_cursor = None
+        if len(sessions_data) > limit:
+            sessions_data = sessions_data[:limit]
+            last = sessions_data[-1]
+            next_cursor = encode_cursor(last['started_at'], last['_id'])
+
+        return [SessionView(doc, fields) for doc in sessions_data], next_cursor
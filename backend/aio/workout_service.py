@@ -0,0 +1,268 @@
+"""
+Async Workout Service
+Motor mirror of services.workout_service. Analyses run as asyncio tasks
+instead of on the analysis thread pool: the Gemini call is awaited, so a
+pending analysis holds no thread, only a queue slot (same limits as
+services.analysis_pipeline).
+"""
+from aio.mongodb import get_workouts_collection
+from config import Config
+from models.workout import Workout
+from services.ai_service import AIService
+from services.ai_cache import HISTORY_LIMIT, analysis_history
+from services.workout_service import AI_HISTORY_PROJECTION, PENDING_STATE, is_stale_analysis
+from database.pagination import encode_cursor, keyset_filter, page_sort
+from database.views import WorkoutView
+from bson import ObjectId
+from bson.errors import InvalidId
+from datetime import datetime
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAnalysisPipeline:
+    """Bounded analysis tasks with per-job timeouts and a queue-depth limit"""
+
+    def __init__(self, max_workers=None, queue_depth=None, timeout=None):
+        self.max_workers = max_workers or Config.AI_ANALYSIS_WORKERS
+        self.queue_depth = queue_depth if queue_depth is not None else Config.AI_ANALYSIS_QUEUE_DEPTH
+        self.timeout = timeout or Config.AI_ANALYSIS_TIMEOUT_SECONDS
+        self._jobs = {}
+        self._tasks = set()
+        self._running = None
+        self.stats = {'submitted': 0, 'completed': 0, 'timed_out': 0, 'rejected': 0, 'failed': 0}
+
+    def submit(self, key, analyze, complete, fallback):
+        """
+        Queue an analysis (call from the event loop)
+
+        Args:
+            key: Unique job key (the workout id)
+            analyze: Coroutine function returning an AIResponse
+            complete: Coroutine function receiving the AIResponse; awaited exactly once
+            fallback: Callable returning the AIResponse used on timeout or error
+
+        Returns:
+            False if the queue is full (nothing was queued), True otherwise
+        """
+        if len(self._jobs) >= self.max_workers + self.queue_depth:
+            self.stats['rejected'] += 1
+            logger.warning(f"⚠️ Analysis queue full, skipping AI for {key}")
+            return False
+
+        done = asyncio.Event()
+        self._jobs[key] = done
+        self.stats['submitted'] += 1
+
+        task = asyncio.get_running_loop().create_task(self._run(key, done, analyze, complete, fallback))
+        # The loop only keeps weak references to tasks
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _run(self, key, done, analyze, complete, fallback):
+        """Task body: the deadline covers the wait for a free slot too"""
+        if self._running is None:
+            self._running = asyncio.Semaphore(self.max_workers)
+        try:
+            try:
+                result = await asyncio.wait_for(self._when_free(analyze), self.timeout)
+                self.stats['completed'] += 1
+            except asyncio.TimeoutError:
+                self.stats['timed_out'] += 1
+                logger.warning(f"⚠️ Analysis timed out after {self.timeout}s for {key}")
+                result = fallback()
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.error(f"❌ Analysis failed for {key}: {e}")
+                result = fallback()
+            try:
+                await complete(result)
+            except Exception as e:
+                logger.error(f"❌ Failed to store analysis for {key}: {e}")
+        finally:
+            self._jobs.pop(key, None)
+            done.set()
+
+    async def _when_free(self, analyze):
+        """Run analyze once a slot is free (at most max_workers talk to Gemini at once)"""
+        async with self._running:
+            return await analyze()
+
+    async def wait(self, key, timeout):
+        """
+        Wait for a job queued in this process
+
+        Returns:
+            True if the job is finished or unknown here, False on timeout
+        """
+        done = self._jobs.get(key)
+        if done is None:
+            return True
+        try:
+            await asyncio.wait_for(done.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def is_local(self, key):
+        """Whether the job is queued or running in this process"""
+        return key in self._jobs
+
+    def snapshot(self):
+        """Pipeline statistics"""
+        return dict(self.stats, in_flight=len(self._jobs), max_workers=self.max_workers, queue_depth=self.queue_depth)
+
+
+class AsyncWorkoutService:
+    """Workout management service (async)"""
+
+    def __init__(self, pipeline):
+        self.ai_service = AIService()
+        self.pipeline = pipeline
+
+    async def submit_workout(self, user_id, workout_data):
+        """
+        Submit a new workout session (analysis pending, see
+        WorkoutService.submit_workout)
+
+        Returns:
+            Workout object (analysis pending)
+        """
+        workout = Workout(
+            weight=workout_data.get('weight'),
+            reps=workout_data.get('reps'),
+            sets=workout_data.get('sets'),
+            feeling=workout_data.get('feeling', ''),
+            progress_state=PENDING_STATE,
+            user_id=user_id
+        )
+
+        result = await get_workouts_collection().insert_one(workout.to_dict())
+        workout._id = result.inserted_id
+
+        logger.info("Workout submitted: %skg x %s x %s", workout.weight, workout.reps, workout.sets)
+
+        queued = self.pipeline.submit(
+            str(workout._id),
+            analyze=lambda: self._analyze(workout),
+            complete=lambda ai_response: self._store_analysis(workout._id, ai_response),
+            fallback=self.ai_service._fallback_response
+        )
+        if not queued:
+            # Pipeline saturated: record the fallback now instead of waiting
+            ai_response = self.ai_service._fallback_response()
+            await self._store_analysis(workout._id, ai_response)
+            workout.advice = ai_response.advice
+            workout.color = ai_response.color
+            workout.progress_state = ai_response.status
+
+        return workout
+
+    async def _analyze(self, workout):
+        """Run the AI analysis for a workout (as a pipeline task)"""
+        recent = await self.get_recent_workouts(workout.user_id, limit=2 * HISTORY_LIMIT, before=workout.created_at)
+        history = analysis_history(workout, recent)
+        return await self.ai_service.analyze_workout_async(workout, history)
+
+    async def _store_analysis(self, workout_id, ai_response):
+        """Write the analysis back, unless another writer already did"""
+        await get_workouts_collection().update_one(
+            {'_id': workout_id, 'progress_state': PENDING_STATE},
+            {'$set': {
+                'advice': ai_response.advice,
+                'color': ai_response.color,
+                'progress_state': ai_response.status
+            }}
+        )
+
+    async def get_workout(self, user_id, workout_id):
+        """
+        Get a single workout owned by the user
+
+        Returns:
+            Workout object or None
+
+        Raises:
+            ValueError: If the id is malformed
+        """
+        try:
+            oid = ObjectId(workout_id)
+        except (InvalidId, TypeError):
+            raise ValueError(f"Invalid workout id: {workout_id}")
+
+        return Workout.from_dict(await get_workouts_collection().find_one({'_id': oid, 'user_id': user_id}))
+
+    async def wait_for_analysis(self, user_id, workout_id, timeout):
+        """
+        Long-poll for a workout's analysis (see WorkoutService.wait_for_analysis)
+
+        Returns:
+            Workout object (possibly still pending) or None if not found
+        """
+        deadline = time.monotonic() + timeout
+        workout = await self.get_workout(user_id, workout_id)
+
+        while workout and workout.progress_state == PENDING_STATE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if self.pipeline.is_local(workout_id):
+                await self.pipeline.wait(workout_id, remaining)
+            elif is_stale_analysis(workout):
+                await self._store_analysis(workout._id, self.ai_service._fallback_response())
+            else:
+                await asyncio.sleep(min(0.5, remaining))
+            workout = await self.get_workout(user_id, workout_id)
+
+        return workout
+
+    async def get_recent_workouts(self, user_id, limit=5, before=None):
+        """
+        Get a user's most recent workouts for the AI prompt
+
+        Returns:
+            List of Workout objects (prompt fields only), newest first
+        """
+        query = {'user_id': user_id}
+        if isinstance(before, datetime):
+            query['created_at'] = {'$lt': before}
+        workouts_data = await (get_workouts_collection().find(query, AI_HISTORY_PROJECTION)
+                               .sort(page_sort('created_at'))
+                               .limit(limit)
+                               .to_list(length=limit))
+        return [Workout.from_dict(data) for data in workouts_data]
+
+    async def get_history(self, user_id, limit=20, cursor=None):
+        """
+        Get one page of a user's workout history
+
+        Returns:
+            (list of WorkoutView, next cursor or None)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query = {'user_id': user_id}
+        if cursor:
+            query.update(keyset_filter('created_at', cursor))
+
+        # Fetch one extra document to know whether there is a next page
+        workouts_data = await (get_workouts_collection().find(query, WorkoutView.projection())
+                               .sort(page_sort('created_at'))
+                               .limit(limit + 1)
+                               .to_list(length=limit + 1))
+
+        next_cursor = None
+        if len(workouts_data) > limit:
+            workouts_data = workouts_data[:limit]
+            last = workouts_data[-1]
+            next_cursor = encode_cursor(last['created_at'], last['_id'])
+
+        return [WorkoutView(doc) for doc in workouts_data], next_cursor
+
+
+async_analysis_pipeline = AsyncAnalysisPipeline()
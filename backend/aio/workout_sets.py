@@ -0,0 +1,188 @@
+"""
+Async Workout Sets Operations
+Motor mirror of the request-path functions of database.workout_sets. The
+queries and updates are built by the same helpers, so both entry points
+read and write identical documents.
+"""
+from aio.mongodb import (
+    get_personal_records_collection, get_rollups_collection,
+    get_sessions_collection, get_workout_sets_collection, run_sync
+)
+from models.workout_set import WorkoutSet
+from database.workout_sets import (
+    from_storage, record_groups, release_operation,
+    reserve_operations, reserved_set_number, session_object_id, set_document,
+    storage_filter, storage_projection
+)
+from database.personal_records import RECORD_BEST_PROJECTION, new_records, record_update
+from database.rollups import increment_requests, set_increments
+from database.pagination import encode_cursor, keyset_filter, page_sort
+from database.views import WorkoutSetView
+from pymongo import ReturnDocument
+import logging
+
+logger = logging.getLogger(__name__)
+
+async def _reserve_sets(session_oid, user_id: str, exercise_name: str, workout_sets: list):
+    """
+    Reserve set numbers for sets of one exercise (see reserve_operations)
+
+    Returns:
+        (first reserved set number, session user_id), or None if the
+        session does not exist or belongs to another user
+    """
+    sessions_collection = get_sessions_collection()
+    operations = reserve_operations(session_oid, user_id, exercise_name, workout_sets)
+
+    for _ in range(2):
+        for query, update, options in operations:
+            session = await sessions_collection.find_one_and_update(query, update, **options)
+            if session is not None:
+                return reserved_set_number(session, len(workout_sets))
+
+    return None
+
+async def _update_records(workout_sets: list):
+    """Fold written sets into personal records and flag beaten records (never raises)"""
+    collection = get_personal_records_collection()
+
+    for (user_id, exercise_name), group in record_groups(workout_sets).items():
+        try:
+            before = await collection.find_one_and_update(
+                {'user_id': user_id, 'exercise_name': exercise_name},
+                record_update(group),
+                projection=RECORD_BEST_PROJECTION,
+                upsert=True,
+                return_document=ReturnDocument.BEFORE
+            )
+            best = before or {}
+            for workout_set in group:
+                workout_set.new_records = new_records(workout_set, best)
+        except Exception as e:
+            logger.error(f"❌ Error updating personal records for {exercise_name}: {e}")
+
+async def _record_set_rollups(workout_sets: list):
+    """Add logged sets to their analytics buckets (never raises)"""
+    from services.catalog_service import catalog_cache
+
+    try:
+        # The catalog refresh may query MongoDB, keep it off the event loop
+        catalog = await run_sync(catalog_cache.get)
+        increments = set_increments(workout_sets, catalog.muscle_group_by_exercise)
+        if increments:
+            await get_rollups_collection().bulk_write(increment_requests(increments), ordered=False)
+    except Exception as e:
+        logger.error(f"❌ Error updating rollups for logged sets: {e}")
+
+async def record_workout_set(workout_set: WorkoutSet, user_id: str) -> WorkoutSet:
+    """
+    Log a workout set and update its session (see
+    database.workout_sets.record_workout_set)
+
+    Returns:
+        The saved set, or None if the session does not exist or belongs
+        to another user
+
+    Raises:
+        ValueError: If the session id is malformed
+    """
+    session_oid = session_object_id(workout_set.session_id)
+
+    try:
+        reserved = await _reserve_sets(session_oid, user_id, workout_set.exercise_name, [workout_set])
+        if reserved is None:
+            return None
+
+        workout_set.set_number, workout_set.user_id = reserved
+
+        try:
+            result = await get_workout_sets_collection().insert_one(set_document(workout_set))
+        except Exception:
+            query, update, options = release_operation(session_oid, workout_set.exercise_name, [workout_set])
+            await get_sessions_collection().update_one(query, update, **options)
+            raise
+        workout_set._id = result.inserted_id
+
+        await _update_records([workout_set])
+        await _record_set_rollups([workout_set])
+
+        logger.debug("✅ Logged workout set #%s: %s - %skg x %s", workout_set.set_number, workout_set.exercise_name, workout_set.weight, workout_set.reps)
+
+        return workout_set
+
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error recording workout set: {e}")
+        raise e
+
+async def get_session_workout_sets_page(session_id: str, user_id: str, limit: int, cursor: str = None, fields=None):
+    """
+    Get one page of a session's workout sets, oldest first
+
+    Returns:
+        (list of WorkoutSetView, next cursor or None)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        query = storage_filter({'session_id': session_id, 'user_id': user_id})
+        if cursor:
+            query.update(keyset_filter('timestamp', cursor, descending=False))
+
+        projection = storage_projection(WorkoutSetView.projection(fields))
+
+        # One extra document tells whether there is a next page
+        docs = await (get_workout_sets_collection().find(query, projection)
+                      .sort(page_sort('timestamp', descending=False))
+                      .limit(limit + 1)
+                      .to_list(length=limit + 1))
+
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_cursor(docs[-1]['timestamp'], docs[-1]['_id'])
+
+        return [WorkoutSetView(doc, fields) for doc in docs], next_cursor
+
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error getting session workout sets page: {e}")
+        raise e
+
+async def get_last_set_for_exercise(session_id: str, user_id: str, exercise_name: str) -> dict:
+    """
+    Get the last logged set for a specific exercise in one of the user's sessions
+    """
+    try:
+        last_set = await get_workout_sets_collection().find_one(
+            storage_filter({
+                'session_id': session_id,
+                'user_id': user_id,
+                'exercise_name': exercise_name
+            }),
+            sort=[('timestamp', -1)]
+        )
+
+        return from_storage(last_set)
+
+    except Exception as e:
+        logger.error(f"❌ Error getting last set for exercise: {e}")
+        raise e
+
+async def count_sets_for_exercise(session_id: str, user_id: str, exercise_name: str) -> int:
+    """
+    Count the number of sets logged for an exercise in one of the user's sessions
+    """
+    try:
+        return await get_workout_sets_collection().count_documents(storage_filter({
+            'session_id': session_id,
+            'user_id': user_id,
+            'exercise_name': exercise_name
+        }))
+
+    except Exception as e:
+        logger.error(f"❌ Error counting sets for exercise: {e}")
+        raise e
@@ -2,19 +2,34 @@ from flask import Flask, jsonify
 from flask_cors import CORS
 from config import Config
 from database import MongoDB
-from routes import auth_bp, workout_bp, exercise_bp, session_bp, workout_set_bp
+from database.indexes import ensure_indexes
+from services.catalog_service import catalog_cache
+from services.password_hasher import password_hasher
+from services.workout_service import WorkoutService
+from json_provider import FastJSONProvider
+from routes.auth_context import load_user_context
+from routes.instrumentation import (
+    assign_request_id,
+    echo_request_id,
+    begin_request,
+    end_request,
+    release_profiler,
+    metrics_bp
+)
+from logging_config import configure_logging
+from routes import auth_bp, workout_bp, exercise_bp, session_bp, workout_set_bp, record_bp, analytics_bp, export_bp, import_bp
+import atexit
 import logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging (JSON lines written by a background thread)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Create Flask app
 app = Flask(__name__)
 app.config.from_object(Config)
+# orjson (or stdlib) encoder that renders ObjectId and WIB datetimes
+app.json = FastJSONProvider(app)
 
 # Enable CORS for React Native frontend
 CORS(app, resources={
@@ -22,7 +37,7 @@ CORS(app, resources={
         "origins": ["https://*", "http://*"],
         "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
         "allow_headers": ["Accept", "Authorization", "Content-Type", "X-CSRF-Token"],
-        "expose_headers": ["Link"],
+        "expose_headers": ["Link", "ETag", "X-Next-Cursor", "Server-Timing", "X-Request-ID"],
         "supports_credentials": True,
         "max_age": 300
     }
@@ -32,16 +47,43 @@ CORS(app, resources={
 try:
     MongoDB.connect()
     logger.info("✅ MongoDB connection initialized")
+    if Config.AUTO_CREATE_INDEXES:
+        ensure_indexes()
+    # Warm the catalog cache so the first catalog request is served from memory
+    catalog_cache.get()
+    # Analyses left pending by a process that stopped get the fallback answer
+    WorkoutService().recover_stale_analyses()
 except Exception as e:
     logger.error(f"❌ Failed to connect to MongoDB: {e}")
     logger.error("⚠️  Server will start but database operations will fail")
 
+# Pick the bcrypt cost before workers fork (configured or calibrated)
+password_hasher.calibrate()
+
+# Request id for log correlation (X-Request-ID)
+app.before_request(assign_request_id)
+app.after_request(echo_request_id)
+
+# Latency, MongoDB commands and phases per request (GET /metrics, Server-Timing)
+if Config.METRICS_ENABLED:
+    app.before_request(begin_request)
+    app.after_request(end_request)
+    app.teardown_request(release_profiler)
+    app.register_blueprint(metrics_bp)
+
+# Verify the bearer token once per request (g.user_id for every blueprint)
+app.before_request(load_user_context)
+
 # Register blueprints (routes)
 app.register_blueprint(auth_bp)
 app.register_blueprint(workout_bp)
 app.register_blueprint(exercise_bp)
 app.register_blueprint(session_bp)
 app.register_blueprint(workout_set_bp)
+app.register_blueprint(record_bp)
+app.register_blueprint(analytics_bp)
+app.register_blueprint(export_bp)
+app.register_blueprint(import_bp)
 
 # Health check endpoint
 @app.route('/', methods=['GET'])
@@ -54,6 +96,13 @@ def health_check():
         'tech_stack': 'Flask + MongoDB'
     }), 200
 
+@app.route('/health/db', methods=['GET'])
+def database_health():
+    """MongoDB connection pool statistics (no extra round-trip)"""
+    stats = MongoDB.pool_stats()
+    status_code = 503 if stats['healthy'] is False else 200
+    return jsonify(stats), status_code
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
@@ -66,11 +115,8 @@ def internal_error(error):
     logger.error(f"Traceback:\n{traceback.format_exc()}")
     return jsonify({'error': 'Internal server error'}), 500
 
-# Cleanup on shutdown
-@app.teardown_appcontext
-def shutdown_session(exception=None):
-    """Close MongoDB connection on app shutdown"""
-    MongoDB.close()
+# Cleanup on shutdown (the client is shared by every request in this process)
+atexit.register(MongoDB.close)
 
 if __name__ == '__main__':
     logger.info(f"🚀 Starting EverGain Backend on port {Config.PORT}")
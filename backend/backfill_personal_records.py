@@ -0,0 +1,97 @@
+"""
+Backfill the personal_records collection from existing workout sets
+Usage:
+    python backfill_personal_records.py               # resume (or start)
+    python backfill_personal_records.py --restart     # start from the first set
+
+Sets are read in _id order in batches; after each batch the last _id is
+checkpointed, so an interrupted run continues where it stopped. Records are
+updated with $max, so re-processing a batch is harmless. Sets logged before
+sets stored user_id are stamped with their session's owner, so the
+per-user set queries find them.
+"""
+from database import MongoDB, get_sessions_collection
+from database.workout_sets import get_workout_sets_collection, storage_filter, storage_projection, set_field, from_storage
+from database.personal_records import bulk_update_personal_records
+from database.checkpoints import get_checkpoint, save_checkpoint, clear_checkpoint
+from models.workout_set import WorkoutSet
+from bson import ObjectId
+from bson.errors import InvalidId
+import argparse
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+JOB_NAME = 'backfill_personal_records'
+
+SET_PROJECTION = {
+    'session_id': 1, 'exercise_name': 1, 'weight': 1, 'reps': 1,
+    'set_number': 1, 'timestamp': 1, 'user_id': 1
+}
+
+def _session_owners(session_ids):
+    """Map session id -> user_id for sets logged before sets stored user_id"""
+    oids = []
+    for session_id in session_ids:
+        try:
+            oids.append(ObjectId(session_id))
+        except (InvalidId, TypeError):
+            continue
+    sessions = get_sessions_collection().find({'_id': {'$in': oids}}, {'user_id': 1})
+    return {str(session['_id']): session.get('user_id') for session in sessions}
+
+def backfill(batch_size):
+    """Process all sets after the checkpoint"""
+    sets_collection = get_workout_sets_collection()
+    checkpoint = get_checkpoint(JOB_NAME)
+    last_id = checkpoint.get('last_id')
+    processed = checkpoint.get('processed', 0)
+
+    if last_id:
+        logger.info(f"⏩ Resuming after set {last_id} ({processed} sets already processed)")
+
+    while True:
+        query = {'_id': {'$gt': last_id}} if last_id else {}
+        docs = list(sets_collection.find(query, storage_projection(SET_PROJECTION)).sort('_id', 1).limit(batch_size))
+        docs = [from_storage(doc) for doc in docs]
+        if not docs:
+            break
+
+        owners = _session_owners({doc['session_id'] for doc in docs if not doc.get('user_id')})
+        for session_id, user_id in owners.items():
+            if user_id:
+                sets_collection.update_many(
+                    storage_filter({'session_id': session_id, 'user_id': None}),
+                    {'$set': {set_field('user_id'): user_id}}
+                )
+
+        groups = {}
+        for doc in docs:
+            user_id = doc.get('user_id') or owners.get(doc['session_id'])
+            if not user_id:
+                continue
+            groups.setdefault((user_id, doc['exercise_name']), []).append(WorkoutSet.from_dict(doc))
+
+        bulk_update_personal_records(groups)
+
+        last_id = docs[-1]['_id']
+        processed += len(docs)
+        save_checkpoint(JOB_NAME, last_id=last_id, processed=processed)
+        logger.info(f"✅ Processed {processed} sets ({len(groups)} records updated in this batch)")
+
+    logger.info(f"🏁 Backfill complete: {processed} sets processed")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Backfill EverGain personal records')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--restart', action='store_true', help='ignore the saved checkpoint')
+    args = parser.parse_args()
+
+    MongoDB.connect()
+    try:
+        if args.restart:
+            clear_checkpoint(JOB_NAME)
+        backfill(args.batch_size)
+    finally:
+        MongoDB.close()
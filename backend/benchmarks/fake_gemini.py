@@ -0,0 +1,113 @@
+"""
+Benchmark: fake Gemini server
+Usage (from backend/):
+    python -m benchmarks.fake_gemini --port 8090 --latency-ms 300 --jitter-ms 100
+    python -m benchmarks.fake_gemini --slow-fraction 0.05 --slow-ms 6000 --error-rate 0.1
+
+Answers generateContent over REST (POST /v1beta/models/<model>:generateContent)
+with a workout analysis, after a configurable latency; a fraction of the
+requests is slow (tail latency) and another fraction fails with 503. Point
+the backend at it with:
+    GEMINI_API_ENDPOINT=http://localhost:8090 GEMINI_API_KEY=fake python app.py
+then watch the "gemini" block of GET /api/workouts/analysis-stats while a
+load test runs (set AI_CLASSIFIER_CONFIDENCE_THRESHOLD=2 and
+AI_CACHE_TTL_SECONDS=0 so every workout reaches Gemini).
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import random
+import threading
+import time
+
+ANSWERS = (
+    {'status': 'progress_up', 'advice': 'Solid overload. Keep the same form next week.', 'color': '#C6FF5E', 'risk': 'Safe'},
+    {'status': 'stagnant', 'advice': 'Same numbers as last time. Add one rep per set.', 'color': '#00D1FF', 'risk': 'Safe'},
+    {'status': 'unsafe', 'advice': 'Too big a jump. Drop the weight and own the reps.', 'color': '#FF5E5E', 'risk': 'High Risk'},
+)
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    """generateContent with the server's latency / error settings"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.rfile.read(length)
+        options = self.server.options
+
+        if not self.path.split('?')[0].endswith(':generateContent'):
+            return self._reply(404, {'error': {'code': 404, 'message': 'Not found', 'status': 'NOT_FOUND'}})
+
+        slow = random.random() < options.slow_fraction
+        delay = options.slow_ms if slow else max(0.0, random.gauss(options.latency_ms, options.jitter_ms))
+        time.sleep(delay / 1000)
+
+        with self.server.lock:
+            self.server.served += 1
+            self.server.slow += slow
+        if random.random() < options.error_rate:
+            with self.server.lock:
+                self.server.failed += 1
+            return self._reply(503, {'error': {'code': 503, 'message': 'The model is overloaded.', 'status': 'UNAVAILABLE'}})
+
+        self._reply(200, {
+            'candidates': [{
+                'content': {'parts': [{'text': json.dumps(random.choice(ANSWERS))}], 'role': 'model'},
+                'finishReason': 'STOP',
+                'index': 0
+            }]
+        })
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on this request (timeout or lost hedge)
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        if self.server.options.verbose:
+            super().log_message(format, *args)
+
+
+def serve(options):
+    """Run the fake server until interrupted"""
+    server = ThreadingHTTPServer(('127.0.0.1', options.port), FakeGeminiHandler)
+    server.daemon_threads = True
+    server.options = options
+    server.lock = threading.Lock()
+    server.served = server.slow = server.failed = 0
+
+    print(f"🤖 Fake Gemini on http://127.0.0.1:{options.port} "
+          f"(latency {options.latency_ms:.0f}±{options.jitter_ms:.0f}ms, "
+          f"{options.slow_fraction:.0%} slow at {options.slow_ms:.0f}ms, {options.error_rate:.0%} errors)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"📊 Served {server.served} requests ({server.slow} slow, {server.failed} failed)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake Gemini generateContent server')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency-ms', type=float, default=300, help='Mean latency')
+    parser.add_argument('--jitter-ms', type=float, default=100, help='Latency standard deviation')
+    parser.add_argument('--slow-fraction', type=float, default=0.0, help='Fraction of requests that are slow')
+    parser.add_argument('--slow-ms', type=float, default=5000, help='Latency of slow requests')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    serve(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
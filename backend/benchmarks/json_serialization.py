@@ -0,0 +1,131 @@
+"""
+Benchmark: rendering a session history page
+Usage (from backend/, no database needed):
+    python -m benchmarks.json_serialization --sessions 500 --iterations 200
+    python -m benchmarks.json_serialization --json results.json
+
+Renders the same synthetic session documents the way GET
+/api/sessions/history used to (Session.from_dict -> to_json -> Flask's
+default provider) and the way it does now (SessionView ->
+FastJSONProvider), with orjson and with the stdlib fallback. Reports
+latency and the peak memory allocated while rendering one page.
+"""
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from models.session import Session
+from database.views import SessionView
+import json_provider
+from bson import ObjectId
+from datetime import datetime, timedelta
+import argparse
+import json
+import random
+import statistics
+import time
+import tracemalloc
+
+EXERCISES = ['Bench Press', 'Incline Dumbbell Press', 'Overhead Press', 'Lateral Raise', 'Tricep Pushdown', 'Pull Up']
+
+def synthetic_sessions(count, seed=42):
+    """Ended session documents as stored (5 exercises each)"""
+    rng = random.Random(seed)
+    moment = datetime(2025, 1, 1, 10, 0, 0, 123000)
+    docs = []
+    for _ in range(count):
+        moment += timedelta(hours=rng.randrange(20, 60))
+        exercises = [
+            {
+                'exercise': name,
+                'sets': 4,
+                'total_reps': rng.randrange(20, 48),
+                'total_volume': float(rng.randrange(500, 3000)),
+                'max_weight': float(rng.randrange(20, 100)),
+                'best_e1rm': round(rng.uniform(30, 120), 2)
+            }
+            for name in rng.sample(EXERCISES, 5)
+        ]
+        docs.append({
+            '_id': ObjectId(),
+            'user_id': 'bench_user',
+            'session_type': 'Push',
+            'started_at': moment,
+            'ended_at': moment + timedelta(minutes=rng.randrange(40, 90)),
+            'total_sets': 20,
+            'total_volume': sum(e['total_volume'] for e in exercises),
+            'exercises_performed': exercises,
+            'is_active': False
+        })
+    return docs
+
+def measure(fn, iterations):
+    """p50/p95 latency in milliseconds"""
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'p50_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(samples[int(len(samples) * 0.95) - 1], 3),
+        'peak_kib': round(peak / 1024, 1)
+    }
+
+def run(args):
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    docs = synthetic_sessions(args.sessions)
+    stdlib_encoder = json.JSONEncoder(default=json_provider._default, separators=(',', ':'), ensure_ascii=False)
+
+    def legacy():
+        # Flask's default provider sorts keys and renders datetimes as HTTP dates,
+        # which to_json has already turned into strings
+        body = default_provider.dumps([Session.from_dict(doc).to_json() for doc in docs])
+        return body.encode('utf-8')
+
+    def fast():
+        return json_provider.dumps([SessionView(doc) for doc in docs])
+
+    def fast_stdlib():
+        return stdlib_encoder.encode([SessionView(doc) for doc in docs]).encode('utf-8')
+
+    # Same payload either way
+    assert json.loads(legacy()) == json.loads(fast()) == json.loads(fast_stdlib())
+
+    results = {
+        'sessions': args.sessions,
+        'bytes': len(fast()),
+        'backend': json_provider.BACKEND,
+        'renderers': {
+            'to_json + default provider': measure(legacy, args.iterations),
+            f'SessionView + {json_provider.BACKEND}': measure(fast, args.iterations),
+            'SessionView + stdlib fallback': measure(fast_stdlib, args.iterations)
+        }
+    }
+    baseline = results['renderers']['to_json + default provider']['p50_ms']
+    for stats in results['renderers'].values():
+        stats['speedup'] = round(baseline / stats['p50_ms'], 2)
+    return results
+
+def print_table(results):
+    print(f"\n{results['sessions']} sessions, {results['bytes'] / 1024:.0f} KiB per page")
+    print(f"{'':36}{'p50_ms':>10}{'p95_ms':>10}{'peak_kib':>10}{'speedup':>10}")
+    for name, stats in results['renderers'].items():
+        print(f"{name:36}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['peak_kib']:>10}{stats['speedup']:>9}x")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare session history renderers')
+    parser.add_argument('--sessions', type=int, default=500)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    results = run(args)
+    print_table(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,411 @@
+"""
+Benchmark: load test of the whole Flask app, in-process
+Usage (from backend/):
+    python -m benchmarks.load_test                     # mongomock, no database needed
+    python -m benchmarks.load_test --users 2000 --flows 300 --concurrency 8
+    python -m benchmarks.load_test --mongod mongodb://localhost:27017 --db evergain_bench
+    python -m benchmarks.load_test --json after.json --compare before.json
+
+Seeds the catalog, users and their past sessions with sets, then replays
+workout-session flows through Flask's test client from several threads:
+login -> active session -> start -> log sets (with a last-set lookup per
+exercise) -> end -> history -> set page. Reports throughput, p50/p95/p99
+per endpoint and MongoDB round-trips per request.
+
+The default backend is mongomock (pip install mongomock), which has no
+indexes: use it to compare app-side changes between runs, and a local
+mongod (its scratch database is dropped first) for absolute numbers.
+bcrypt runs at --bcrypt-rounds (4 by default) so logins do not dominate.
+"""
+from config import Config
+from pymongo import monitoring
+from bson import ObjectId
+from datetime import datetime, timedelta
+import argparse
+import functools
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PASSWORD = 'benchmark123'
+SESSION_TYPES = ['Push', 'Pull', 'Legs']
+EXERCISES_PER_SESSION = 4
+
+# mongomock calls that stand for one round-trip to the server
+MONGOMOCK_OPERATIONS = (
+    'find', 'find_one', 'find_one_and_update', 'find_one_and_replace', 'find_one_and_delete',
+    'insert_one', 'insert_many', 'update_one', 'update_many', 'replace_one',
+    'delete_one', 'delete_many', 'count_documents', 'estimated_document_count',
+    'aggregate', 'bulk_write', 'distinct'
+)
+
+
+class RoundTrips(monitoring.CommandListener):
+    """MongoDB commands sent by the current thread (getMore included)"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def reset(self):
+        self._local.count = 0
+
+    def count(self):
+        return getattr(self._local, 'count', 0)
+
+    def add(self):
+        self._local.count = self.count() + 1
+
+    def started(self, event):
+        self.add()
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def _counted(method, round_trips):
+    """Count an outermost mongomock call (find_one calls find, bulk_write calls update_one...)"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        local = round_trips._local
+        if getattr(local, 'depth', 0):
+            return method(self, *args, **kwargs)
+        round_trips.add()
+        local.depth = 1
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            local.depth = 0
+    return wrapper
+
+def _positional(method):
+    """
+    mongomock has no arrayFilters: rewrite ``$[name]`` to the positional
+    ``$`` and match the element in the filter instead (same result for the
+    single-array, single-filter updates this app issues)
+    """
+    @functools.wraps(method)
+    def wrapper(self, filter, update, *args, array_filters=None, **kwargs):
+        if array_filters:
+            ((path, value),) = array_filters[0].items()
+            name, field = path.split('.', 1)
+            marker = f'.$[{name}].'
+            rewritten = {}
+            for operator, fields in update.items():
+                rewritten[operator] = {}
+                for key, item in fields.items():
+                    if marker in key:
+                        array = key.split(marker, 1)[0]
+                        filter = dict(filter, **{f'{array}.{field}': value})
+                        key = key.replace(marker, '.$.')
+                    rewritten[operator][key] = item
+            update = rewritten
+        return method(self, filter, update, *args, **kwargs)
+    return wrapper
+
+def install_mongomock(round_trips):
+    """Put an in-memory mongomock client behind database.MongoDB"""
+    try:
+        import mongomock
+    except ImportError:
+        raise SystemExit("mongomock is not installed (pip install mongomock), or use --mongod")
+    from database import MongoDB
+
+    collection = mongomock.collection.Collection
+    for name in ('update_one', 'find_one_and_update'):
+        setattr(collection, name, _positional(getattr(collection, name)))
+    for name in MONGOMOCK_OPERATIONS:
+        setattr(collection, name, _counted(getattr(collection, name), round_trips))
+
+    # mongomock ignores partial index filters, so the unique indexes would
+    # reject a user's second session; it does not use indexes anyway
+    Config.AUTO_CREATE_INDEXES = False
+    MongoDB.client = mongomock.MongoClient()
+    MongoDB.db = MongoDB.client[Config.DB_NAME]
+    MongoDB._pid = os.getpid()
+    return MongoDB.db
+
+def connect_mongod(uri, round_trips):
+    """Connect database.MongoDB to a scratch database on a real server (dropped first)"""
+    from database import MongoDB
+
+    # Listeners registered before the client is created apply to it
+    monitoring.register(round_trips)
+    Config.MONGODB_URI = uri
+    db = MongoDB.connect()
+    MongoDB.client.drop_database(Config.DB_NAME)
+    return db
+
+def seed(db, users, sessions_per_user, sets_per_exercise, password_hash, seed=42):
+    """
+    Catalog, users and their ended sessions (4 exercises each) with sets,
+    spread over the last year
+
+    Returns:
+        {session type: exercise names}, counts of seeded documents
+    """
+    from seed_exercises import EXERCISES, SESSION_TYPES as CATALOG_SESSION_TYPES
+    from models.user import User
+    from models.session import Session
+    from models.workout_set import WorkoutSet
+    from database.workout_sets import WORKOUT_SETS_COLLECTION, exercise_summary, set_document
+    from models.strength import estimated_1rm
+
+    db[Config.EXERCISES_COLLECTION].insert_many([dict(exercise) for exercise in EXERCISES])
+    db[Config.SESSION_TYPES_COLLECTION].insert_many([dict(session_type) for session_type in CATALOG_SESSION_TYPES])
+    exercises_by_type = {
+        session_type: [exercise['name'] for exercise in EXERCISES if session_type in exercise['sessions']]
+        for session_type in SESSION_TYPES
+    }
+
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    user_docs, session_docs, set_docs = [], [], []
+    for index in range(users):
+        user = User(email=f"bench{index}@example.com", password_hash=password_hash, full_name=f"Bench User {index}")
+        user._id = ObjectId()
+        user_docs.append(dict(user.to_dict(), _id=user._id))
+        user_id = str(user._id)
+
+        for _ in range(sessions_per_user):
+            session_type = rng.choice(SESSION_TYPES)
+            started_at = now - timedelta(minutes=rng.randrange(2 * 24 * 60, 365 * 24 * 60))
+            session_id = ObjectId()
+            moment = started_at
+            summaries = []
+            for exercise_name in rng.sample(exercises_by_type[session_type], EXERCISES_PER_SESSION):
+                weight = float(rng.randrange(20, 100, 5))
+                sets = []
+                for set_number in range(1, sets_per_exercise + 1):
+                    moment += timedelta(seconds=rng.randrange(90, 240))
+                    sets.append(WorkoutSet(
+                        session_id=str(session_id),
+                        exercise_name=exercise_name,
+                        weight=weight,
+                        reps=rng.randrange(5, 13),
+                        rpe=rng.choice([None, 7, 8, 9]),
+                        set_number=set_number,
+                        timestamp=moment,
+                        user_id=user_id
+                    ))
+                set_docs.extend(set_document(workout_set) for workout_set in sets)
+                summaries.append(exercise_summary(
+                    exercise_name,
+                    len(sets),
+                    sum(ws.reps for ws in sets),
+                    sum(ws.weight * ws.reps for ws in sets),
+                    weight,
+                    round(max(estimated_1rm(ws.weight, ws.reps) for ws in sets), 2)
+                ))
+            session = Session(
+                user_id=user_id,
+                session_type=session_type,
+                started_at=started_at,
+                ended_at=moment + timedelta(minutes=5),
+                total_sets=sum(summary['sets'] for summary in summaries),
+                total_volume=sum(summary['total_volume'] for summary in summaries),
+                exercises_performed=summaries
+            )
+            session_docs.append(dict(session.to_dict(), _id=session_id))
+
+    db[Config.USERS_COLLECTION].insert_many(user_docs)
+    db[Config.SESSIONS_COLLECTION].insert_many(session_docs)
+    db[WORKOUT_SETS_COLLECTION].insert_many(set_docs)
+    return exercises_by_type, {'users': len(user_docs), 'sessions': len(session_docs), 'sets': len(set_docs)}
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of sorted samples"""
+    return samples[max(0, math.ceil(pct / 100 * len(samples)) - 1)]
+
+class Recorder:
+    """Latency and round-trips per endpoint, collected from every flow thread"""
+
+    def __init__(self, client_factory, round_trips):
+        self.client_factory = client_factory
+        self.round_trips = round_trips
+        self.samples = {}
+        self.error_samples = []
+        self.enabled = True
+        self._lock = threading.Lock()
+
+    def call(self, client, label, method, path, **kwargs):
+        self.round_trips.reset()
+        started = time.perf_counter()
+        response = client.open(path, method=method, **kwargs)
+        elapsed = (time.perf_counter() - started) * 1000
+        if self.enabled:
+            with self._lock:
+                self.samples.setdefault(label, []).append((elapsed, self.round_trips.count(), response.status_code))
+                if response.status_code >= 400 and len(self.error_samples) < 5:
+                    self.error_samples.append(f"{label}: {response.status_code} {response.get_data(as_text=True)[:200]}")
+        return response
+
+    def report(self, duration):
+        endpoints = {}
+        total = errors = 0
+        for label, samples in self.samples.items():
+            latencies = sorted(sample[0] for sample in samples)
+            failed = sum(1 for sample in samples if sample[2] >= 400)
+            endpoints[label] = {
+                'requests': len(samples),
+                'errors': failed,
+                'p50_ms': round(percentile(latencies, 50), 3),
+                'p95_ms': round(percentile(latencies, 95), 3),
+                'p99_ms': round(percentile(latencies, 99), 3),
+                'round_trips': round(sum(sample[1] for sample in samples) / len(samples), 2)
+            }
+            total += len(samples)
+            errors += failed
+        return {
+            'requests': total,
+            'errors': errors,
+            'duration_s': round(duration, 3),
+            'rps': round(total / duration, 1) if duration else 0.0,
+            'endpoints': endpoints,
+            'error_samples': self.error_samples
+        }
+
+def run_flow(recorder, user_index, exercises_by_type, sets_per_exercise, seed):
+    """One user's workout: login, start, log sets, end, read history"""
+    rng = random.Random(seed)
+    client = recorder.client_factory()
+    call = functools.partial(recorder.call, client)
+
+    login = call('POST /api/auth/login', 'POST', '/api/auth/login',
+                 json={'email': f"bench{user_index}@example.com", 'password': PASSWORD})
+    if login.status_code != 200:
+        return
+    headers = {'Authorization': f"Bearer {login.get_json()['token']}"}
+
+    call('GET /api/sessions/active', 'GET', '/api/sessions/active', headers=headers)
+    session_type = rng.choice(SESSION_TYPES)
+    started = call('POST /api/sessions/start', 'POST', '/api/sessions/start',
+                   json={'session_type': session_type}, headers=headers)
+    if started.status_code != 201:
+        return
+    session_id = started.get_json()['_id']
+
+    for exercise_name in rng.sample(exercises_by_type[session_type], EXERCISES_PER_SESSION):
+        call('GET /api/workout-sets/last-set', 'GET', '/api/workout-sets/last-set',
+             query_string={'session_id': session_id, 'exercise_name': exercise_name}, headers=headers)
+        weight = rng.randrange(20, 100, 5)
+        for _ in range(sets_per_exercise):
+            call('POST /api/workout-sets/log', 'POST', '/api/workout-sets/log', json={
+                'session_id': session_id,
+                'exercise_name': exercise_name,
+                'weight': weight,
+                'reps': rng.randrange(5, 13),
+                'rpe': rng.choice([None, 7, 8, 9])
+            }, headers=headers)
+
+    call('POST /api/sessions/end', 'POST', '/api/sessions/end', json={}, headers=headers)
+    history = call('GET /api/sessions/history', 'GET', '/api/sessions/history',
+                   query_string={'limit': 20}, headers=headers)
+    cursor = history.headers.get('X-Next-Cursor')
+    if cursor:
+        call('GET /api/sessions/history', 'GET', '/api/sessions/history',
+             query_string={'limit': 20, 'cursor': cursor}, headers=headers)
+    call('GET /api/workout-sets/session/<id>', 'GET', f"/api/workout-sets/session/{session_id}", headers=headers)
+
+def run(args):
+    logging.basicConfig(level=args.log_level)
+    Config.LOG_LEVEL = args.log_level.upper()
+    round_trips = RoundTrips()
+    Config.DB_NAME = args.db
+    Config.BCRYPT_ROUNDS = args.bcrypt_rounds
+    if args.mongod:
+        db = connect_mongod(args.mongod, round_trips)
+    else:
+        db = install_mongomock(round_trips)
+
+    import bcrypt
+    password_hash = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(rounds=args.bcrypt_rounds)).decode('utf-8')
+    started = time.perf_counter()
+    exercises_by_type, seeded = seed(db, args.users, args.sessions, args.sets, password_hash)
+    seed_seconds = time.perf_counter() - started
+
+    # Imported after seeding: the app warms its catalog cache (and builds
+    # indexes) on import
+    from app import app
+
+    recorder = Recorder(app.test_client, round_trips)
+    flows = args.warmup + args.flows
+    users = random.Random(args.seed).sample(range(args.users), min(flows, args.users))
+
+    def flow(number):
+        run_flow(recorder, users[number % len(users)], exercises_by_type, args.sets, args.seed + number)
+
+    recorder.enabled = False
+    for number in range(args.warmup):
+        flow(number)
+    recorder.enabled = True
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(flow, range(args.warmup, flows)))
+    duration = time.perf_counter() - started
+
+    results = {
+        'backend': 'mongod' if args.mongod else 'mongomock',
+        'workout_sets_storage': Config.WORKOUT_SETS_STORAGE,
+        'seeded': dict(seeded, seconds=round(seed_seconds, 2)),
+        'flows': args.flows,
+        'concurrency': args.concurrency,
+        'sets_per_exercise': args.sets
+    }
+    results.update(recorder.report(duration))
+    return results
+
+def print_table(results, baseline=None):
+    seeded = results['seeded']
+    print(f"\n{results['backend']}: {seeded['users']} users, {seeded['sessions']} sessions, {seeded['sets']} sets "
+          f"(seeded in {seeded['seconds']}s)")
+    print(f"{results['flows']} flows x {results['concurrency']} threads: {results['requests']} requests, "
+          f"{results['errors']} errors, {results['rps']} req/s"
+          + (f" (was {baseline['rps']})" if baseline else ""))
+    print(f"{'':36}{'requests':>9}{'p50_ms':>10}{'p95_ms':>10}{'p99_ms':>10}{'db_trips':>10}")
+    for label, stats in sorted(results['endpoints'].items()):
+        print(f"{label:36}{stats['requests']:>9}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['round_trips']:>10}")
+        before = (baseline or {}).get('endpoints', {}).get(label)
+        if before:
+            deltas = [
+                f"{(stats[key] - before[key]) / before[key] * 100:+.0f}%" if before[key] else '-'
+                for key in ('p50_ms', 'p95_ms', 'p99_ms', 'round_trips')
+            ]
+            print(f"{'  vs baseline':45}{deltas[0]:>10}{deltas[1]:>10}{deltas[2]:>10}{deltas[3]:>10}")
+    for sample in results['error_samples']:
+        print(f"⚠️  {sample}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replay workout-session flows against the Flask app')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--sessions', type=int, default=4, help='past sessions per user')
+    parser.add_argument('--sets', type=int, default=3, help='sets per exercise (4 exercises per session)')
+    parser.add_argument('--flows', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--mongod', metavar='URI', help='use a real MongoDB server instead of mongomock')
+    parser.add_argument('--db', default='evergain_bench', help='scratch database name (dropped first with --mongod)')
+    parser.add_argument('--bcrypt-rounds', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--log-level', default='WARNING')
+    parser.add_argument('--json', help='also write the results to this file')
+    parser.add_argument('--compare', help='results file of an earlier run to compare against')
+    args = parser.parse_args()
+
+    results = run(args)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_table(results, baseline)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
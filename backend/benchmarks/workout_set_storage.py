@@ -0,0 +1,160 @@
+"""
+Benchmark: workout sets in a standard vs a time-series collection
+Usage (from backend/, needs a real MongoDB 6.0+; uses a scratch database):
+    python -m benchmarks.workout_set_storage --sessions 2000 --iterations 200
+    python -m benchmarks.workout_set_storage --json results.json
+
+Seeds the same synthetic sets into both layouts, then reports storage
+size (data + indexes) and the latency of the range queries the app runs:
+one session's sets, one exercise's last set, and a user's sets in a
+30-day window.
+"""
+from config import Config
+from database.workout_sets import (
+    STANDARD_COLLECTION,
+    TIMESERIES_OPTIONS,
+    TIMESERIES_INDEXES,
+    _workout_set_indexes,
+    storage_filter,
+    to_storage
+)
+from pymongo import MongoClient, ASCENDING, IndexModel
+from bson import ObjectId
+from datetime import datetime, timedelta
+import argparse
+import json
+import random
+import statistics
+import time
+
+EXERCISES = ['Bench Press', 'Incline Dumbbell Press', 'Overhead Press', 'Lateral Raise', 'Tricep Pushdown', 'Pull Up']
+
+# User/time range index, so the window query is indexed in both layouts
+USER_TIME_INDEX = lambda timeseries: IndexModel(
+    [('meta.user_id' if timeseries else 'user_id', ASCENDING), ('timestamp', ASCENDING)],
+    name='user_timestamp'
+)
+
+def synthetic_sets(sessions, users, seed=42):
+    """Sets of `sessions` sessions (4 exercises x 4 sets) spread over a year"""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    for _ in range(sessions):
+        user_id = f"user{rng.randrange(users)}"
+        session_id = str(ObjectId())
+        moment = start + timedelta(minutes=rng.randrange(365 * 24 * 60))
+        for exercise_name in rng.sample(EXERCISES, 4):
+            weight = rng.choice([20, 30, 40, 50, 60, 70, 80])
+            for set_number in range(1, 5):
+                moment += timedelta(seconds=rng.randrange(90, 240))
+                reps = rng.randrange(5, 13)
+                yield {
+                    'session_id': session_id,
+                    'user_id': user_id,
+                    'exercise_name': exercise_name,
+                    'weight': float(weight),
+                    'reps': reps,
+                    'rpe': None,
+                    'notes': None,
+                    'set_number': set_number,
+                    'timestamp': moment,
+                    'volume': float(weight * reps)
+                }
+
+def storage_size(db, name):
+    """Bytes on disk for data and indexes"""
+    stats = db.command('collStats', name)
+    return stats.get('storageSize', 0) + stats.get('totalIndexSize', 0)
+
+def measure(fn, iterations):
+    """p50/p95 latency in milliseconds"""
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        'p50_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(samples[int(len(samples) * 0.95) - 1], 3)
+    }
+
+def run(args):
+    client = MongoClient(Config.MONGODB_URI)
+    db = client[args.database]
+    docs = list(synthetic_sets(args.sessions, args.users))
+    rng = random.Random(7)
+    samples = [rng.choice(docs) for _ in range(args.iterations)]
+
+    results = {'sets': len(docs), 'layouts': {}}
+    for timeseries in (False, True):
+        name = f"bench_{STANDARD_COLLECTION}_{'ts' if timeseries else 'standard'}"
+        db.drop_collection(name)
+        if timeseries:
+            db.create_collection(name, timeseries=TIMESERIES_OPTIONS)
+        collection = db[name]
+        collection.create_indexes(
+            (TIMESERIES_INDEXES if timeseries else _workout_set_indexes(False)) + [USER_TIME_INDEX(timeseries)]
+        )
+
+        started = time.perf_counter()
+        for offset in range(0, len(docs), 1000):
+            collection.insert_many([to_storage(dict(doc), timeseries) for doc in docs[offset:offset + 1000]])
+        load_seconds = time.perf_counter() - started
+        db.command('fsync')
+
+        picks = iter(samples * 3)
+        def session_sets():
+            doc = next(picks)
+            list(collection.find(storage_filter({'session_id': doc['session_id']}, timeseries)).sort('timestamp', 1))
+        def last_set():
+            doc = next(picks)
+            collection.find_one(
+                storage_filter({'session_id': doc['session_id'], 'exercise_name': doc['exercise_name']}, timeseries),
+                sort=[('timestamp', -1)]
+            )
+        def user_window():
+            doc = next(picks)
+            list(collection.find(dict(
+                storage_filter({'user_id': doc['user_id']}, timeseries),
+                timestamp={'$gte': doc['timestamp'] - timedelta(days=30), '$lt': doc['timestamp']}
+            )))
+
+        results['layouts']['timeseries' if timeseries else 'standard'] = {
+            'storage_bytes': storage_size(db, name),
+            'load_seconds': round(load_seconds, 2),
+            'session_sets': measure(session_sets, args.iterations),
+            'last_set': measure(last_set, args.iterations),
+            'user_30_day_window': measure(user_window, args.iterations)
+        }
+        if not args.keep:
+            db.drop_collection(name)
+
+    client.close()
+    return results
+
+def print_table(results):
+    print(f"\n{results['sets']} sets")
+    print(f"{'':24}{'standard':>14}{'timeseries':>14}")
+    standard, timeseries = results['layouts']['standard'], results['layouts']['timeseries']
+    print(f"{'storage (KiB)':24}{standard['storage_bytes'] / 1024:>14.0f}{timeseries['storage_bytes'] / 1024:>14.0f}")
+    print(f"{'load (s)':24}{standard['load_seconds']:>14}{timeseries['load_seconds']:>14}")
+    for query in ('session_sets', 'last_set', 'user_30_day_window'):
+        for stat in ('p50_ms', 'p95_ms'):
+            print(f"{query + ' ' + stat:24}{standard[query][stat]:>14}{timeseries[query][stat]:>14}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare workout set storage layouts')
+    parser.add_argument('--database', default='evergain_bench')
+    parser.add_argument('--sessions', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--keep', action='store_true', help='keep the benchmark collections')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    results = run(args)
+    print_table(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,6 +14,104 @@ class Config:
     # MongoDB Database Name
     DB_NAME = 'evergain'
     
+    # MongoDB connection pool (one client per process)
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 100))
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 5))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 2000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 5000))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', 300000))
+    MONGO_HEARTBEAT_FREQUENCY_MS = int(os.getenv('MONGO_HEARTBEAT_FREQUENCY_MS', 10000))
+
+    # Create declared indexes when the app starts
+    AUTO_CREATE_INDEXES = os.getenv('AUTO_CREATE_INDEXES', 'true').lower() == 'true'
+    
+    # Workout set logging
+    WORKOUT_SET_BATCH_MAX_SIZE = int(os.getenv('WORKOUT_SET_BATCH_MAX_SIZE', 500))
+    # Workout set storage: 'standard' or 'timeseries' (see migrate_workout_sets.py)
+    WORKOUT_SETS_STORAGE = os.getenv('WORKOUT_SETS_STORAGE', 'standard').lower()
+    WORKOUT_SETS_TIMESERIES_COLLECTION = os.getenv('WORKOUT_SETS_TIMESERIES_COLLECTION', 'workout_sets_ts')
+    WORKOUT_SETS_TIMESERIES_GRANULARITY = os.getenv('WORKOUT_SETS_TIMESERIES_GRANULARITY', 'minutes')
+    
+    # Catalog cache: seconds between version stamp checks
+    CATALOG_VERSION_CHECK_SECONDS = int(os.getenv('CATALOG_VERSION_CHECK_SECONDS', 30))
+    
+    # Background AI analysis
+    AI_ANALYSIS_WORKERS = int(os.getenv('AI_ANALYSIS_WORKERS', 4))
+    AI_ANALYSIS_QUEUE_DEPTH = int(os.getenv('AI_ANALYSIS_QUEUE_DEPTH', 32))
+    AI_ANALYSIS_TIMEOUT_SECONDS = float(os.getenv('AI_ANALYSIS_TIMEOUT_SECONDS', 20))
+    ANALYSIS_LONG_POLL_MAX_SECONDS = float(os.getenv('ANALYSIS_LONG_POLL_MAX_SECONDS', 25))
+    # Skip Gemini when the local classifier is at least this confident (>1 disables)
+    AI_CLASSIFIER_CONFIDENCE_THRESHOLD = float(os.getenv('AI_CLASSIFIER_CONFIDENCE_THRESHOLD', 0.8))
+    
+    # Gemini client (services/gemini_client.py); GEMINI_API_ENDPOINT switches to
+    # REST against another server, e.g. fake_gemini.py
+    GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-pro')
+    GEMINI_API_ENDPOINT = os.getenv('GEMINI_API_ENDPOINT', '')
+    GEMINI_DEADLINE_SECONDS = float(os.getenv('GEMINI_DEADLINE_SECONDS', 15))
+    GEMINI_ATTEMPT_TIMEOUT_SECONDS = float(os.getenv('GEMINI_ATTEMPT_TIMEOUT_SECONDS', 8))
+    GEMINI_MAX_RETRIES = int(os.getenv('GEMINI_MAX_RETRIES', 2))
+    GEMINI_RETRY_BASE_SECONDS = float(os.getenv('GEMINI_RETRY_BASE_SECONDS', 0.25))
+    GEMINI_RETRY_MAX_SECONDS = float(os.getenv('GEMINI_RETRY_MAX_SECONDS', 2))
+    # Send a second request when an attempt is slower than this percentile (0 disables)
+    GEMINI_HEDGE_PERCENTILE = float(os.getenv('GEMINI_HEDGE_PERCENTILE', 95))
+    GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', 8))
+    GEMINI_BREAKER_FAILURES = int(os.getenv('GEMINI_BREAKER_FAILURES', 5))
+    GEMINI_BREAKER_COOLDOWN_SECONDS = float(os.getenv('GEMINI_BREAKER_COOLDOWN_SECONDS', 30))
+    
+    # Page size limits
+    WORKOUT_HISTORY_MAX_PAGE_SIZE = int(os.getenv('WORKOUT_HISTORY_MAX_PAGE_SIZE', 100))
+    SESSION_HISTORY_MAX_PAGE_SIZE = int(os.getenv('SESSION_HISTORY_MAX_PAGE_SIZE', 100))
+    WORKOUT_SETS_DEFAULT_PAGE_SIZE = int(os.getenv('WORKOUT_SETS_DEFAULT_PAGE_SIZE', 200))
+    WORKOUT_SETS_MAX_PAGE_SIZE = int(os.getenv('WORKOUT_SETS_MAX_PAGE_SIZE', 500))
+    
+    # Training log export: sessions per cursor batch
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 200))
+    EXPORT_MAX_BATCH_SIZE = int(os.getenv('EXPORT_MAX_BATCH_SIZE', 1000))
+    
+    # Training history import (background jobs)
+    IMPORT_UPLOAD_DIR = os.getenv('IMPORT_UPLOAD_DIR', os.path.join(tempfile.gettempdir(), 'evergain-imports'))
+    IMPORT_MAX_UPLOAD_MB = int(os.getenv('IMPORT_MAX_UPLOAD_MB', 50))
+    IMPORT_WORKERS = int(os.getenv('IMPORT_WORKERS', 2))
+    IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', 2000))
+    # Minimum similarity (0-1) for mapping an exercise name onto the catalog
+    IMPORT_MATCH_CUTOFF = float(os.getenv('IMPORT_MATCH_CUTOFF', 0.75))
+    # A running job without progress for this long may be resumed
+    IMPORT_STALE_SECONDS = int(os.getenv('IMPORT_STALE_SECONDS', 120))
+    
+    # Authentication: verified token claims are cached until the token expires
+    AUTH_TOKEN_CACHE_MAX_ENTRIES = int(os.getenv('AUTH_TOKEN_CACHE_MAX_ENTRIES', 10000))
+    # User records loaded for the token holder (0 disables the cache)
+    AUTH_USER_CACHE_TTL_SECONDS = int(os.getenv('AUTH_USER_CACHE_TTL_SECONDS', 30))
+    # Accept requests without a token on routes that still take a user_id parameter
+    AUTH_ALLOW_ANONYMOUS = os.getenv('AUTH_ALLOW_ANONYMOUS', 'true').lower() == 'true'
+    
+    # Password hashing: bcrypt runs on its own bounded pool (429 when full)
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE_DEPTH = int(os.getenv('PASSWORD_HASH_QUEUE_DEPTH', 16))
+    PASSWORD_HASH_TIMEOUT_SECONDS = float(os.getenv('PASSWORD_HASH_TIMEOUT_SECONDS', 10))
+    # bcrypt cost factor; 0 calibrates it at startup to BCRYPT_TARGET_MS per hash
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 0))
+    BCRYPT_TARGET_MS = float(os.getenv('BCRYPT_TARGET_MS', 250))
+    
+    # Logging: JSON lines (or text) written by a background thread; LOG_SAMPLING
+    # keeps a fraction of chatty loggers' DEBUG/INFO records ("logger=0.1,...")
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json').lower()
+    LOG_SAMPLING = os.getenv('LOG_SAMPLING', '')
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+    
+    # Instrumentation: GET /metrics (Prometheus) and Server-Timing headers
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    # X-Profile: 1 returns a cProfile breakdown instead of the response (keep off in production
+    # unless needed; one request is profiled at a time)
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILE_TOP_FUNCTIONS = int(os.getenv('PROFILE_TOP_FUNCTIONS', 30))
+    
+    # AI response cache
+    AI_CACHE_MAX_ENTRIES = int(os.getenv('AI_CACHE_MAX_ENTRIES', 2048))
+    AI_CACHE_TTL_SECONDS = int(os.getenv('AI_CACHE_TTL_SECONDS', 3600))
+    
     # Collections
     USERS_COLLECTION = 'users'
     WORKOUTS_COLLECTION = 'workouts'
@@ -0,0 +1,36 @@
+"""
+Catalog Version Stamp
+The exercise catalog and session types only change when seed_exercises.py
+runs. The seed script bumps this version so in-process caches know when to
+reload.
+"""
+from database import MongoDB
+from pymongo import ReturnDocument
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+CATALOG_META_COLLECTION = 'catalog_meta'
+CATALOG_VERSION_ID = 'catalog'
+
+def get_catalog_meta_collection():
+    """Get catalog metadata collection"""
+    db = MongoDB.get_db()
+    return db[CATALOG_META_COLLECTION]
+
+def get_catalog_version() -> int:
+    """Get the current catalog version (0 if never bumped)"""
+    doc = get_catalog_meta_collection().find_one({'_id': CATALOG_VERSION_ID}, {'version': 1})
+    return doc['version'] if doc else 0
+
+def bump_catalog_version() -> int:
+    """Increment the catalog version after the catalog changed"""
+    doc = get_catalog_meta_collection().find_one_and_update(
+        {'_id': CATALOG_VERSION_ID},
+        {'$inc': {'version': 1}, '$set': {'updated_at': datetime.utcnow()}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    logger.info(f"✅ Catalog version bumped to {doc['version']}")
+    return doc['version']
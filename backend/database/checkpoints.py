@@ -0,0 +1,30 @@
+"""
+Job Checkpoints
+Progress markers for long-running maintenance scripts (backfills,
+migrations) so an interrupted run continues where it stopped.
+"""
+from database import MongoDB
+from datetime import datetime
+
+JOB_CHECKPOINTS_COLLECTION = 'job_checkpoints'
+
+def get_job_checkpoints_collection():
+    """Get job checkpoints collection"""
+    db = MongoDB.get_db()
+    return db[JOB_CHECKPOINTS_COLLECTION]
+
+def get_checkpoint(job: str) -> dict:
+    """Get the saved checkpoint of a job (empty dict if none)"""
+    return get_job_checkpoints_collection().find_one({'_id': job}) or {}
+
+def save_checkpoint(job: str, **progress):
+    """Save a job's progress (e.g. last processed _id and counters)"""
+    get_job_checkpoints_collection().update_one(
+        {'_id': job},
+        {'$set': dict(progress, updated_at=datetime.utcnow())},
+        upsert=True
+    )
+
+def clear_checkpoint(job: str):
+    """Forget a job's progress so the next run starts over"""
+    get_job_checkpoints_collection().delete_one({'_id': job})
@@ -0,0 +1,138 @@
+"""
+Import Jobs
+Progress documents of training-history imports (see services.import_service)
+"""
+from database import MongoDB
+from bson import ObjectId
+from bson.errors import InvalidId
+from config import Config
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from datetime import datetime
+
+IMPORT_JOBS_COLLECTION = 'import_jobs'
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+IMPORT_JOB_INDEXES = [
+    IndexModel([('user_id', ASCENDING), ('created_at', DESCENDING)], name='user_created_at'),
+]
+
+# Sessions written by an import (resume cleanup)
+IMPORTED_SESSION_INDEXES = [
+    IndexModel(
+        [('import_job_id', ASCENDING), ('import_row', ASCENDING)],
+        name='import_job_row',
+        partialFilterExpression={'import_job_id': {'$exists': True}}
+    ),
+]
+
+IMPORT_JOB_AUDITED_QUERIES = [
+    {
+        'name': 'import resume cleanup',
+        'command': {
+            'find': Config.SESSIONS_COLLECTION,
+            'filter': {'import_job_id': ObjectId('000000000000000000000000'), 'import_row': {'$gte': 1}},
+            'projection': {'_id': 1}
+        }
+    },
+]
+
+def get_import_jobs_collection():
+    """Get import jobs collection"""
+    db = MongoDB.get_db()
+    return db[IMPORT_JOBS_COLLECTION]
+
+def _job_object_id(job_id) -> ObjectId:
+    try:
+        return ObjectId(job_id)
+    except (InvalidId, TypeError):
+        raise ValueError(f"Invalid import job id: {job_id}")
+
+def create_import_job(user_id: str, filename: str, path: str, fmt: str, size_bytes: int) -> dict:
+    """Insert a queued job"""
+    now = datetime.utcnow()
+    job = {
+        'user_id': user_id,
+        'filename': filename,
+        'path': path,
+        'format': fmt,
+        'size_bytes': size_bytes,
+        'status': QUEUED,
+        'progress': {
+            'rows_read': 0,
+            'rows_done': 0,
+            'rows_skipped': 0,
+            'sessions_created': 0,
+            'sets_created': 0,
+            'bytes_read': 0
+        },
+        'exercise_matches': [],
+        'unmatched_exercises': [],
+        'errors': [],
+        'created_at': now,
+        'updated_at': now
+    }
+    job['_id'] = get_import_jobs_collection().insert_one(job).inserted_id
+    return job
+
+def get_import_job(job_id, user_id: str = None) -> dict:
+    """
+    Get a job (optionally only if it belongs to user_id)
+
+    Raises:
+        ValueError: If the id is malformed
+    """
+    query = {'_id': _job_object_id(job_id)}
+    if user_id is not None:
+        query['user_id'] = user_id
+    return get_import_jobs_collection().find_one(query)
+
+def update_import_job(job_id, **fields):
+    """Set fields on a job (also refreshes updated_at, the liveness heartbeat)"""
+    fields['updated_at'] = datetime.utcnow()
+    get_import_jobs_collection().update_one({'_id': _job_object_id(job_id)}, {'$set': fields})
+
+def claim_import_job(job_id, stale_before: datetime) -> dict:
+    """
+    Atomically mark a job as running, unless it is completed or another
+    worker is still updating it
+
+    Returns:
+        The claimed job, or None
+    """
+    return get_import_jobs_collection().find_one_and_update(
+        {
+            '_id': _job_object_id(job_id),
+            '$or': [
+                {'status': {'$in': [QUEUED, FAILED]}},
+                {'status': RUNNING, 'updated_at': {'$lt': stale_before}}
+            ]
+        },
+        {'$set': {'status': RUNNING, 'error': None, 'updated_at': datetime.utcnow()}},
+        return_document=True
+    )
+
+def job_to_json(job: dict) -> dict:
+    """Convert a job document for JSON"""
+    progress = dict(job.get('progress', {}))
+    size = job.get('size_bytes') or 0
+    progress['percent'] = 100.0 if job.get('status') == COMPLETED else (
+        round(min(progress.get('bytes_read', 0) / size, 1.0) * 100, 1) if size else 0.0
+    )
+    return {
+        '_id': str(job['_id']),
+        'filename': job.get('filename'),
+        'format': job.get('format'),
+        'status': job.get('status'),
+        'progress': progress,
+        'exercise_matches': job.get('exercise_matches', []),
+        'unmatched_exercises': job.get('unmatched_exercises', []),
+        'errors': job.get('errors', []),
+        'error': job.get('error'),
+        'created_at': job['created_at'].isoformat() if job.get('created_at') else None,
+        'finished_at': job['finished_at'].isoformat() if job.get('finished_at') else None
+    }
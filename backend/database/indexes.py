@@ -0,0 +1,251 @@
+"""
+Index Management
+Declares the indexes every collection needs, applies them idempotently
+and audits the service-layer queries against them with explain().
+"""
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from bson import ObjectId
+from datetime import datetime
+from pymongo.errors import OperationFailure
+from config import Config
+from database.mongodb import MongoDB
+from database.workout_sets import (
+    WORKOUT_SETS_COLLECTION,
+    WORKOUT_SET_INDEXES,
+    WORKOUT_SET_OBSOLETE_INDEXES,
+    WORKOUT_SET_AUDITED_QUERIES,
+    TIMESERIES,
+    ensure_timeseries_collection
+)
+from database.personal_records import (
+    PERSONAL_RECORDS_COLLECTION,
+    PERSONAL_RECORD_INDEXES,
+    PERSONAL_RECORD_AUDITED_QUERIES
+)
+from database.rollups import ROLLUPS_COLLECTION, ROLLUP_INDEXES, ROLLUP_AUDITED_QUERIES
+from database.import_jobs import (
+    IMPORT_JOBS_COLLECTION,
+    IMPORT_JOB_INDEXES,
+    IMPORTED_SESSION_INDEXES,
+    IMPORT_JOB_AUDITED_QUERIES
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Required indexes per collection
+INDEXES = {
+    # AuthService.register / login
+    Config.USERS_COLLECTION: [
+        IndexModel([('email', ASCENDING)], name='email_unique', unique=True),
+    ],
+    # SessionService
+    Config.SESSIONS_COLLECTION: [
+        # get_active_session; also guarantees one active session per user
+        IndexModel(
+            [('user_id', ASCENDING)],
+            name='one_active_session_per_user',
+            unique=True,
+            partialFilterExpression={'is_active': True}
+        ),
+        # get_session_history (keyset pages)
+        IndexModel(
+            [('user_id', ASCENDING), ('started_at', DESCENDING), ('_id', DESCENDING)],
+            name='user_started_at_id'
+        ),
+    ] + IMPORTED_SESSION_INDEXES,
+    # WorkoutService.get_recent_workouts / get_history (keyset pages)
+    Config.WORKOUTS_COLLECTION: [
+        IndexModel(
+            [('user_id', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)],
+            name='user_created_at'
+        ),
+        # WorkoutService.recover_stale_analyses (only pending workouts are indexed)
+        IndexModel(
+            [('created_at', ASCENDING)],
+            name='pending_created_at',
+            partialFilterExpression={'progress_state': 'pending'}
+        ),
+    ],
+    # Exercise routes
+    Config.EXERCISES_COLLECTION: [
+        IndexModel([('sessions', ASCENDING)], name='sessions'),
+        IndexModel([('muscle_group', ASCENDING)], name='muscle_group'),
+    ],
+    # SessionService.start_session
+    Config.SESSION_TYPES_COLLECTION: [
+        IndexModel([('name', ASCENDING)], name='name_unique', unique=True),
+    ],
+    WORKOUT_SETS_COLLECTION: WORKOUT_SET_INDEXES,
+    PERSONAL_RECORDS_COLLECTION: PERSONAL_RECORD_INDEXES,
+    ROLLUPS_COLLECTION: ROLLUP_INDEXES,
+    IMPORT_JOBS_COLLECTION: IMPORT_JOB_INDEXES,
+}
+
+# Indexes superseded by the declarations above; dropped if present
+OBSOLETE_INDEXES = {
+    Config.SESSIONS_COLLECTION: ['user_started_at'],
+    Config.WORKOUTS_COLLECTION: ['created_at'],
+    WORKOUT_SETS_COLLECTION: WORKOUT_SET_OBSOLETE_INDEXES,
+}
+
+# Representative service-layer queries (sample values, real shapes).
+# 'full_scan' marks queries that read the whole collection on purpose.
+AUDITED_QUERIES = [
+    {
+        'name': 'AuthService: find user by email',
+        'command': {'find': Config.USERS_COLLECTION, 'filter': {'email': 'sample@example.com'}, 'limit': 1}
+    },
+    {
+        'name': 'SessionService.get_active_session',
+        'command': {'find': Config.SESSIONS_COLLECTION, 'filter': {'user_id': 'sample', 'is_active': True}, 'limit': 1}
+    },
+    {
+        'name': 'SessionService.get_session_history',
+        'command': {
+            'find': Config.SESSIONS_COLLECTION,
+            'filter': {'user_id': 'sample'},
+            'sort': {'started_at': -1, '_id': -1},
+            'limit': 21
+        }
+    },
+    {
+        'name': 'SessionService.start_session (session type lookup)',
+        'command': {'find': Config.SESSION_TYPES_COLLECTION, 'filter': {'name': 'Push'}, 'limit': 1}
+    },
+    {
+        'name': 'SessionService.get_session_types',
+        'command': {'find': Config.SESSION_TYPES_COLLECTION, 'filter': {}},
+        'full_scan': True
+    },
+    {
+        'name': 'WorkoutService.get_recent_workouts',
+        'command': {
+            'find': Config.WORKOUTS_COLLECTION,
+            'filter': {'user_id': 'sample', 'created_at': {'$lt': datetime(2030, 1, 1)}},
+            'sort': {'created_at': -1, '_id': -1},
+            'limit': 5
+        }
+    },
+    {
+        'name': 'WorkoutService.get_history (next page)',
+        'command': {
+            'find': Config.WORKOUTS_COLLECTION,
+            'filter': {'user_id': 'sample', '$or': [
+                {'created_at': {'$lt': datetime(2030, 1, 1)}},
+                {'created_at': datetime(2030, 1, 1), '_id': {'$lt': ObjectId('000000000000000000000000')}}
+            ]},
+            'sort': {'created_at': -1, '_id': -1},
+            'limit': 21
+        }
+    },
+    {
+        'name': 'WorkoutService.recover_stale_analyses',
+        'command': {
+            'find': Config.WORKOUTS_COLLECTION,
+            'filter': {'progress_state': 'pending', 'created_at': {'$lt': datetime(2030, 1, 1)}}
+        }
+    },
+    {
+        'name': 'GET /api/exercises/',
+        'command': {'find': Config.EXERCISES_COLLECTION, 'filter': {}},
+        'full_scan': True
+    },
+    {
+        'name': 'GET /api/exercises/muscle-groups',
+        'command': {'distinct': Config.EXERCISES_COLLECTION, 'key': 'muscle_group', 'query': {}}
+    },
+    {
+        'name': 'GET /api/sessions/exercises',
+        'command': {'find': Config.EXERCISES_COLLECTION, 'filter': {'sessions': 'Push'}}
+    },
+] + WORKOUT_SET_AUDITED_QUERIES + PERSONAL_RECORD_AUDITED_QUERIES + ROLLUP_AUDITED_QUERIES + IMPORT_JOB_AUDITED_QUERIES
+
+
+def ensure_indexes(db=None):
+    """
+    Create all declared indexes (safe to run repeatedly)
+
+    Args:
+        db: Database to use (defaults to the shared connection)
+
+    Returns:
+        dict of collection name -> list of index names, or an error string
+    """
+    db = db if db is not None else MongoDB.get_db()
+    summary = {}
+    
+    # create_indexes would otherwise create an ordinary collection
+    if TIMESERIES:
+        ensure_timeseries_collection(db)
+
+    for collection_name, models in INDEXES.items():
+        try:
+            summary[collection_name] = db[collection_name].create_indexes(models)
+        except OperationFailure as e:
+            # e.g. an index with the same name but other options, or existing
+            # data violating a unique index (two active sessions for one user)
+            logger.error(f"❌ Failed to create indexes on {collection_name}: {e}")
+            summary[collection_name] = str(e)
+
+    for collection_name, names in OBSOLETE_INDEXES.items():
+        existing = set(db[collection_name].index_information())
+        for name in names:
+            if name in existing:
+                db[collection_name].drop_index(name)
+                logger.info(f"🗑️  Dropped obsolete index {collection_name}.{name}")
+
+    logger.info(f"✅ Indexes ensured on {len(INDEXES)} collections")
+    return summary
+
+
+def _plan_stages(plan):
+    """Yield every stage name of an explain() plan tree"""
+    if not isinstance(plan, dict):
+        return
+    if 'stage' in plan:
+        yield plan['stage']
+    for key in ('inputStage', 'queryPlan'):
+        if key in plan:
+            yield from _plan_stages(plan[key])
+    for child in plan.get('inputStages', []):
+        yield from _plan_stages(child)
+
+
+def _winning_plan(explain_result):
+    """Extract the winning plan from explain() output (find, count, distinct)"""
+    planner = explain_result.get('queryPlanner')
+    if planner is None:
+        # Newer servers nest the planner under the first pipeline stage
+        stages = explain_result.get('stages') or [{}]
+        planner = stages[0].get('$cursor', {}).get('queryPlanner', {})
+    return planner.get('winningPlan', {})
+
+
+def audit_queries(db=None):
+    """
+    Explain every audited query and flag those not covered by an index
+
+    Returns:
+        List of dicts with name, stages and issues (empty when covered)
+    """
+    db = db if db is not None else MongoDB.get_db()
+    report = []
+
+    for query in AUDITED_QUERIES:
+        try:
+            result = db.command('explain', query['command'], verbosity='queryPlanner')
+        except OperationFailure as e:
+            report.append({'name': query['name'], 'stages': [], 'issues': [f'explain failed: {e}']})
+            continue
+
+        stages = list(_plan_stages(_winning_plan(result)))
+        issues = []
+        if 'COLLSCAN' in stages and not query.get('full_scan'):
+            issues.append('collection scan')
+        if 'SORT' in stages:
+            issues.append('in-memory sort')
+
+        report.append({'name': query['name'], 'stages': stages, 'issues': issues})
+
+    return report
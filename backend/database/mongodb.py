@@ -1,49 +1,262 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, monitoring
 from pymongo.errors import ConnectionFailure
 from config import Config
+import metrics
 import logging
+import os
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+
+class PoolMonitor(monitoring.ConnectionPoolListener, monitoring.ServerHeartbeatListener):
+    """
+    Tracks connection pool usage and server health from the driver's own events.
+
+    The driver already runs a background monitor thread per server that sends
+    heartbeats every ``heartbeatFrequencyMS``; listening to those events gives us
+    liveness information without issuing a ping on the request path.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connections_open = 0
+            self.connections_in_use = 0
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.pool_clears = 0
+            self.healthy = None
+            self.last_heartbeat_at = None
+            self.last_heartbeat_ms = None
+            self.last_heartbeat_error = None
+
+    # Connection pool events
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_open += 1
+            self.connections_created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_open = max(self.connections_open - 1, 0)
+            self.connections_closed += 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.connections_in_use += 1
+            self.checkouts += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.connections_in_use = max(self.connections_in_use - 1, 0)
+
+    # Server heartbeat events (emitted by the driver's monitor thread)
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        with self._lock:
+            if self.healthy is False:
+                logger.info("✅ MongoDB server reachable again")
+            self.healthy = True
+            self.last_heartbeat_at = time.time()
+            self.last_heartbeat_ms = round(event.duration * 1000, 2)
+            self.last_heartbeat_error = None
+
+    def failed(self, event):
+        with self._lock:
+            if self.healthy is not False:
+                logger.warning(f"⚠️ MongoDB heartbeat failed: {event.reply}")
+            self.healthy = False
+            self.last_heartbeat_at = time.time()
+            self.last_heartbeat_error = str(event.reply)
+
+    def snapshot(self):
+        """Return a copy of the current counters"""
+        with self._lock:
+            return {
+                'healthy': self.healthy,
+                'connections_open': self.connections_open,
+                'connections_in_use': self.connections_in_use,
+                'connections_available': max(self.connections_open - self.connections_in_use, 0),
+                'connections_created': self.connections_created,
+                'connections_closed': self.connections_closed,
+                'checkouts': self.checkouts,
+                'checkout_failures': self.checkout_failures,
+                'pool_clears': self.pool_clears,
+                'last_heartbeat_at': self.last_heartbeat_at,
+                'last_heartbeat_ms': self.last_heartbeat_ms,
+                'last_heartbeat_error': self.last_heartbeat_error
+            }
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """
+    Latency of every MongoDB command by collection and command name
+    (metrics.record_command, also charged to the request being served).
+
+    The driver calls the listener on the thread that sends the command;
+    only started events carry the command document, so the collection is
+    remembered until the matching succeeded/failed event.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._collections = {}
+
+    def started(self, event):
+        if event.command_name == 'getMore':
+            collection = event.command.get('collection')
+        else:
+            collection = event.command.get(event.command_name)
+        with self._lock:
+            self._collections[(event.connection_id, event.request_id)] = (
+                collection if isinstance(collection, str) else ''
+            )
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed):
+        with self._lock:
+            collection = self._collections.pop((event.connection_id, event.request_id), '')
+        metrics.record_command(collection, event.command_name, event.duration_micros / 1e6, failed)
+
+
 class MongoDB:
+    """
+    Process-wide MongoDB connection manager.
+
+    Holds a single tuned ``MongoClient`` per process. The client is recreated
+    only after a fork (clients are not fork-safe); reconnects after network
+    errors are handled by the driver itself.
+    """
     client = None
     db = None
-    
+    monitor = PoolMonitor()
+    command_metrics = CommandMetrics()
+    _pid = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def client_options(cls):
+        """Pool and timeout settings passed to MongoClient (and the async client)"""
+        return {
+            'maxPoolSize': Config.MONGO_MAX_POOL_SIZE,
+            'minPoolSize': Config.MONGO_MIN_POOL_SIZE,
+            'waitQueueTimeoutMS': Config.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            'serverSelectionTimeoutMS': Config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            'connectTimeoutMS': Config.MONGO_CONNECT_TIMEOUT_MS,
+            'maxIdleTimeMS': Config.MONGO_MAX_IDLE_TIME_MS,
+            'heartbeatFrequencyMS': Config.MONGO_HEARTBEAT_FREQUENCY_MS,
+            'retryWrites': True,
+            'retryReads': True,
+        }
+
+    @classmethod
+    def event_listeners(cls):
+        """Driver event listeners (pool/heartbeat monitor, command metrics)"""
+        if Config.METRICS_ENABLED:
+            return [cls.monitor, cls.command_metrics]
+        return [cls.monitor]
+
     @classmethod
     def connect(cls):
         """Initialize MongoDB connection"""
-        try:
-            cls.client = MongoClient(Config.MONGODB_URI)
-            # Test connection
-            cls.client.admin.command('ping')
-            cls.db = cls.client[Config.DB_NAME]
-            logger.info(f"✅ Connected to MongoDB database: {Config.DB_NAME}")
-            return cls.db
-        except ConnectionFailure as e:
-            logger.error(f"❌ Failed to connect to MongoDB: {e}")
-            raise e
-    
+        with cls._lock:
+            try:
+                if cls.client is not None and cls._pid == os.getpid():
+                    return cls.db
+
+                cls.monitor.reset()
+                cls.client = MongoClient(
+                    Config.MONGODB_URI,
+                    event_listeners=cls.event_listeners(),
+                    **cls.client_options()
+                )
+                cls._pid = os.getpid()
+                # Test connection once at startup
+                cls.client.admin.command('ping')
+                cls.db = cls.client[Config.DB_NAME]
+                logger.info(f"✅ Connected to MongoDB database: {Config.DB_NAME}")
+                return cls.db
+            except ConnectionFailure as e:
+                logger.error(f"❌ Failed to connect to MongoDB: {e}")
+                # Keep the client: the driver keeps retrying in the background
+                cls.db = cls.client[Config.DB_NAME] if cls.client is not None else None
+                raise e
+
     @classmethod
     def get_db(cls):
-        """Get database instance"""
-        if cls.db is None or cls.client is None:
-            cls.connect()
-        else:
-            # Check if connection is still alive
+        """Get database instance (no round-trip to the server)"""
+        if cls.db is None or cls._pid != os.getpid():
             try:
-                cls.client.admin.command('ping')
-            except Exception:
-                # Connection is dead, reconnect
-                logger.warning("⚠️ MongoDB connection lost, reconnecting...")
                 cls.connect()
+            except ConnectionFailure:
+                if cls.db is None:
+                    raise
         return cls.db
-    
+
+    @classmethod
+    def pool_stats(cls):
+        """
+        Get connection pool statistics
+
+        Returns:
+            dict with pool settings, live counters and server health
+        """
+        options = cls.client_options()
+        stats = cls.monitor.snapshot()
+        stats['max_pool_size'] = options['maxPoolSize']
+        stats['min_pool_size'] = options['minPoolSize']
+        stats['wait_queue_timeout_ms'] = options['waitQueueTimeoutMS']
+        stats['server_selection_timeout_ms'] = options['serverSelectionTimeoutMS']
+        stats['connected'] = cls.client is not None and cls._pid == os.getpid()
+        return stats
+
     @classmethod
     def close(cls):
         """Close MongoDB connection"""
-        if cls.client:
-            cls.client.close()
-            logger.info("MongoDB connection closed")
+        with cls._lock:
+            if cls.client:
+                cls.client.close()
+                cls.client = None
+                cls.db = None
+                cls._pid = None
+                logger.info("MongoDB connection closed")
 
 # Collection accessors
 def get_users_collection():
@@ -70,5 +283,3 @@ def get_session_types_collection():
     """Get session types collection"""
     db = MongoDB.get_db()
     return db[Config.SESSION_TYPES_COLLECTION]
-
-
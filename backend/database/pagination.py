@@ -0,0 +1,78 @@
+"""
+Keyset Pagination
+Opaque cursors over (sort field, _id). Pages are fetched with a range
+condition on an index instead of skip(), so every page costs the same no
+matter how deep the client has scrolled.
+"""
+from bson import ObjectId
+from bson.errors import InvalidId
+from datetime import datetime
+import base64
+import json
+
+def encode_cursor(sort_value: datetime, doc_id) -> str:
+    """Build an opaque cursor pointing after the given document"""
+    raw = json.dumps([sort_value.isoformat(), str(doc_id)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str):
+    """
+    Decode a cursor produced by encode_cursor
+
+    Returns:
+        (datetime, ObjectId)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, doc_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(sort_value), ObjectId(doc_id)
+    except (ValueError, TypeError, InvalidId, UnicodeError):
+        raise ValueError('Invalid cursor')
+
+def keyset_filter(sort_field: str, cursor: str, descending: bool = True) -> dict:
+    """
+    Query condition selecting documents after the cursor
+
+    Matches the (sort_field, _id) order used for the page, so ties on
+    sort_field are broken by _id and no document is skipped or repeated.
+    """
+    sort_value, doc_id = decode_cursor(cursor)
+    op = '$lt' if descending else '$gt'
+    return {'$or': [
+        {sort_field: {op: sort_value}},
+        {sort_field: sort_value, '_id': {op: doc_id}}
+    ]}
+
+def page_sort(sort_field: str, descending: bool = True) -> list:
+    """Sort specification matching keyset_filter"""
+    direction = -1 if descending else 1
+    return [(sort_field, direction), ('_id', direction)]
+
+def clamp_page_size(value, default: int, maximum: int) -> int:
+    """Parse a requested page size, enforcing the server maximum"""
+    try:
+        size = int(value) if value is not None else default
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+    return max(1, min(size, maximum))
+
+def parse_fields(value, allowed):
+    """
+    Parse a comma-separated fields= parameter against a whitelist
+
+    Returns:
+        Set of field names, or None when the parameter is absent
+
+    Raises:
+        ValueError: If an unknown field is requested
+    """
+    if not value:
+        return None
+    fields = {f.strip() for f in value.split(',') if f.strip()}
+    unknown = fields - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return fields
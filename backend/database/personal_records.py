@@ -0,0 +1,183 @@
+"""
+Personal Records
+Best lifts per (user, exercise), kept current as sets are logged so
+"what is my best bench press" is a single index lookup instead of a scan
+over every set the user has logged.
+"""
+from database import MongoDB
+from models.strength import estimated_1rm
+from models.workout_set import WIB
+from pymongo import ASCENDING, IndexModel, ReturnDocument, UpdateOne
+from datetime import datetime, timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+PERSONAL_RECORDS_COLLECTION = 'personal_records'
+
+PERSONAL_RECORD_INDEXES = [
+    # upserts from the logging path and GET /api/records
+    IndexModel(
+        [('user_id', ASCENDING), ('exercise_name', ASCENDING)],
+        name='user_exercise_unique',
+        unique=True
+    ),
+]
+
+PERSONAL_RECORD_AUDITED_QUERIES = [
+    {
+        'name': 'GET /api/records',
+        'command': {
+            'find': PERSONAL_RECORDS_COLLECTION,
+            'filter': {'user_id': 'sample'},
+            'sort': {'exercise_name': 1}
+        }
+    },
+    {
+        'name': 'GET /api/records?exercise=',
+        'command': {
+            'find': PERSONAL_RECORDS_COLLECTION,
+            'filter': {'user_id': 'sample', 'exercise_name': 'Bench Press'},
+            'limit': 1
+        }
+    },
+]
+
+# Fields of the previous record needed to flag beaten records
+RECORD_BEST_PROJECTION = {'best_weight': 1, 'best_volume': 1, 'best_e1rm': 1, 'reps_by_weight': 1}
+
+def get_personal_records_collection():
+    """Get personal records collection"""
+    db = MongoDB.get_db()
+    return db[PERSONAL_RECORDS_COLLECTION]
+
+def _weight_key(weight: float) -> str:
+    """Field name for a weight in the reps_by_weight map (no dots allowed)"""
+    return f"{float(weight):g}".replace('.', '_')
+
+def _set_bests(workout_set) -> dict:
+    """Values a single set contributes to the record"""
+    return {
+        'weight': workout_set.weight,
+        'volume': workout_set.weight * workout_set.reps,
+        'e1rm': round(estimated_1rm(workout_set.weight, workout_set.reps), 2)
+    }
+
+def record_update(workout_sets: list) -> dict:
+    """$max update folding a group of sets of one exercise into its record"""
+    maxima = {}
+    for workout_set in workout_sets:
+        bests = _set_bests(workout_set)
+        for field, value in (
+            ('best_weight', bests['weight']),
+            ('best_volume', bests['volume']),
+            ('best_e1rm', bests['e1rm']),
+            (f"reps_by_weight.{_weight_key(workout_set.weight)}", workout_set.reps),
+            ('last_logged_at', workout_set.timestamp),
+        ):
+            if field not in maxima or value > maxima[field]:
+                maxima[field] = value
+    return {'$max': maxima, '$setOnInsert': {'created_at': datetime.utcnow()}}
+
+def new_records(workout_set, best: dict) -> list:
+    """
+    Record types beaten by a set (weight, reps at an already lifted
+    weight, volume, e1rm), updating ``best`` (the running record) in place
+    """
+    bests = _set_bests(workout_set)
+    reps_by_weight = best.setdefault('reps_by_weight', {})
+    weight_key = _weight_key(workout_set.weight)
+
+    beaten = []
+    if bests['weight'] > best.get('best_weight', float('-inf')):
+        beaten.append('weight')
+    # A first set at a new weight is not a rep record
+    if weight_key in reps_by_weight and workout_set.reps > reps_by_weight[weight_key]:
+        beaten.append('reps')
+    if bests['volume'] > best.get('best_volume', float('-inf')):
+        beaten.append('volume')
+    if bests['e1rm'] > best.get('best_e1rm', float('-inf')):
+        beaten.append('e1rm')
+
+    best['best_weight'] = max(best.get('best_weight', bests['weight']), bests['weight'])
+    best['best_volume'] = max(best.get('best_volume', bests['volume']), bests['volume'])
+    best['best_e1rm'] = max(best.get('best_e1rm', bests['e1rm']), bests['e1rm'])
+    reps_by_weight[weight_key] = max(reps_by_weight.get(weight_key, workout_set.reps), workout_set.reps)
+    return beaten
+
+def update_personal_records(user_id: str, exercise_name: str, workout_sets: list) -> list:
+    """
+    Fold newly logged sets of one exercise into the user's record
+
+    One upsert with $max, returning the previous record so each set can be
+    flagged with the record types it beat (at the time it was performed).
+
+    Args:
+        user_id: Owner of the sets
+        exercise_name: Exercise of every set in workout_sets
+        workout_sets: WorkoutSet objects, in the order they were performed
+
+    Returns:
+        List with the beaten record types of each set (same order)
+    """
+    collection = get_personal_records_collection()
+
+    before = collection.find_one_and_update(
+        {'user_id': user_id, 'exercise_name': exercise_name},
+        record_update(workout_sets),
+        projection=RECORD_BEST_PROJECTION,
+        upsert=True,
+        return_document=ReturnDocument.BEFORE
+    )
+
+    best = before or {}
+    return [new_records(workout_set, best) for workout_set in workout_sets]
+
+def bulk_update_personal_records(groups: dict):
+    """
+    Apply many record updates in one unordered bulk write (backfill)
+
+    Args:
+        groups: dict of (user_id, exercise_name) -> list of WorkoutSet objects
+    """
+    if not groups:
+        return
+    requests = [
+        UpdateOne({'user_id': user_id, 'exercise_name': exercise_name}, record_update(sets), upsert=True)
+        for (user_id, exercise_name), sets in groups.items()
+    ]
+    get_personal_records_collection().bulk_write(requests, ordered=False)
+
+def record_to_json(record: dict) -> dict:
+    """Convert a personal record document for JSON"""
+    reps_by_weight = [
+        {'weight': float(key.replace('_', '.')), 'reps': reps}
+        for key, reps in record.get('reps_by_weight', {}).items()
+    ]
+    reps_by_weight.sort(key=lambda entry: entry['weight'])
+
+    # Stored as UTC, returned in WIB like the rest of the API
+    last_logged_at = record.get('last_logged_at')
+    if isinstance(last_logged_at, datetime):
+        last_logged_at = last_logged_at.replace(tzinfo=timezone.utc).astimezone(WIB).isoformat()
+    return {
+        'exercise_name': record['exercise_name'],
+        'best_weight': record.get('best_weight'),
+        'best_volume': record.get('best_volume'),
+        'best_e1rm': record.get('best_e1rm'),
+        'reps_by_weight': reps_by_weight,
+        'last_logged_at': last_logged_at
+    }
+
+def get_personal_records(user_id: str, exercise_name: str = None) -> list:
+    """
+    Get a user's personal records (all exercises or one), by exercise name
+    """
+    collection = get_personal_records_collection()
+
+    if exercise_name:
+        record = collection.find_one({'user_id': user_id, 'exercise_name': exercise_name})
+        return [record_to_json(record)] if record else []
+
+    records = collection.find({'user_id': user_id}).sort('exercise_name', ASCENDING)
+    return [record_to_json(record) for record in records]
@@ -0,0 +1,282 @@
+"""
+Workout Rollups
+Day/week/month buckets of sets, reps, volume and session count per user,
+kept current as sets are logged and sessions end. Dashboards read a few
+bucket documents instead of joining every set with the exercise catalog.
+
+Every bucket is stored at three levels: the user's total, per muscle group
+and per exercise. Buckets follow WIB calendar days (weeks start Monday).
+Sets are bucketed by their timestamp, sessions by their start time.
+"""
+from database import MongoDB
+from models.workout_set import WIB
+from pymongo import ASCENDING, IndexModel, UpdateOne
+from datetime import datetime, timedelta, timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+ROLLUPS_COLLECTION = 'workout_rollups'
+
+PERIODS = ('day', 'week', 'month')
+LEVELS = ('total', 'muscle_group', 'exercise')
+
+# Muscle group of exercises that are not in the catalog
+UNKNOWN_MUSCLE_GROUP = 'Other'
+
+ROLLUP_INDEXES = [
+    # One document per bucket; also serves the dashboard range queries
+    IndexModel(
+        [('user_id', ASCENDING), ('period', ASCENDING), ('level', ASCENDING),
+         ('bucket_start', ASCENDING), ('muscle_group', ASCENDING), ('exercise_name', ASCENDING)],
+        name='user_period_level_bucket_unique',
+        unique=True
+    ),
+]
+
+ROLLUP_AUDITED_QUERIES = [
+    {
+        'name': 'GET /api/analytics/volume',
+        'command': {
+            'find': ROLLUPS_COLLECTION,
+            'filter': {
+                'user_id': 'sample', 'period': 'week', 'level': 'muscle_group',
+                'bucket_start': {'$gte': datetime(2030, 1, 1)}
+            },
+            'sort': {'bucket_start': 1}
+        }
+    },
+]
+
+def get_rollups_collection():
+    """Get workout rollups collection"""
+    db = MongoDB.get_db()
+    return db[ROLLUPS_COLLECTION]
+
+def bucket_start(timestamp: datetime, period: str) -> datetime:
+    """
+    Start of the WIB day/week/month containing a (naive UTC) timestamp,
+    returned as naive UTC like every stored datetime
+    """
+    local = timestamp.replace(tzinfo=timezone.utc).astimezone(WIB)
+    start = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == 'week':
+        start -= timedelta(days=start.weekday())
+    elif period == 'month':
+        start = start.replace(day=1)
+    return start.astimezone(timezone.utc).replace(tzinfo=None)
+
+def bucket_label(start: datetime, period: str) -> str:
+    """Readable bucket name: 2026-10-18, 2026-W42 or 2026-10"""
+    local = start.replace(tzinfo=timezone.utc).astimezone(WIB)
+    if period == 'week':
+        year, week, _ = local.isocalendar()
+        return f"{year}-W{week:02d}"
+    if period == 'month':
+        return local.strftime('%Y-%m')
+    return local.strftime('%Y-%m-%d')
+
+def _muscle_groups():
+    """Exercise name -> muscle group, from the in-process catalog cache"""
+    from services.catalog_service import catalog_cache
+
+    return catalog_cache.get().muscle_group_by_exercise
+
+def _bucket_keys(user_id, timestamp, muscle_group, exercise_name):
+    """Keys of every bucket document (period x level) a fact belongs to"""
+    for period in PERIODS:
+        start = bucket_start(timestamp, period)
+        yield (user_id, period, 'total', start, None, None)
+        yield (user_id, period, 'muscle_group', start, muscle_group, None)
+        yield (user_id, period, 'exercise', start, muscle_group, exercise_name)
+
+def _key_filter(key) -> dict:
+    user_id, period, level, start, muscle_group, exercise_name = key
+    return {
+        'user_id': user_id,
+        'period': period,
+        'level': level,
+        'bucket_start': start,
+        'muscle_group': muscle_group,
+        'exercise_name': exercise_name
+    }
+
+def set_increments(workout_sets, muscle_groups=None) -> dict:
+    """
+    Fold sets into bucket increments
+
+    Args:
+        workout_sets: WorkoutSet objects with user_id set
+        muscle_groups: Exercise -> muscle group map (defaults to the catalog)
+
+    Returns:
+        dict of bucket key -> {'sets', 'reps', 'volume'} increments
+    """
+    muscle_groups = muscle_groups if muscle_groups is not None else _muscle_groups()
+    increments = {}
+    for workout_set in workout_sets:
+        if not workout_set.user_id:
+            continue
+        muscle_group = muscle_groups.get(workout_set.exercise_name) or UNKNOWN_MUSCLE_GROUP
+        for key in _bucket_keys(workout_set.user_id, workout_set.timestamp, muscle_group, workout_set.exercise_name):
+            inc = increments.setdefault(key, {'sets': 0, 'reps': 0, 'volume': 0})
+            inc['sets'] += 1
+            inc['reps'] += workout_set.reps
+            inc['volume'] += workout_set.weight * workout_set.reps
+    return increments
+
+def session_increments(sessions, muscle_groups=None) -> dict:
+    """
+    Count ended sessions once per bucket at every level they touch
+
+    Args:
+        sessions: Session documents (user_id, started_at, exercises_performed)
+        muscle_groups: Exercise -> muscle group map (defaults to the catalog)
+
+    Returns:
+        dict of bucket key -> {'sessions'} increments
+    """
+    muscle_groups = muscle_groups if muscle_groups is not None else _muscle_groups()
+    increments = {}
+    for session in sessions:
+        keys = set()
+        for entry in session.get('exercises_performed') or []:
+            exercise_name = entry['exercise']
+            muscle_group = muscle_groups.get(exercise_name) or UNKNOWN_MUSCLE_GROUP
+            keys.update(_bucket_keys(session['user_id'], session['started_at'], muscle_group, exercise_name))
+        for key in keys:
+            inc = increments.setdefault(key, {'sessions': 0})
+            inc['sessions'] += 1
+    return increments
+
+def increment_requests(increments: dict) -> list:
+    """Upserts applying bucket increments"""
+    return [
+        UpdateOne(_key_filter(key), {'$inc': inc}, upsert=True)
+        for key, inc in increments.items()
+    ]
+
+def apply_increments(increments: dict):
+    """Upsert all bucket increments with one unordered bulk write"""
+    if not increments:
+        return
+    get_rollups_collection().bulk_write(increment_requests(increments), ordered=False)
+
+def record_set_rollups(workout_sets):
+    """Add logged sets to their buckets (logging path; never raises)"""
+    try:
+        apply_increments(set_increments(workout_sets))
+    except Exception as e:
+        logger.error(f"❌ Error updating rollups for logged sets: {e}")
+
+def record_session_rollups(session: dict):
+    """Count an ended session in its buckets (end_session; never raises)"""
+    try:
+        apply_increments(session_increments([session]))
+    except Exception as e:
+        logger.error(f"❌ Error updating rollups for session {session.get('_id')}: {e}")
+
+def get_rollups(user_id: str, period: str, level: str, since: datetime, muscle_group: str = None) -> list:
+    """
+    Read the buckets of one level from ``since`` onwards, oldest first
+
+    Raises:
+        ValueError: If period or level is unknown
+    """
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of: {', '.join(PERIODS)}")
+    if level not in LEVELS:
+        raise ValueError(f"group_by must be one of: {', '.join(LEVELS)}")
+
+    query = {
+        'user_id': user_id,
+        'period': period,
+        'level': level,
+        'bucket_start': {'$gte': bucket_start(since, period)}
+    }
+    if muscle_group:
+        query['muscle_group'] = muscle_group
+
+    rows = []
+    for doc in get_rollups_collection().find(query).sort('bucket_start', ASCENDING):
+        start = doc['bucket_start']
+        rows.append({
+            'bucket': bucket_label(start, period),
+            'bucket_start': start.replace(tzinfo=timezone.utc).astimezone(WIB).isoformat(),
+            'muscle_group': doc.get('muscle_group'),
+            'exercise_name': doc.get('exercise_name'),
+            'sets': doc.get('sets', 0),
+            'reps': doc.get('reps', 0),
+            'volume': doc.get('volume', 0),
+            'sessions': doc.get('sessions', 0)
+        })
+    return rows
+
+REBUILD_SET_PROJECTION = {
+    'session_id': 1, 'exercise_name': 1, 'weight': 1, 'reps': 1,
+    'timestamp': 1, 'user_id': 1
+}
+
+def _id_batches(collection, query, projection, batch_size, convert=lambda doc: doc):
+    """Yield lists of documents in _id order"""
+    last_id = None
+    while True:
+        page_query = dict(query, _id={'$gt': last_id}) if last_id else query
+        docs = list(collection.find(page_query, projection).sort('_id', 1).limit(batch_size))
+        if not docs:
+            return
+        last_id = docs[-1]['_id']
+        yield [convert(doc) for doc in docs]
+
+def rebuild_rollups(user_id=None, batch_size=1000):
+    """
+    Recompute the rollups of one user (or all users) from sets and sessions
+
+    Deletes the affected buckets, then re-adds every set (in _id order, in
+    batches) and every ended session. Sets logged by the same users while
+    it runs can be counted twice or not at all.
+    """
+    from database import get_sessions_collection
+    from database.workout_sets import (
+        get_workout_sets_collection,
+        storage_filter,
+        storage_projection,
+        from_storage
+    )
+    from models.workout_set import WorkoutSet
+
+    scope = {'user_id': user_id} if user_id else {}
+    muscle_groups = _muscle_groups()
+
+    deleted = get_rollups_collection().delete_many(scope).deleted_count
+    logger.info(f"🗑️  Deleted {deleted} rollup documents")
+
+    # Session owners, for sets logged before sets stored user_id
+    sessions_collection = get_sessions_collection()
+    owners = {
+        str(doc['_id']): doc.get('user_id')
+        for doc in sessions_collection.find(scope, {'user_id': 1})
+    }
+
+    set_query = storage_filter({'session_id': {'$in': list(owners)}}) if user_id else {}
+    processed = 0
+    for docs in _id_batches(get_workout_sets_collection(), set_query, storage_projection(REBUILD_SET_PROJECTION),
+                            batch_size, convert=from_storage):
+        workout_sets = []
+        for doc in docs:
+            workout_set = WorkoutSet.from_dict(doc)
+            workout_set.user_id = workout_set.user_id or owners.get(doc['session_id'])
+            workout_sets.append(workout_set)
+        apply_increments(set_increments(workout_sets, muscle_groups))
+        processed += len(docs)
+        logger.info(f"✅ Added {processed} sets")
+
+    session_query = dict(scope, is_active=False)
+    session_projection = {'user_id': 1, 'started_at': 1, 'exercises_performed': 1}
+    sessions = 0
+    for docs in _id_batches(sessions_collection, session_query, session_projection, batch_size):
+        apply_increments(session_increments(docs, muscle_groups))
+        sessions += len(docs)
+    logger.info(f"✅ Added {sessions} sessions")
+
+    logger.info(f"🏁 Rollups rebuilt from {processed} sets and {sessions} sessions")
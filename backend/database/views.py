@@ -0,0 +1,109 @@
+"""
+Document Views
+Read-only views returned by the list endpoints. A view holds the document
+exactly as the driver decoded it (only the projected fields) and shapes it
+for the response when the JSON provider serializes it, so listings build
+no model objects and convert nothing up front. ObjectId and datetimes are
+rendered by the encoder itself (see json_provider).
+"""
+from database.workout_sets import WORKOUT_SET_FIELDS, from_storage
+
+
+class DocumentView:
+    """Stored document plus the response fields to keep (None: all)"""
+
+    __slots__ = ('doc', 'fields')
+
+    # Stored fields of a full response (the projection when fields is None)
+    FIELDS = ()
+    # Stored fields loaded for every response (derived fields, cursors)
+    REQUIRED = ()
+    # Derived response field -> stored fields it is computed from
+    DERIVED = {}
+    # Value of a requested field the document does not have
+    DEFAULTS = {}
+
+    def __init__(self, doc, fields=None):
+        self.doc = doc
+        self.fields = fields
+
+    @classmethod
+    def projection(cls, fields=None) -> dict:
+        """Stored fields to load for a response with the given fields"""
+        names = cls.FIELDS if fields is None else set(fields) | set(cls.REQUIRED)
+        return {name: 1 for name in names}
+
+    def __getitem__(self, key):
+        return self.doc[key]
+
+    def shape(self, doc) -> dict:
+        """Add derived fields in place (must be safe to call twice)"""
+        return doc
+
+    def to_json(self) -> dict:
+        """Response dict, built when the view is serialized"""
+        doc = self.doc
+        for name, value in self.DEFAULTS.items():
+            if self.fields is None or name in self.fields:
+                doc.setdefault(name, value)
+        doc = self.shape(doc)
+        if self.fields is None:
+            return doc
+        keep = self.fields | {'_id'}
+        keep.update(name for name, sources in self.DERIVED.items() if self.fields.issuperset(sources))
+        return {key: value for key, value in doc.items() if key in keep}
+
+
+class SessionView(DocumentView):
+    """Session history row (same fields as Session.to_json)"""
+
+    __slots__ = ()
+
+    FIELDS = (
+        'user_id', 'session_type', 'started_at', 'ended_at', 'total_sets',
+        'total_volume', 'exercises_performed'
+    )
+    REQUIRED = ('started_at', 'ended_at')
+    DERIVED = {'duration_minutes': ('started_at', 'ended_at')}
+    DEFAULTS = {
+        'user_id': None, 'session_type': None, 'started_at': None, 'ended_at': None,
+        'total_sets': 0, 'total_volume': 0, 'exercises_performed': ()
+    }
+
+    def shape(self, doc):
+        started_at = doc.get('started_at')
+        ended_at = doc.get('ended_at')
+        doc['is_active'] = ended_at is None
+        if ended_at and started_at:
+            doc['duration_minutes'] = round((ended_at - started_at).total_seconds() / 60, 1)
+        return doc
+
+
+class WorkoutView(DocumentView):
+    """Workout history row (same fields as Workout.to_json)"""
+
+    __slots__ = ()
+
+    FIELDS = ('weight', 'reps', 'sets', 'feeling', 'progress_state', 'advice', 'color', 'created_at')
+    DEFAULTS = {
+        'weight': None, 'reps': None, 'sets': None, 'feeling': None,
+        'progress_state': '', 'advice': '', 'color': '', 'created_at': None
+    }
+
+    def shape(self, doc):
+        if '_id' in doc:
+            doc['id'] = doc.pop('_id')
+        return doc
+
+
+class WorkoutSetView(DocumentView):
+    """Workout set listing row (either storage layout)"""
+
+    __slots__ = ()
+
+    FIELDS = WORKOUT_SET_FIELDS
+    # The page cursor is built from the timestamp
+    REQUIRED = ('timestamp',)
+
+    def shape(self, doc):
+        return from_storage(doc)
@@ -3,17 +3,347 @@ Workout Sets Database Operations
 """
 from database import MongoDB
 from config import Config
+from models.strength import estimated_1rm
 from models.workout_set import WorkoutSet
+from database.rollups import record_set_rollups
+from database.pagination import encode_cursor, keyset_filter, page_sort
 from bson import ObjectId
-from datetime import datetime
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument
+from pymongo.errors import BulkWriteError
 import logging
 
 logger = logging.getLogger(__name__)
 
+STANDARD_COLLECTION = 'workout_sets'
+
+# Storage layout: 'standard' (one document per set) or 'timeseries'
+# (MongoDB time-series collection, see migrate_workout_sets.py)
+TIMESERIES = Config.WORKOUT_SETS_STORAGE == 'timeseries'
+WORKOUT_SETS_COLLECTION = Config.WORKOUT_SETS_TIMESERIES_COLLECTION if TIMESERIES else STANDARD_COLLECTION
+
+# Set fields stored under the metaField in the time-series layout
+META_FIELD = 'meta'
+META_FIELDS = ('session_id', 'user_id', 'exercise_name')
+
+TIMESERIES_OPTIONS = {
+    'timeField': 'timestamp',
+    'metaField': META_FIELD,
+    'granularity': Config.WORKOUT_SETS_TIMESERIES_GRANULARITY
+}
+
+def set_field(name: str, timeseries: bool = TIMESERIES) -> str:
+    """Storage path of a set field in the given layout"""
+    return f"{META_FIELD}.{name}" if timeseries and name in META_FIELDS else name
+
+def storage_filter(query: dict, timeseries: bool = TIMESERIES) -> dict:
+    """Map the top-level field names of a set query to the storage layout"""
+    return {set_field(key, timeseries): value for key, value in query.items()}
+
+def storage_projection(projection, timeseries: bool = TIMESERIES):
+    """Map a set projection to the storage layout"""
+    if projection is None:
+        return None
+    return {set_field(key, timeseries): value for key, value in projection.items()}
+
+def to_storage(doc: dict, timeseries: bool = TIMESERIES) -> dict:
+    """Convert a flat set document to the storage layout"""
+    if not timeseries:
+        return doc
+    doc = dict(doc)
+    doc[META_FIELD] = {field: doc.pop(field, None) for field in META_FIELDS}
+    return doc
+
+def from_storage(doc: dict) -> dict:
+    """Convert a stored set document (either layout) to the flat form"""
+    if doc is not None and isinstance(doc.get(META_FIELD), dict):
+        doc.update(doc.pop(META_FIELD))
+    return doc
+
+def _workout_set_indexes(timeseries: bool) -> list:
+    """Indexes backing the query helpers below, per layout"""
+    f = lambda name: set_field(name, timeseries)
+    indexes = [
+        # get_last_set_for_exercise / count_sets_for_exercise
+        IndexModel(
+            [(f('session_id'), ASCENDING), (f('exercise_name'), ASCENDING), ('timestamp', DESCENDING)],
+            name='session_exercise_timestamp'
+        ),
+    ]
+    if timeseries:
+        # Time-series collections support neither unique indexes nor _id in
+        # secondary indexes; idempotency then rests on the lookup alone
+        indexes += [
+            IndexModel([(f('session_id'), ASCENDING), ('timestamp', ASCENDING)], name='session_timestamp'),
+            IndexModel([('idempotency_key', ASCENDING)], name='idempotency_key'),
+        ]
+    else:
+        indexes += [
+            # get_session_workout_sets(_page) / update_session_stats
+            IndexModel(
+                [('session_id', ASCENDING), ('timestamp', ASCENDING), ('_id', ASCENDING)],
+                name='session_timestamp_id'
+            ),
+            # record_workout_sets_batch idempotency
+            IndexModel(
+                [('idempotency_key', ASCENDING)],
+                name='idempotency_key_unique',
+                unique=True,
+                partialFilterExpression={'idempotency_key': {'$type': 'string'}}
+            ),
+        ]
+    return indexes
+
+# Indexes of the active layout (applied by database.indexes)
+WORKOUT_SET_INDEXES = _workout_set_indexes(TIMESERIES)
+TIMESERIES_INDEXES = _workout_set_indexes(True)
+
+# Indexes replaced by the ones above (dropped by database.indexes)
+WORKOUT_SET_OBSOLETE_INDEXES = [] if TIMESERIES else ['session_timestamp']
+
+# Fields selectable with fields= on set listings
+WORKOUT_SET_FIELDS = (
+    'session_id', 'exercise_name', 'weight', 'reps', 'rpe',
+    'notes', 'set_number', 'timestamp', 'volume'
+)
+
+# Representative queries checked by the index audit
+WORKOUT_SET_AUDITED_QUERIES = [
+    {
+        'name': 'get_session_workout_sets',
+        'command': {
+            'find': WORKOUT_SETS_COLLECTION,
+            'filter': storage_filter({'session_id': 'sample', 'user_id': 'sample'}),
+            'sort': {'timestamp': 1, '_id': 1},
+            'limit': 201
+        }
+    },
+    {
+        'name': 'get_last_set_for_exercise',
+        'command': {
+            'find': WORKOUT_SETS_COLLECTION,
+            'filter': storage_filter({'session_id': 'sample', 'user_id': 'sample', 'exercise_name': 'Bench Press'}),
+            'sort': {'timestamp': -1},
+            'limit': 1
+        }
+    },
+    {
+        'name': 'count_sets_for_exercise',
+        'command': {
+            'count': WORKOUT_SETS_COLLECTION,
+            'query': storage_filter({'session_id': 'sample', 'user_id': 'sample', 'exercise_name': 'Bench Press'})
+        }
+    },
+    {
+        'name': 'record_workout_sets_batch (idempotency lookup)',
+        'command': {'find': WORKOUT_SETS_COLLECTION, 'filter': {'idempotency_key': {'$type': 'string', '$in': ['sample']}}}
+    },
+]
+
 def get_workout_sets_collection():
-    """Get workout sets collection"""
+    """Get workout sets collection (of the active layout)"""
     db = MongoDB.get_db()
-    return db['workout_sets']
+    return db[WORKOUT_SETS_COLLECTION]
+
+def ensure_timeseries_collection(db=None, name: str = None):
+    """
+    Create the time-series collection for workout sets if it does not exist
+
+    Returns:
+        True if the collection was created
+    """
+    db = db if db is not None else MongoDB.get_db()
+    name = name or Config.WORKOUT_SETS_TIMESERIES_COLLECTION
+    if name in db.list_collection_names(filter={'name': name}):
+        return False
+    db.create_collection(name, timeseries=TIMESERIES_OPTIONS)
+    logger.info(f"✅ Created time-series collection {name}")
+    return True
+
+def set_document(workout_set: WorkoutSet) -> dict:
+    """Build the MongoDB document for a workout set (in the storage layout)"""
+    return to_storage({
+        'session_id': workout_set.session_id,
+        'exercise_name': workout_set.exercise_name,
+        'weight': workout_set.weight,
+        'reps': workout_set.reps,
+        'rpe': workout_set.rpe,
+        'notes': workout_set.notes,
+        'set_number': workout_set.set_number,
+        'timestamp': workout_set.timestamp,
+        'volume': workout_set.weight * workout_set.reps,
+        'user_id': workout_set.user_id
+    })
+
+def session_object_id(session_id: str) -> ObjectId:
+    """Parse a session id, raising ValueError for malformed ids"""
+    try:
+        return ObjectId(session_id)
+    except (InvalidId, TypeError):
+        raise ValueError(f"Invalid session_id: {session_id}")
+
+def exercise_summary(exercise_name: str, sets: int, total_reps: int, total_volume: float,
+                      max_weight: float, best_e1rm: float, last_set_number: int = None) -> dict:
+    """
+    Entry of a session's ``exercises_performed`` array
+
+    ``sets`` counts the exercise's stored sets; ``last_set_number`` is the
+    highest set number handed out so far (``sets`` by default).
+    """
+    return {
+        'exercise': exercise_name,
+        'sets': sets,
+        'total_reps': total_reps,
+        'total_volume': total_volume,
+        'max_weight': max_weight,
+        'best_e1rm': best_e1rm,
+        'last_set_number': sets if last_set_number is None else last_set_number
+    }
+
+def reserve_operations(session_oid: ObjectId, user_id: str, exercise_name: str, workout_sets: list) -> list:
+    """
+    find_one_and_update calls (filter, update, options) that reserve set
+    numbers for sets of one exercise and fold them into the user's session
+    (a session of another user matches neither filter)
+
+    The first rewrites the exercise's entry in ``exercises_performed`` with
+    an update pipeline (counts and volume added, max weight and best
+    estimated 1RM kept at their maximum), together with the session totals.
+    The second, for the first sets of an exercise, pushes a new entry
+    instead. The entry's ``last_set_number`` is the set number counter;
+    ``sets`` stays a count of stored sets (release_operation gives it back).
+    Entries written before last_set_number existed start the counter from
+    ``sets`` inside the same atomic update.
+    """
+    count = len(workout_sets)
+    total_reps = sum(ws.reps for ws in workout_sets)
+    total_volume = sum(ws.weight * ws.reps for ws in workout_sets)
+    max_weight = max(ws.weight for ws in workout_sets)
+    best_e1rm = round(max(estimated_1rm(ws.weight, ws.reps) for ws in workout_sets), 2)
+    totals = {'total_sets': count, 'total_volume': total_volume}
+    updated_entry = {
+        'exercise': '$$entry.exercise',
+        'sets': {'$add': ['$$entry.sets', count]},
+        'total_reps': {'$add': ['$$entry.total_reps', total_reps]},
+        'total_volume': {'$add': ['$$entry.total_volume', total_volume]},
+        'max_weight': {'$max': ['$$entry.max_weight', max_weight]},
+        'best_e1rm': {'$max': ['$$entry.best_e1rm', best_e1rm]},
+        'last_set_number': {'$add': [{'$ifNull': ['$$entry.last_set_number', '$$entry.sets']}, count]}
+    }
+    
+    return [
+        (
+            {'_id': session_oid, 'user_id': user_id, 'exercises_performed.exercise': exercise_name},
+            [{'$set': {
+                'total_sets': {'$add': [{'$ifNull': ['$total_sets', 0]}, count]},
+                'total_volume': {'$add': [{'$ifNull': ['$total_volume', 0]}, total_volume]},
+                'exercises_performed': {'$map': {
+                    'input': '$exercises_performed',
+                    'as': 'entry',
+                    'in': {'$cond': [
+                        {'$eq': ['$$entry.exercise', {'$literal': exercise_name}]},
+                        updated_entry,
+                        '$$entry'
+                    ]}
+                }}
+            }}],
+            {
+                'projection': {'user_id': 1, 'exercises_performed': {'$elemMatch': {'exercise': exercise_name}}},
+                'return_document': ReturnDocument.AFTER
+            }
+        ),
+        (
+            {'_id': session_oid, 'user_id': user_id, 'exercises_performed.exercise': {'$ne': exercise_name}},
+            {
+                '$inc': totals,
+                '$push': {'exercises_performed': exercise_summary(
+                    exercise_name, count, total_reps, total_volume, max_weight, best_e1rm
+                )}
+            },
+            {'projection': {'user_id': 1}}
+        )
+    ]
+
+def reserved_set_number(session: dict, count: int):
+    """
+    (first reserved set number, session user_id) from the session returned
+    by a reserve_operations update
+    """
+    if session.get('exercises_performed'):
+        last = session['exercises_performed'][0]['last_set_number']
+        return last - count + 1, session.get('user_id')
+    return 1, session.get('user_id')
+
+def _reserve_sets(sessions_collection, session_oid: ObjectId, user_id: str, exercise_name: str, workout_sets: list):
+    """
+    Reserve set numbers for sets of one exercise (see reserve_operations)
+
+    If another request pushed the exercise's entry between the two updates,
+    the entry update is retried.
+
+    Returns:
+        (first reserved set number, session user_id), or None if the
+        session does not exist or belongs to another user
+    """
+    operations = reserve_operations(session_oid, user_id, exercise_name, workout_sets)
+    
+    for _ in range(2):
+        for query, update, options in operations:
+            session = sessions_collection.find_one_and_update(query, update, **options)
+            if session is not None:
+                return reserved_set_number(session, len(workout_sets))
+    
+    return None
+
+def release_operation(session_oid: ObjectId, exercise_name: str, workout_sets: list):
+    """
+    update_one call (filter, update, options) giving back the counts and
+    volume of sets that could not be written. Set numbers are not reused
+    (last_set_number stays, a gap is harmless) and maxima are kept.
+    """
+    total_reps = sum(ws.reps for ws in workout_sets)
+    total_volume = sum(ws.weight * ws.reps for ws in workout_sets)
+    return (
+        {'_id': session_oid},
+        {'$inc': {
+            'total_sets': -len(workout_sets),
+            'total_volume': -total_volume,
+            'exercises_performed.$[entry].sets': -len(workout_sets),
+            'exercises_performed.$[entry].total_reps': -total_reps,
+            'exercises_performed.$[entry].total_volume': -total_volume
+        }},
+        {'array_filters': [{'entry.exercise': exercise_name}]}
+    )
+
+def _release_sets(sessions_collection, session_oid: ObjectId, exercise_name: str, workout_sets: list):
+    """Give back the totals of sets that could not be written"""
+    query, update, options = release_operation(session_oid, exercise_name, workout_sets)
+    sessions_collection.update_one(query, update, **options)
+
+def record_groups(workout_sets: list) -> dict:
+    """Sets with an owner by (user_id, exercise_name), in the order they were performed"""
+    groups = {}
+    for workout_set in workout_sets:
+        if workout_set.user_id:
+            groups.setdefault((workout_set.user_id, workout_set.exercise_name), []).append(workout_set)
+    for group in groups.values():
+        group.sort(key=lambda ws: (ws.timestamp, ws.set_number))
+    return groups
+
+def _update_records(workout_sets: list):
+    """
+    Fold written sets into their owners' personal records and flag the
+    sets that beat one. A failure here does not fail the logging request;
+    the records can be rebuilt with backfill_personal_records.py.
+    """
+    from database.personal_records import update_personal_records
+    
+    for (user_id, exercise_name), group in record_groups(workout_sets).items():
+        try:
+            for workout_set, beaten in zip(group, update_personal_records(user_id, exercise_name, group)):
+                workout_set.new_records = beaten
+        except Exception as e:
+            logger.error(f"❌ Error updating personal records for {exercise_name}: {e}")
 
 def log_workout_set(workout_set: WorkoutSet) -> WorkoutSet:
     """
@@ -23,23 +353,13 @@ def log_workout_set(workout_set: WorkoutSet) -> WorkoutSet:
         collection = get_workout_sets_collection()
         
         # Prepare document
-        doc = {
-            'session_id': workout_set.session_id,
-            'exercise_name': workout_set.exercise_name,
-            'weight': workout_set.weight,
-            'reps': workout_set.reps,
-            'rpe': workout_set.rpe,
-            'notes': workout_set.notes,
-            'set_number': workout_set.set_number,
-            'timestamp': workout_set.timestamp,
-            'volume': workout_set.weight * workout_set.reps
-        }
+        doc = set_document(workout_set)
         
         # Insert
         result = collection.insert_one(doc)
         workout_set._id = result.inserted_id
         
-        logger.info(f"✅ Logged workout set: {workout_set.exercise_name} - {workout_set.weight}kg x {workout_set.reps}")
+        logger.debug("✅ Logged workout set: %s - %skg x %s", workout_set.exercise_name, workout_set.weight, workout_set.reps)
         
         return workout_set
         
@@ -47,6 +367,203 @@ def log_workout_set(workout_set: WorkoutSet) -> WorkoutSet:
         logger.error(f"❌ Error logging workout set: {e}")
         raise e
 
+def record_workout_set(workout_set: WorkoutSet, user_id: str) -> WorkoutSet:
+    """
+    Log a workout set and update its session in constant time
+
+    The next set number for (session, exercise), the session totals and the
+    exercise's summary in ``exercises_performed`` are bumped in one atomic
+    update on the session document, then the set is inserted. Concurrent
+    submissions for the same exercise always get distinct set numbers, and
+    the cost does not depend on how many sets the session already has.
+    The same update checks that the session belongs to user_id.
+
+    Returns:
+        The saved set, or None if the session does not exist or belongs
+        to another user
+
+    Raises:
+        ValueError: If the session id is malformed
+    """
+    from database import get_sessions_collection
+    
+    session_oid = session_object_id(workout_set.session_id)
+    
+    try:
+        sessions_collection = get_sessions_collection()
+        collection = get_workout_sets_collection()
+        
+        # Reserve set number and update totals and exercise summary
+        reserved = _reserve_sets(sessions_collection, session_oid, user_id, workout_set.exercise_name, [workout_set])
+        if reserved is None:
+            return None
+        
+        workout_set.set_number, workout_set.user_id = reserved
+        
+        try:
+            result = collection.insert_one(set_document(workout_set))
+        except Exception:
+            _release_sets(sessions_collection, session_oid, workout_set.exercise_name, [workout_set])
+            raise
+        workout_set._id = result.inserted_id
+        
+        _update_records([workout_set])
+        record_set_rollups([workout_set])
+        
+        logger.debug("✅ Logged workout set #%s: %s - %skg x %s", workout_set.set_number, workout_set.exercise_name, workout_set.weight, workout_set.reps)
+        
+        return workout_set
+        
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error recording workout set: {e}")
+        raise e
+
+def record_workout_sets_batch(items: list, user_id: str) -> list:
+    """
+    Log many workout sets at once (offline sync)
+
+    Items already stored under the same idempotency key are reported as
+    duplicates instead of being inserted again. Set numbers are reserved
+    with one atomic update per (session, exercise), assigned in
+    (timestamp, position) order, and all new sets are written with a single
+    unordered insert_many.
+
+    Args:
+        items: List of (index, WorkoutSet, idempotency_key or None) tuples
+        user_id: Owner of the sessions; items for another user's session
+            fail with "Session not found"
+
+    Returns:
+        List of result dicts (index, status, set or error), in input order
+    """
+    from database import get_sessions_collection
+    
+    try:
+        sessions_collection = get_sessions_collection()
+        collection = get_workout_sets_collection()
+        results = {}
+        
+        # Drop items that were already stored (or repeated in this batch)
+        keys = [key for _, _, key in items if key]
+        existing = {}
+        if keys:
+            # $type matches the partial index filter so the index is usable
+            for doc in collection.find({'idempotency_key': {'$type': 'string', '$in': keys}}):
+                existing[doc['idempotency_key']] = from_storage(doc)
+        
+        pending = []
+        seen_keys = set()
+        for index, workout_set, key in items:
+            if key and key in existing:
+                results[index] = {
+                    'index': index,
+                    'status': 'duplicate',
+                    'set': WorkoutSet.from_dict(existing[key]).to_json()
+                }
+            elif key and key in seen_keys:
+                results[index] = {'index': index, 'status': 'duplicate', 'set': None}
+            else:
+                if key:
+                    seen_keys.add(key)
+                pending.append((index, workout_set, key))
+        
+        # Group by session, keeping a deterministic order inside each session
+        by_session = {}
+        for item in pending:
+            by_session.setdefault(item[1].session_id, []).append(item)
+        
+        docs = []
+        doc_items = []
+        for session_id, session_items in by_session.items():
+            session_items.sort(key=lambda item: (item[1].timestamp, item[0]))
+            
+            try:
+                session_oid = session_object_id(session_id)
+            except ValueError as e:
+                for index, _, _ in session_items:
+                    results[index] = {'index': index, 'status': 'error', 'error': str(e)}
+                continue
+            
+            # Reserve a block of set numbers per exercise and fold it into the session
+            by_exercise = {}
+            for item in session_items:
+                by_exercise.setdefault(item[1].exercise_name, []).append(item)
+            
+            for exercise_name, exercise_items in by_exercise.items():
+                reserved = _reserve_sets(
+                    sessions_collection, session_oid, user_id, exercise_name,
+                    [ws for _, ws, _ in exercise_items]
+                )
+                if reserved is None:
+                    for index, _, _ in exercise_items:
+                        results[index] = {
+                            'index': index,
+                            'status': 'error',
+                            'error': f"Session not found: {session_id}"
+                        }
+                    continue
+                
+                set_number, user_id = reserved
+                for index, workout_set, key in exercise_items:
+                    workout_set.set_number = set_number
+                    workout_set.user_id = user_id
+                    set_number += 1
+                    
+                    doc = set_document(workout_set)
+                    if key:
+                        doc['idempotency_key'] = key
+                    docs.append(doc)
+                    doc_items.append((index, workout_set, key, session_oid))
+        
+        # Single unordered write for every new set
+        failed = {}
+        if docs:
+            try:
+                collection.insert_many(docs, ordered=False)
+            except BulkWriteError as e:
+                for error in e.details.get('writeErrors', []):
+                    failed[error['index']] = error
+        
+        # Give back totals of sets that could not be written
+        refunds = {}
+        written = []
+        for position, (index, workout_set, key, session_oid) in enumerate(doc_items):
+            if position in failed:
+                error = failed[position]
+                if error.get('code') == 11000 and key:
+                    results[index] = {'index': index, 'status': 'duplicate', 'set': None}
+                else:
+                    results[index] = {'index': index, 'status': 'error', 'error': error.get('errmsg', 'Write failed')}
+                refunds.setdefault((session_oid, workout_set.exercise_name), []).append(workout_set)
+            else:
+                workout_set._id = docs[position]['_id']
+                written.append((index, workout_set))
+        
+        for (session_oid, exercise_name), workout_sets in refunds.items():
+            _release_sets(sessions_collection, session_oid, exercise_name, workout_sets)
+        
+        _update_records([workout_set for _, workout_set in written])
+        record_set_rollups([workout_set for _, workout_set in written])
+        for index, workout_set in written:
+            results[index] = {
+                'index': index,
+                'status': 'created',
+                'set': workout_set.to_json(),
+                'is_pr': bool(workout_set.new_records),
+                'new_records': workout_set.new_records
+            }
+        
+        created = sum(1 for r in results.values() if r['status'] == 'created')
+        logger.info("✅ Batch logged %s/%s workout sets across %s sessions", created, len(items), len(by_session))
+        
+        return [results[index] for index in sorted(results)]
+        
+    except Exception as e:
+        logger.error(f"❌ Error recording workout set batch: {e}")
+        raise e
+
 def get_session_workout_sets(session_id: str) -> list:
     """
     Get all workout sets for a session
@@ -55,14 +572,12 @@ def get_session_workout_sets(session_id: str) -> list:
         collection = get_workout_sets_collection()
         
         sets = list(collection.find(
-            {'session_id': session_id}
+            storage_filter({'session_id': session_id})
         ).sort('timestamp', 1))
         
-        # Convert ObjectId to string
+        # ObjectId and timestamp are rendered by the JSON provider
         for s in sets:
-            s['_id'] = str(s['_id'])
-            if isinstance(s.get('timestamp'), datetime):
-                s['timestamp'] = s['timestamp'].isoformat()
+            from_storage(s)
         
         return sets
         
@@ -70,43 +585,87 @@ def get_session_workout_sets(session_id: str) -> list:
         logger.error(f"❌ Error getting session workout sets: {e}")
         raise e
 
-def get_last_set_for_exercise(session_id: str, exercise_name: str) -> dict:
+def get_session_workout_sets_page(session_id: str, user_id: str, limit: int, cursor: str = None, fields=None):
+    """
+    Get one page of a session's workout sets, oldest first
+
+    Args:
+        session_id: Session ID
+        user_id: Owner of the session (another user's session has no sets)
+        limit: Page size
+        cursor: Opaque cursor from the previous page
+        fields: Optional set of fields to return (see WORKOUT_SET_FIELDS)
+
+    Returns:
+        (list of WorkoutSetView, next cursor or None)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    # database.views builds on this module
+    from database.views import WorkoutSetView
+
+    try:
+        collection = get_workout_sets_collection()
+        
+        query = storage_filter({'session_id': session_id, 'user_id': user_id})
+        if cursor:
+            query.update(keyset_filter('timestamp', cursor, descending=False))
+        
+        projection = storage_projection(WorkoutSetView.projection(fields))
+        
+        # One extra document tells whether there is a next page
+        docs = list(collection.find(query, projection)
+                    .sort(page_sort('timestamp', descending=False))
+                    .limit(limit + 1))
+        
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_cursor(docs[-1]['timestamp'], docs[-1]['_id'])
+        
+        return [WorkoutSetView(doc, fields) for doc in docs], next_cursor
+        
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error getting session workout sets page: {e}")
+        raise e
+
+def get_last_set_for_exercise(session_id: str, user_id: str, exercise_name: str) -> dict:
     """
-    Get the last logged set for a specific exercise in a session
+    Get the last logged set for a specific exercise in one of the user's sessions
     """
     try:
         collection = get_workout_sets_collection()
         
         last_set = collection.find_one(
-            {
+            storage_filter({
                 'session_id': session_id,
+                'user_id': user_id,
                 'exercise_name': exercise_name
-            },
+            }),
             sort=[('timestamp', -1)]
         )
         
-        if last_set:
-            last_set['_id'] = str(last_set['_id'])
-            if isinstance(last_set.get('timestamp'), datetime):
-                last_set['timestamp'] = last_set['timestamp'].isoformat()
-        
-        return last_set
+        return from_storage(last_set)
         
     except Exception as e:
         logger.error(f"❌ Error getting last set for exercise: {e}")
         raise e
 
-def count_sets_for_exercise(session_id: str, exercise_name: str) -> int:
+def count_sets_for_exercise(session_id: str, user_id: str, exercise_name: str) -> int:
     """
-    Count the number of sets logged for an exercise in a session
+    Count the number of sets logged for an exercise in one of the user's sessions
     """
     try:
         collection = get_workout_sets_collection()
         
-        count = collection.count_documents({
+        count = collection.count_documents(storage_filter({
             'session_id': session_id,
+            'user_id': user_id,
             'exercise_name': exercise_name
-        })
+        }))
         
         return count
         
@@ -116,36 +675,55 @@ def count_sets_for_exercise(session_id: str, exercise_name: str) -> int:
 
 def update_session_stats(session_id: str):
     """
-    Update session total_sets and total_volume based on logged sets
+    Update session total_sets, total_volume and exercises_performed based on logged sets
+
+    Re-aggregates every set in the session. The logging path keeps these
+    current with record_workout_set; use this only to repair them.
     """
     try:
         from database import get_sessions_collection
-        
         sets_collection = get_workout_sets_collection()
         sessions_collection = get_sessions_collection()
         
-        # Aggregate stats
+        # Aggregate per exercise (e1RM is computed here, from the best set of each rep count)
         pipeline = [
-            {'$match': {'session_id': session_id}},
+            {'$match': storage_filter({'session_id': session_id})},
             {'$group': {
-                '_id': None,
-                'total_sets': {'$sum': 1},
-                'total_volume': {'$sum': '$volume'}
-            }}
+                '_id': {'exercise': f"${set_field('exercise_name')}", 'reps': '$reps'},
+                'sets': {'$sum': 1},
+                'total_volume': {'$sum': '$volume'},
+                'max_weight': {'$max': '$weight'},
+                'last_set_number': {'$max': '$set_number'},
+                'first': {'$min': '$timestamp'}
+            }},
+            {'$sort': {'first': 1}}
         ]
         
-        result = list(sets_collection.aggregate(pipeline))
+        exercises = {}
+        for row in sets_collection.aggregate(pipeline):
+            name, reps = row['_id']['exercise'], row['_id']['reps']
+            entry = exercises.setdefault(name, exercise_summary(name, 0, 0, 0, 0, 0))
+            entry['sets'] += row['sets']
+            entry['total_reps'] += row['sets'] * reps
+            entry['total_volume'] += row['total_volume']
+            entry['max_weight'] = max(entry['max_weight'], row['max_weight'])
+            entry['best_e1rm'] = max(entry['best_e1rm'], round(estimated_1rm(row['max_weight'], reps), 2))
+            # Continue after the highest stored number (there may be gaps)
+            entry['last_set_number'] = max(entry['last_set_number'], row['last_set_number'] or 0)
         
-        if result:
-            stats = result[0]
+        if exercises:
+            exercises_performed = list(exercises.values())
+            total_sets = sum(e['sets'] for e in exercises_performed)
+            total_volume = sum(e['total_volume'] for e in exercises_performed)
             sessions_collection.update_one(
                 {'_id': ObjectId(session_id)},
                 {'$set': {
-                    'total_sets': stats['total_sets'],
-                    'total_volume': stats['total_volume']
+                    'total_sets': total_sets,
+                    'total_volume': total_volume,
+                    'exercises_performed': exercises_performed
                 }}
             )
-            logger.info(f"✅ Updated session stats: {stats['total_sets']} sets, {stats['total_volume']} kg")
+            logger.debug("✅ Updated session stats: %s sets, %s kg", total_sets, total_volume)
         
     except Exception as e:
         logger.error(f"❌ Error updating session stats: {e}")
@@ -0,0 +1,75 @@
+"""
+JSON Provider
+Encodes responses (and raw MongoDB documents) with orjson when it is
+installed, falling back to the stdlib encoder. Both backends render
+ObjectId as its hex string and datetimes as WIB ISO strings; naive
+datetimes are stored UTC, like everywhere else in the app.
+"""
+from flask.json.provider import JSONProvider
+from models.workout_set import wib_isoformat
+from bson import ObjectId
+from datetime import date, datetime
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+def _default(value):
+    """Types neither encoder handles natively"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return wib_isoformat(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    # Document views (database.views) shape themselves here
+    to_json = getattr(value, 'to_json', None)
+    if to_json is not None:
+        return to_json()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    # Datetimes go through _default so they are rendered in WIB
+    _ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj) -> bytes:
+        """Encode to compact JSON bytes"""
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    def loads(data):
+        """Decode JSON (str or bytes)"""
+        return orjson.loads(data)
+else:
+    _encoder = json.JSONEncoder(default=_default, separators=(',', ':'), ensure_ascii=False)
+
+    def dumps(obj) -> bytes:
+        """Encode to compact JSON bytes"""
+        return _encoder.encode(obj).encode('utf-8')
+
+    def loads(data):
+        """Decode JSON (str or bytes)"""
+        return json.loads(data)
+
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider (jsonify, request.get_json) backed by dumps/loads above"""
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
@@ -0,0 +1,189 @@
+"""
+Logging Configuration
+Log records leave the request thread through a bounded queue: the calling
+thread only creates the record, tags it with the request id and applies
+the sampling rules; a QueueListener thread formats (one JSON object per
+line by default) and writes them. Messages are formatted on that thread
+too, so hot paths log with %-style arguments instead of f-strings.
+
+LOG_SAMPLING keeps a fraction of the DEBUG/INFO records of chatty
+loggers, e.g. "database.workout_sets=0.1,services.session_service=0.5"
+(a logger's rule also covers its children). Warnings and errors are
+never sampled; records that do not fit in the queue are dropped and
+counted (evergain_log_records_dropped_total).
+"""
+from config import Config
+import metrics
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+# Request id of the request being served (set by routes.instrumentation)
+request_id = contextvars.ContextVar('request_id', default=None)
+
+# LogRecord attributes that are not "extra" fields
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+
+class RequestIdFilter(logging.Filter):
+    """Tag records with the id of the request being served (on the calling thread)"""
+
+    def filter(self, record):
+        record.request_id = request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of the DEBUG/INFO records of some loggers"""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+        self._by_logger = {}
+
+    def rate(self, name):
+        """Sampling rate of a logger (closest configured ancestor, else 1)"""
+        rate = self._by_logger.get(name)
+        if rate is None:
+            rate, prefix = 1.0, name
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition('.')[0]
+            self._by_logger[name] = rate
+        return rate
+
+    def filter(self, record):
+        if record.levelno > logging.INFO:
+            return True
+        rate = self.rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+def parse_sampling(spec):
+    """'logger=rate,...' -> {logger: rate}"""
+    rates = {}
+    for item in (spec or '').split(','):
+        name, _, rate = item.partition('=')
+        if name.strip() and rate.strip():
+            rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, request id, extras"""
+
+    def format(self, record):
+        entry = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'thread': record.threadName
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """The previous text layout, with the request id"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s')
+
+    def format(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = None
+        return super().format(record)
+
+
+class BackgroundHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread and drops
+    (and counts) records when the queue is full. The listener is started
+    once per process (threads do not survive fork).
+    """
+
+    def __init__(self, target, queue_size):
+        super().__init__(queue.Queue(queue_size))
+        self.target = target
+        self.listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # A queue inherited across fork may hold records and a stale lock
+            self.queue = queue.Queue(self.queue.maxsize)
+            self.listener = logging.handlers.QueueListener(self.queue, self.target, respect_handler_level=True)
+            self.listener.start()
+            self._pid = os.getpid()
+
+    def prepare(self, record):
+        # Formatted on the listener thread; exception text is rendered
+        # there too (the traceback stays valid in-process)
+        return record
+
+    def enqueue(self, record):
+        self._ensure_started()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.log_records_dropped.inc()
+
+    def stop(self):
+        """Flush and stop the listener thread (at exit)"""
+        if self.listener is not None and self._pid == os.getpid():
+            self.listener.stop()
+            self.listener = None
+            self._pid = None
+
+
+def configure_logging():
+    """
+    Route the root logger through the background handler (LOG_LEVEL,
+    LOG_FORMAT json/text, LOG_SAMPLING, LOG_QUEUE_SIZE)
+
+    Returns:
+        The BackgroundHandler
+    """
+    import atexit
+
+    target = logging.StreamHandler(sys.stderr)
+    target.setFormatter(TextFormatter() if Config.LOG_FORMAT == 'text' else JSONFormatter())
+
+    handler = BackgroundHandler(target, Config.LOG_QUEUE_SIZE)
+    handler.addFilter(RequestIdFilter())
+    rates = parse_sampling(Config.LOG_SAMPLING)
+    if rates:
+        handler.addFilter(SamplingFilter(rates))
+
+    # Neither layout shows process fields; skip collecting them per record
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(Config.LOG_LEVEL)
+
+    atexit.register(handler.stop)
+    return handler
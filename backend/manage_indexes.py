@@ -0,0 +1,52 @@
+"""
+Create MongoDB indexes and audit query plans
+Usage:
+    python manage_indexes.py ensure   # create all declared indexes
+    python manage_indexes.py audit    # explain() service queries, flag scans
+"""
+from database import MongoDB
+from database.indexes import ensure_indexes, audit_queries
+import argparse
+import logging
+import sys
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def run_ensure():
+    """Create indexes on every collection"""
+    summary = ensure_indexes()
+    failed = False
+    for collection, result in summary.items():
+        if isinstance(result, str):
+            failed = True
+            logger.error(f"❌ {collection}: {result}")
+        else:
+            logger.info(f"✅ {collection}: {', '.join(result)}")
+    return 1 if failed else 0
+
+def run_audit():
+    """Print the plan of each audited query"""
+    report = audit_queries()
+    flagged = 0
+    for entry in report:
+        stages = ' <- '.join(entry['stages'])
+        if entry['issues']:
+            flagged += 1
+            logger.warning(f"⚠️  {entry['name']}: {', '.join(entry['issues'])} [{stages}]")
+        else:
+            logger.info(f"✅ {entry['name']}: [{stages}]")
+    logger.info(f"\n{flagged} of {len(report)} queries not covered by an index")
+    return 1 if flagged else 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Manage EverGain MongoDB indexes')
+    parser.add_argument('command', choices=['ensure', 'audit'])
+    args = parser.parse_args()
+
+    MongoDB.connect()
+    try:
+        exit_code = run_ensure() if args.command == 'ensure' else run_audit()
+    finally:
+        MongoDB.close()
+    sys.exit(exit_code)
@@ -0,0 +1,234 @@
+"""
+Metrics
+Process-wide counters and histograms rendered in the Prometheus text
+format (GET /metrics), plus the timings of the request being served:
+MongoDB commands (database.mongodb.CommandMetrics) and named phases such
+as bcrypt or Gemini calls (timed / record_phase). The current request is
+tracked in a context variable, so work done on other threads (analysis
+pipeline, hashing pool) only shows up in the process-wide metrics.
+"""
+from contextlib import contextmanager
+import contextvars
+import threading
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COMMAND_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _label_text(labelnames, values):
+    if not labelnames:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)) + '}'
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter per label set"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_label_text(self.labelnames, key)} {_number(value)}"
+
+
+class Histogram:
+    """Cumulative buckets, sum and count per label set"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # [count per bucket (non-cumulative), sum, count]
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][index] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        with self._lock:
+            values = sorted((key, (list(entry[0]), entry[1], entry[2])) for key, entry in self._values.items())
+        labelnames = self.labelnames + ('le',)
+        for key, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket{_label_text(labelnames, key + (_number(bound),))} {cumulative}"
+            yield f"{self.name}_bucket{_label_text(labelnames, key + ('+Inf',))} {count}"
+            yield f"{self.name}_sum{_label_text(self.labelnames, key)} {_number(total)}"
+            yield f"{self.name}_count{_label_text(self.labelnames, key)} {count}"
+
+
+http_requests = Counter(
+    'evergain_http_requests_total', 'HTTP requests served',
+    ('method', 'route', 'status')
+)
+http_duration = Histogram(
+    'evergain_http_request_duration_seconds', 'HTTP request latency',
+    ('method', 'route')
+)
+http_db_commands = Histogram(
+    'evergain_http_request_db_commands', 'MongoDB commands sent while serving one request',
+    ('method', 'route'), buckets=COUNT_BUCKETS
+)
+db_commands = Histogram(
+    'evergain_mongo_command_duration_seconds', 'MongoDB command latency',
+    ('collection', 'command'), buckets=COMMAND_BUCKETS
+)
+db_command_failures = Counter(
+    'evergain_mongo_command_failures_total', 'MongoDB commands that failed',
+    ('collection', 'command')
+)
+phase_duration = Histogram(
+    'evergain_phase_duration_seconds', 'Time spent in named phases (bcrypt, gemini)',
+    ('phase',)
+)
+log_records_dropped = Counter(
+    'evergain_log_records_dropped_total', 'Log records dropped because the log queue was full'
+)
+
+REGISTRY = (http_requests, http_duration, http_db_commands, db_commands, db_command_failures, phase_duration,
+            log_records_dropped)
+
+def render():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return '\n'.join(lines) + '\n'
+
+
+class RequestStats:
+    """Timings collected while serving one request"""
+
+    __slots__ = ('started', 'commands', 'phases')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # (collection, command) -> [count, seconds]
+        self.commands = {}
+        # phase -> seconds
+        self.phases = {}
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def add_command(self, collection, command, seconds):
+        entry = self.commands.setdefault((collection, command), [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def add_phase(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def command_count(self):
+        return sum(count for count, _ in self.commands.values())
+
+    def command_seconds(self):
+        return sum(seconds for _, seconds in self.commands.values())
+
+    def server_timing(self, elapsed):
+        """Server-Timing header value (durations in milliseconds)"""
+        parts = [f'db;dur={self.command_seconds() * 1000:.2f};desc="{self.command_count()} commands"']
+        parts.extend(f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in sorted(self.phases.items()))
+        parts.append(f"total;dur={elapsed * 1000:.2f}")
+        return ', '.join(parts)
+
+    def to_json(self):
+        return {
+            'db': {
+                'commands': self.command_count(),
+                'duration_ms': round(self.command_seconds() * 1000, 3),
+                'by_command': [
+                    {'collection': collection, 'command': command, 'count': count, 'duration_ms': round(seconds * 1000, 3)}
+                    for (collection, command), (count, seconds) in sorted(
+                        self.commands.items(), key=lambda item: item[1][1], reverse=True
+                    )
+                ]
+            },
+            'phases_ms': {phase: round(seconds * 1000, 3) for phase, seconds in self.phases.items()}
+        }
+
+
+_current = contextvars.ContextVar('request_stats', default=None)
+
+def start_request():
+    """Begin collecting timings for the request served by this thread/task"""
+    stats = RequestStats()
+    _current.set(stats)
+    return stats
+
+def current_request():
+    """RequestStats of the request being served, or None"""
+    return _current.get()
+
+def finish_request(method, route, status, stats):
+    """Record a served request and stop collecting its timings"""
+    _current.set(None)
+    elapsed = stats.elapsed()
+    http_requests.inc(method=method, route=route, status=str(status))
+    http_duration.observe(elapsed, method=method, route=route)
+    http_db_commands.observe(stats.command_count(), method=method, route=route)
+    return elapsed
+
+def record_command(collection, command, seconds, failed=False):
+    """One MongoDB command (called by the driver's command listener)"""
+    db_commands.observe(seconds, collection=collection, command=command)
+    if failed:
+        db_command_failures.inc(collection=collection, command=command)
+    stats = _current.get()
+    if stats is not None:
+        stats.add_command(collection, command, seconds)
+
+def record_phase(phase, seconds):
+    """Time spent in a named phase (charged to the current request, if any)"""
+    phase_duration.observe(seconds, phase=phase)
+    stats = _current.get()
+    if stats is not None:
+        stats.add_phase(phase, seconds)
+
+@contextmanager
+def timed(phase):
+    """Time a block as a named phase (see record_phase)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(phase, time.perf_counter() - started)
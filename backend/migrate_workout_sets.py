@@ -0,0 +1,130 @@
+"""
+Migrate workout sets to the time-series layout
+Usage:
+    python migrate_workout_sets.py prepare           # create the time-series collection + indexes
+    python migrate_workout_sets.py copy              # copy sets (resumes from the checkpoint)
+    python migrate_workout_sets.py copy --restart    # start over (target must be empty)
+    python migrate_workout_sets.py verify            # compare set counts
+
+Online migration, while the app keeps logging to the standard collection:
+    1. prepare, then copy (repeat copy as often as you like; it only
+       copies sets added since the last run)
+    2. set WORKOUT_SETS_STORAGE=timeseries and restart the app
+    3. copy once more to pick up sets logged before the restart, then verify
+
+Time-series collections cannot be renamed, so the data lands in
+WORKOUT_SETS_TIMESERIES_COLLECTION. The standard collection is left in
+place and can be dropped once verify reports matching counts.
+"""
+from database import MongoDB
+from database.workout_sets import (
+    STANDARD_COLLECTION,
+    TIMESERIES_INDEXES,
+    ensure_timeseries_collection,
+    to_storage
+)
+from database.checkpoints import get_checkpoint, save_checkpoint, clear_checkpoint
+from config import Config
+import argparse
+import logging
+import sys
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+JOB_NAME = 'migrate_workout_sets_timeseries'
+
+def run_prepare(db):
+    """Create the target collection and its indexes"""
+    target = Config.WORKOUT_SETS_TIMESERIES_COLLECTION
+    if not ensure_timeseries_collection(db, target):
+        logger.info(f"ℹ️  {target} already exists")
+    names = db[target].create_indexes(TIMESERIES_INDEXES)
+    logger.info(f"✅ Indexes on {target}: {', '.join(names)}")
+    return 0
+
+def run_copy(db, batch_size, restart=False):
+    """
+    Copy standard sets to the time-series collection in _id order
+
+    Time-series collections do not enforce unique _id, so a batch is
+    recorded as in flight before it is written. If a run stops mid-batch,
+    the next run skips the sets of that batch that were already copied.
+    """
+    source = db[STANDARD_COLLECTION]
+    target = db[Config.WORKOUT_SETS_TIMESERIES_COLLECTION]
+
+    if restart:
+        # A second full copy would duplicate every set
+        if target.find_one({}, {'_id': 1}):
+            logger.error(f"❌ {target.name} is not empty; drop it and run prepare before --restart")
+            return 1
+        clear_checkpoint(JOB_NAME)
+    checkpoint = get_checkpoint(JOB_NAME)
+    last_id = checkpoint.get('last_id')
+    in_flight = checkpoint.get('in_flight')
+    copied = checkpoint.get('copied', 0)
+
+    if last_id or in_flight:
+        logger.info(f"⏩ Resuming after set {last_id} ({copied} sets already copied)")
+
+    while True:
+        query = {'_id': {'$gt': last_id}} if last_id else {}
+        docs = list(source.find(query).sort('_id', 1).limit(batch_size))
+        if not docs:
+            break
+        batch_end = docs[-1]['_id']
+
+        if in_flight:
+            # Interrupted batch: keep only the sets that did not make it
+            done_query = {'_id': {'$lte': in_flight}}
+            if last_id:
+                done_query['_id']['$gt'] = last_id
+            done = {doc['_id'] for doc in target.find(done_query, {'_id': 1})}
+            docs = [doc for doc in docs if doc['_id'] not in done]
+            copied += len(done)
+            in_flight = None
+
+        save_checkpoint(JOB_NAME, last_id=last_id, in_flight=batch_end, copied=copied)
+        if docs:
+            target.insert_many([to_storage(doc, timeseries=True) for doc in docs], ordered=True)
+
+        last_id = batch_end
+        copied += len(docs)
+        save_checkpoint(JOB_NAME, last_id=last_id, in_flight=None, copied=copied)
+        logger.info(f"✅ Copied {copied} sets")
+
+    logger.info(f"🏁 Copy complete: {copied} sets in {target.name}")
+    return 0
+
+def run_verify(db):
+    """Compare the number of sets in both collections"""
+    source_count = db[STANDARD_COLLECTION].estimated_document_count()
+    target_count = db[Config.WORKOUT_SETS_TIMESERIES_COLLECTION].count_documents({})
+    if source_count == target_count:
+        logger.info(f"✅ Both collections hold {source_count} sets")
+        return 0
+    # After the switch new sets only go to the time-series collection
+    logger.warning(f"⚠️  {STANDARD_COLLECTION}: {source_count} sets, "
+                   f"{Config.WORKOUT_SETS_TIMESERIES_COLLECTION}: {target_count} sets")
+    return 1 if target_count < source_count else 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Migrate EverGain workout sets to a time-series collection')
+    parser.add_argument('command', choices=['prepare', 'copy', 'verify'])
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--restart', action='store_true', help='copy: start over (target must be empty)')
+    args = parser.parse_args()
+
+    MongoDB.connect()
+    try:
+        db = MongoDB.get_db()
+        if args.command == 'prepare':
+            exit_code = run_prepare(db)
+        elif args.command == 'copy':
+            exit_code = run_copy(db, args.batch_size, args.restart)
+        else:
+            exit_code = run_verify(db)
+    finally:
+        MongoDB.close()
+    sys.exit(exit_code)
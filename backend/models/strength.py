@@ -0,0 +1,10 @@
+"""
+Strength formulas
+Shared by the classifier, the set logging path and the importer
+"""
+
+def estimated_1rm(weight, reps):
+    """Epley estimated one-rep max"""
+    if reps <= 1:
+        return float(weight)
+    return weight * (1 + reps / 30.0)
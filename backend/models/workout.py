@@ -1,13 +1,15 @@
 from datetime import datetime
 from bson import ObjectId
+from models.workout_set import wib_isoformat
 
 class Workout:
     """Workout model for MongoDB"""
     
     def __init__(self, weight, reps, sets, feeling, 
                  progress_state='', advice='', color='', 
-                 _id=None, created_at=None):
+                 _id=None, created_at=None, user_id=None):
         self._id = _id if _id else ObjectId()
+        self.user_id = user_id
         self.weight = float(weight)
         self.reps = int(reps)
         self.sets = int(sets)
@@ -21,6 +23,7 @@ class Workout:
         """Convert to dictionary for MongoDB"""
         return {
             '_id': self._id,
+            'user_id': self.user_id,
             'weight': self.weight,
             'reps': self.reps,
             'sets': self.sets,
@@ -32,7 +35,7 @@ class Workout:
         }
     
     def to_json(self):
-        """Convert to JSON response"""
+        """Convert to JSON response (created_at in WIB, like the history listing)"""
         return {
             'id': str(self._id),
             'weight': self.weight,
@@ -42,7 +45,7 @@ class Workout:
             'progress_state': self.progress_state,
             'advice': self.advice,
             'color': self.color,
-            'created_at': self.created_at.isoformat()
+            'created_at': wib_isoformat(self.created_at)
         }
     
     @staticmethod
@@ -59,7 +62,8 @@ class Workout:
             progress_state=data.get('progress_state', ''),
             advice=data.get('advice', ''),
             color=data.get('color', ''),
-            created_at=data.get('created_at')
+            created_at=data.get('created_at'),
+            user_id=data.get('user_id')
         )
 
 class AIResponse:
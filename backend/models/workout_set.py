@@ -7,6 +7,14 @@ from typing import Optional
 
 # WIB Timezone (GMT+7)
 WIB = timezone(timedelta(hours=7))
+WIB_OFFSET = WIB.utcoffset(None)
+
+def wib_isoformat(value: datetime) -> str:
+    """Stored datetime -> WIB ISO string (same text as astimezone(WIB).isoformat())"""
+    if value.tzinfo is None:
+        # Shift instead of astimezone: no tz objects on the hot path
+        return (value + WIB_OFFSET).isoformat() + '+07:00'
+    return value.astimezone(WIB).isoformat()
 
 class WorkoutSet:
     def __init__(
@@ -19,9 +27,11 @@ class WorkoutSet:
         notes: Optional[str] = None,
         set_number: int = 1,
         timestamp: Optional[datetime] = None,
-        _id: Optional[str] = None
+        _id: Optional[str] = None,
+        user_id: Optional[str] = None
     ):
         self._id = _id
+        self.user_id = user_id
         self.session_id = session_id
         self.exercise_name = exercise_name
         self.weight = weight
@@ -35,6 +45,8 @@ class WorkoutSet:
             self.timestamp = wib_now.astimezone(timezone.utc).replace(tzinfo=None)
         else:
             self.timestamp = timestamp
+        # Personal record types this set beat (filled when logged, not stored)
+        self.new_records = []
     
     def to_json(self):
         """Convert to JSON-serializable dict"""
@@ -73,5 +85,6 @@ class WorkoutSet:
             rpe=int(data['rpe']) if data.get('rpe') else None,
             notes=data.get('notes'),
             set_number=int(data.get('set_number', 1)),
-            timestamp=data.get('timestamp')
+            timestamp=data.get('timestamp'),
+            user_id=data.get('user_id')
         )
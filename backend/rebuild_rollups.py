@@ -0,0 +1,30 @@
+"""
+Rebuild the workout_rollups collection from sets and sessions
+Usage:
+    python rebuild_rollups.py                  # every user
+    python rebuild_rollups.py --user <user_id> # one user
+
+Deletes the affected buckets, then re-adds every set (in _id order, in
+batches) and every ended session. Run it when nobody in scope is logging;
+sets logged during the rebuild can be counted twice or not at all. An
+interrupted run is simply started again.
+"""
+from database import MongoDB
+from database.rollups import rebuild_rollups
+import argparse
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rebuild EverGain analytics rollups')
+    parser.add_argument('--user', help='only rebuild this user')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    MongoDB.connect()
+    try:
+        rebuild_rollups(args.user, args.batch_size)
+    finally:
+        MongoDB.close()
@@ -4,6 +4,10 @@ from .workout_routes import workout_bp
 from .exercise_routes import exercise_bp
 from .session_routes import session_bp
 from .workout_set_routes import workout_set_bp
+from .record_routes import record_bp
+from .analytics_routes import analytics_bp
+from .export_routes import export_bp
+from .import_routes import import_bp
 
-__all__ = ['auth_bp', 'workout_bp', 'exercise_bp', 'session_bp', 'workout_set_bp']
+__all__ = ['auth_bp', 'workout_bp', 'exercise_bp', 'session_bp', 'workout_set_bp', 'record_bp', 'analytics_bp', 'export_bp', 'import_bp']
 
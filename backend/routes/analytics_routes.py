@@ -0,0 +1,102 @@
+from flask import Blueprint, request, jsonify
+from database.rollups import get_rollups
+from models.workout_set import WIB
+from datetime import datetime, timedelta, timezone
+from routes.auth_context import current_user_id
+import logging
+
+logger = logging.getLogger(__name__)
+
+analytics_bp = Blueprint('analytics', __name__, url_prefix='/api/analytics')
+
+# How far back dashboards look when no since= is given
+DEFAULT_WINDOWS = {
+    'day': timedelta(days=30),
+    'week': timedelta(weeks=12),
+    'month': timedelta(days=365)
+}
+
+def _since(period):
+    """Parse since= (ISO date, WIB if no offset) into naive UTC"""
+    value = request.args.get('since')
+    if not value:
+        return datetime.utcnow() - DEFAULT_WINDOWS.get(period, DEFAULT_WINDOWS['week'])
+    try:
+        since = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'Invalid since: {value}')
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=WIB)
+    return since.astimezone(timezone.utc).replace(tzinfo=None)
+
+@analytics_bp.route('/volume', methods=['GET'])
+def get_volume():
+    """
+    Sets, reps, volume and session count per bucket
+
+    Query params: period (day|week|month, default week), group_by
+    (total|muscle_group|exercise, default muscle_group), since (ISO date)
+    and muscle_group (optional filter).
+    """
+    try:
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(request.args.get('user_id', 'default_user'))
+        period = request.args.get('period', 'week')
+        
+        rows = get_rollups(
+            user_id,
+            period=period,
+            level=request.args.get('group_by', 'muscle_group'),
+            since=_since(period),
+            muscle_group=request.args.get('muscle_group')
+        )
+        
+        return jsonify(rows), 200
+        
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Get volume analytics error: {e}")
+        return jsonify({'error': 'Failed to get volume analytics'}), 500
+
+@analytics_bp.route('/frequency', methods=['GET'])
+def get_frequency():
+    """
+    Sessions and sets per bucket
+
+    Query params: period (day|week|month, default week), since (ISO date)
+    and muscle_group (optional; sessions that trained that muscle group).
+    """
+    try:
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(request.args.get('user_id', 'default_user'))
+        period = request.args.get('period', 'week')
+        muscle_group = request.args.get('muscle_group')
+        
+        rows = get_rollups(
+            user_id,
+            period=period,
+            level='muscle_group' if muscle_group else 'total',
+            since=_since(period),
+            muscle_group=muscle_group
+        )
+        
+        return jsonify([
+            {
+                'bucket': row['bucket'],
+                'bucket_start': row['bucket_start'],
+                'sessions': row['sessions'],
+                'sets': row['sets']
+            }
+            for row in rows
+        ]), 200
+        
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Get frequency analytics error: {e}")
+        return jsonify({'error': 'Failed to get frequency analytics'}), 500
@@ -0,0 +1,61 @@
+"""
+Request authentication context
+load_user_context runs before every request (registered in app.py): it
+verifies the Authorization: Bearer token and stores the token holder in
+g.user_id for every blueprint. Verified claims are cached per token (see
+services.token_cache), so a request with a known token costs a hash and
+a dict lookup, not a signature check or a database round-trip.
+"""
+from flask import g, request
+from config import Config
+from services.auth_service import AuthService
+
+def authenticate(header):
+    """
+    (user_id, error) for an Authorization header value; both None when
+    no bearer token was sent
+    """
+    scheme, _, token = (header or '').partition(' ')
+    token = token.strip()
+    if scheme.lower() != 'bearer' or not token:
+        return None, None
+    
+    try:
+        return AuthService.verify_token(token), None
+    except ValueError as e:
+        # Rejected by the routes that need a user, not here: login and
+        # public endpoints keep working with a stale token
+        return None, str(e)
+
+def resolve_user_id(user_id, auth_error, fallback=None):
+    """
+    User id a route acts for (see current_user_id)
+    
+    Raises:
+        PermissionError: If the token is invalid, or missing without a fallback
+    """
+    if user_id:
+        return user_id
+    if auth_error:
+        raise PermissionError(auth_error)
+    if fallback and Config.AUTH_ALLOW_ANONYMOUS:
+        return fallback
+    raise PermissionError('Authorization token required')
+
+def load_user_context():
+    """before_request hook: set g.user_id (None without a valid token)"""
+    g.user_id, g.auth_error = authenticate(request.headers.get('Authorization'))
+    return None
+
+def current_user_id(fallback=None):
+    """
+    User id of the current request
+    
+    Args:
+        fallback: User id for requests without a token (the legacy user_id
+            parameter); ignored when AUTH_ALLOW_ANONYMOUS is off
+    
+    Raises:
+        PermissionError: If the token is invalid, or missing without a fallback
+    """
+    return resolve_user_id(g.get('user_id'), g.get('auth_error'), fallback)
@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify
 from services.auth_service import AuthService
+from services.token_cache import token_cache
+from services.password_hasher import HasherSaturated, password_hasher
 from models.user import RegisterRequest, LoginRequest
+from routes.auth_context import current_user_id
 import logging
 
 logger = logging.getLogger(__name__)
@@ -8,6 +11,12 @@ logger = logging.getLogger(__name__)
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 auth_service = AuthService()
 
+def _busy_response(error):
+    """429 while the password hashing pool is saturated"""
+    response = jsonify({'error': str(error)})
+    response.headers['Retry-After'] = '1'
+    return response, 429
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """User registration endpoint"""
@@ -29,6 +38,8 @@ def register():
         
         return jsonify(result), 201
         
+    except HasherSaturated as e:
+        return _busy_response(e)
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -55,8 +66,34 @@ def login():
         
         return jsonify(result), 200
         
+    except HasherSaturated as e:
+        return _busy_response(e)
     except ValueError as e:
         return jsonify({'error': str(e)}), 401
     except Exception as e:
         logger.error(f"Login error: {e}")
         return jsonify({'error': 'Internal server error'}), 500
+
+@auth_bp.route('/me', methods=['GET'])
+def get_me():
+    """Profile of the token holder (the user record is cached briefly)"""
+    try:
+        user = auth_service.get_user(current_user_id())
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        return jsonify(user.to_json()), 200
+        
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except Exception as e:
+        logger.error(f"Get profile error: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@auth_bp.route('/stats', methods=['GET'])
+def get_auth_stats():
+    """Verified token cache and password hashing pool counters"""
+    return jsonify({
+        'tokens': token_cache.metrics(),
+        'password_hashing': password_hasher.snapshot()
+    }), 200
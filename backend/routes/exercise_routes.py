@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify
-from database import get_exercises_collection
+from services.catalog_service import catalog_cache
+from routes.http_cache import cached_json_response
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,12 +11,9 @@ exercise_bp = Blueprint('exercise', __name__, url_prefix='/api/exercises')
 def get_exercises():
     """Get all exercises endpoint"""
     try:
-        exercises_collection = get_exercises_collection()
-        exercises = list(exercises_collection.find({}, {'_id': 0}))
+        catalog = catalog_cache.get()
         
-        logger.info(f"Fetched {len(exercises)} exercises")
-        
-        return jsonify(exercises), 200
+        return cached_json_response(catalog.exercises)
         
     except Exception as e:
         logger.error(f"Get exercises error: {e}")
@@ -25,13 +23,10 @@ def get_exercises():
 def get_muscle_groups():
     """Get list of all muscle groups"""
     try:
-        exercises_collection = get_exercises_collection()
-        
-        # Get unique muscle groups
-        muscle_groups = exercises_collection.distinct('muscle_group')
-        muscle_groups.sort()
+        catalog = catalog_cache.get()
         
-        return jsonify(muscle_groups), 200
+        # Unique muscle groups, sorted when the catalog was cached
+        return cached_json_response(catalog.muscle_groups)
         
     except Exception as e:
         logger.error(f"Get muscle groups error: {e}")
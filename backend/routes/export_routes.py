@@ -0,0 +1,68 @@
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from config import Config
+from services.export_service import FORMATS, export_stream
+from database.pagination import clamp_page_size
+from models.workout_set import WIB
+from datetime import datetime, timezone
+from routes.auth_context import current_user_id
+import logging
+
+logger = logging.getLogger(__name__)
+
+export_bp = Blueprint('export', __name__, url_prefix='/api/export')
+
+def _parse_date(name):
+    """Parse an ISO date/datetime query param (WIB if no offset) into naive UTC"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'Invalid {name}: {value}')
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=WIB)
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+@export_bp.route('/', methods=['GET'], strict_slashes=False)
+def export_training_log():
+    """
+    Stream the user's full training log (sessions with their sets)
+
+    Query params: format (ndjson|csv, default ndjson), from / to (ISO date,
+    session start), batch_size (sessions per cursor batch). The response
+    is gzip-compressed on the fly when the client accepts gzip.
+    """
+    try:
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(request.args.get('user_id', 'default_user'))
+        fmt = request.args.get('format', 'ndjson').lower()
+        if fmt not in FORMATS:
+            raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+        since = _parse_date('from')
+        until = _parse_date('to')
+        batch_size = clamp_page_size(
+            request.args.get('batch_size'),
+            default=Config.EXPORT_BATCH_SIZE,
+            maximum=Config.EXPORT_MAX_BATCH_SIZE
+        )
+        gzip = 'gzip' in request.headers.get('Accept-Encoding', '').lower()
+        
+        chunks = export_stream(user_id, fmt, since, until, batch_size, gzip=gzip)
+        
+        filename = f"evergain-export-{datetime.now(WIB).strftime('%Y%m%d')}.{fmt}"
+        response = Response(stream_with_context(chunks), mimetype=FORMATS[fmt])
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response.headers['Vary'] = 'Accept-Encoding'
+        if gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+        
+        return response
+        
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Export error: {e}")
+        return jsonify({'error': 'Failed to export training log'}), 500
@@ -0,0 +1,19 @@
+"""
+HTTP caching helpers for pre-serialized JSON payloads
+"""
+from flask import request, Response
+
+def cached_json_response(payload):
+    """
+    Serve a CachedPayload with its strong ETag
+
+    Returns 304 Not Modified when the client's If-None-Match matches, so
+    clients revalidate without downloading the body again.
+    """
+    if request.if_none_match.contains(payload.etag):
+        response = Response(status=304)
+    else:
+        response = Response(payload.body, status=200, mimetype='application/json')
+    response.set_etag(payload.etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,114 @@
+from flask import Blueprint, request, jsonify
+from config import Config
+from database.import_jobs import create_import_job, get_import_job, job_to_json
+from services.import_service import EXTENSIONS, FORMATS, import_runner, is_resumable
+from routes.auth_context import current_user_id
+import logging
+import os
+import uuid
+
+logger = logging.getLogger(__name__)
+
+import_bp = Blueprint('import', __name__, url_prefix='/api/import')
+
+def _job_response(job, status=200):
+    data = job_to_json(job)
+    data['status_url'] = f"/api/import/{data['_id']}"
+    return jsonify(data), status
+
+@import_bp.route('/', methods=['POST'], strict_slashes=False)
+def start_import():
+    """
+    Upload a training history export and import it in the background
+
+    Multipart form: file (CSV, JSON array or NDJSON), optional format
+    (csv|json, default from the file extension). Returns 202 with the job;
+    poll its status_url for progress.
+    """
+    try:
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(request.args.get('user_id', 'default_user'))
+
+        max_bytes = Config.IMPORT_MAX_UPLOAD_MB * 1024 * 1024
+        if request.content_length and request.content_length > max_bytes:
+            return jsonify({'error': f'File too large (max {Config.IMPORT_MAX_UPLOAD_MB} MB)'}), 413
+
+        upload = request.files.get('file')
+        if upload is None or not upload.filename:
+            raise ValueError('file is required')
+
+        extension = os.path.splitext(upload.filename)[1].lower()
+        fmt = (request.form.get('format') or EXTENSIONS.get(extension, '')).lower()
+        if fmt not in FORMATS:
+            raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+
+        os.makedirs(Config.IMPORT_UPLOAD_DIR, exist_ok=True)
+        path = os.path.join(Config.IMPORT_UPLOAD_DIR, f"{uuid.uuid4().hex}{extension}")
+        upload.save(path)
+        size = os.path.getsize(path)
+        if size > max_bytes:
+            os.remove(path)
+            return jsonify({'error': f'File too large (max {Config.IMPORT_MAX_UPLOAD_MB} MB)'}), 413
+
+        job = create_import_job(user_id, upload.filename, path, fmt, size)
+        import_runner.submit(job['_id'])
+
+        logger.info(f"✅ Queued import {job['_id']} ({upload.filename}, {size} bytes) for user {user_id}")
+        return _job_response(job, 202)
+
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Start import error: {e}")
+        return jsonify({'error': 'Failed to start import'}), 500
+
+@import_bp.route('/<job_id>', methods=['GET'])
+def get_import_status(job_id):
+    """Progress of an import job"""
+    try:
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(request.args.get('user_id', 'default_user'))
+
+        job = get_import_job(job_id, user_id)
+        if not job:
+            return jsonify({'error': 'Import job not found'}), 404
+
+        return _job_response(job)
+
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Get import status error: {e}")
+        return jsonify({'error': 'Failed to get import status'}), 500
+
+@import_bp.route('/<job_id>/resume', methods=['POST'])
+def resume_import(job_id):
+    """Resume a failed or interrupted import from its last checkpoint"""
+    try:
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(request.args.get('user_id', 'default_user'))
+
+        job = get_import_job(job_id, user_id)
+        if not job:
+            return jsonify({'error': 'Import job not found'}), 404
+        if not is_resumable(job):
+            return jsonify({'error': f"Import is {job['status']}"}), 409
+        if not os.path.exists(job['path']):
+            return jsonify({'error': 'Uploaded file is no longer available; start a new import'}), 410
+
+        import_runner.submit(job['_id'])
+
+        logger.info(f"⏩ Resuming import {job_id} for user {user_id}")
+        return _job_response(job, 202)
+
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Resume import error: {e}")
+        return jsonify({'error': 'Failed to resume import'}), 500
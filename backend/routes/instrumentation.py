@@ -0,0 +1,116 @@
+"""
+Request instrumentation
+assign_request_id / echo_request_id give every request an id (the
+client's X-Request-ID if it sent a usable one), carried by its log
+records and returned in the X-Request-ID header.
+
+begin_request / end_request wrap every request (registered in app.py):
+latency, status and MongoDB commands per route go to the process metrics
+(GET /metrics), and each response carries a Server-Timing header with
+its database and phase timings (bcrypt, gemini).
+
+With PROFILING_ENABLED, a request sent with "X-Profile: 1" runs under
+cProfile and the response is replaced by the breakdown (the request's
+own side effects still happen). Only one request is profiled at a time;
+the others are served normally.
+"""
+from flask import Blueprint, Response, g, jsonify, request
+from config import Config
+from logging_config import request_id
+import metrics
+import cProfile
+import pstats
+import re
+import threading
+import uuid
+
+metrics_bp = Blueprint('metrics', __name__)
+
+_profiling = threading.Lock()
+
+REQUEST_ID_PATTERN = re.compile(r'[A-Za-z0-9._-]{1,64}')
+
+def new_request_id(header):
+    """Request id for log correlation (the client's, if usable), set for this thread/task"""
+    value = header if header and REQUEST_ID_PATTERN.fullmatch(header) else uuid.uuid4().hex
+    request_id.set(value)
+    return value
+
+def assign_request_id():
+    """before_request hook: g.request_id"""
+    g.request_id = new_request_id(request.headers.get('X-Request-ID'))
+
+def echo_request_id(response):
+    """after_request hook: return the request id to the client"""
+    if g.get('request_id'):
+        response.headers['X-Request-ID'] = g.request_id
+    # Later records of this worker thread belong to no request
+    request_id.set(None)
+    return response
+
+def begin_request():
+    """before_request hook: start timing (and profiling, if asked for)"""
+    metrics.start_request()
+    if (Config.PROFILING_ENABLED and request.headers.get('X-Profile')
+            and _profiling.acquire(blocking=False)):
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+def end_request(response):
+    """after_request hook: record the request and add Server-Timing"""
+    stats = metrics.current_request()
+    if stats is None:
+        return response
+
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        _profiling.release()
+
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    elapsed = metrics.finish_request(request.method, route, response.status_code, stats)
+    response.headers['Server-Timing'] = stats.server_timing(elapsed)
+
+    if profiler is not None:
+        return profile_response(profiler, stats, route, response.status_code, elapsed)
+    return response
+
+def release_profiler(error=None):
+    """teardown_request hook: stop a profiler that end_request never reached"""
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        _profiling.release()
+
+def profile_response(profiler, stats, route, status, elapsed):
+    """cProfile breakdown of one request, slowest cumulative time first"""
+    profile = pstats.Stats(profiler)
+    profile.sort_stats('cumulative')
+    functions = []
+    for function in profile.fcn_list[:Config.PROFILE_TOP_FUNCTIONS]:
+        primitive_calls, calls, total_time, cumulative_time, _ = profile.stats[function]
+        functions.append({
+            'function': pstats.func_std_string(pstats.func_strip_path(function)),
+            'calls': calls,
+            'primitive_calls': primitive_calls,
+            'total_ms': round(total_time * 1000, 3),
+            'cumulative_ms': round(cumulative_time * 1000, 3)
+        })
+
+    body = {
+        'method': request.method,
+        'path': request.path,
+        'route': route,
+        'status': status,
+        'duration_ms': round(elapsed * 1000, 3),
+        'profile': functions
+    }
+    body.update(stats.to_json())
+    response = jsonify(body)
+    response.headers['Server-Timing'] = stats.server_timing(elapsed)
+    return response
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Process metrics in the Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,31 @@
+from flask import Blueprint, request, jsonify
+from database.personal_records import get_personal_records
+from routes.auth_context import current_user_id
+import logging
+
+logger = logging.getLogger(__name__)
+
+record_bp = Blueprint('records', __name__, url_prefix='/api/records')
+
+@record_bp.route('/', methods=['GET'], strict_slashes=False)
+def get_records():
+    """
+    Get user's personal records
+
+    Query params: exercise (optional) to get the record of one exercise.
+    Served from the personal_records index, never from a scan of the sets.
+    """
+    try:
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(request.args.get('user_id', 'default_user'))
+        exercise_name = request.args.get('exercise')
+        
+        records = get_personal_records(user_id, exercise_name)
+        
+        return jsonify(records), 200
+        
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except Exception as e:
+        logger.error(f"Get personal records error: {e}")
+        return jsonify({'error': 'Failed to get personal records'}), 500
@@ -1,5 +1,10 @@
 from flask import Blueprint, request, jsonify
-from services.session_service import SessionService
+from config import Config
+from services.session_service import SessionService, SESSION_FIELDS
+from database.pagination import clamp_page_size, parse_fields
+from services.catalog_service import catalog_cache
+from routes.http_cache import cached_json_response
+from routes.auth_context import current_user_id
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,9 +22,8 @@ def start_session():
         if not data or 'session_type' not in data:
             return jsonify({'error': 'session_type is required'}), 400
         
-        # TODO: Get user_id from JWT token
-        # For now, using a default user_id
-        user_id = data.get('user_id', 'default_user')
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(data.get('user_id', 'default_user'))
         session_type = data['session_type']
         
         # Start session
@@ -27,6 +31,8 @@ def start_session():
         
         return jsonify(session.to_json()), 201
         
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -39,14 +45,16 @@ def end_session():
     try:
         data = request.get_json()
         
-        # TODO: Get user_id from JWT token
-        user_id = data.get('user_id', 'default_user') if data else 'default_user'
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(data.get('user_id', 'default_user') if data else 'default_user')
         
         # End session
         session = session_service.end_session(user_id)
         
         return jsonify(session.to_json()), 200
         
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -57,8 +65,8 @@ def end_session():
 def get_active_session():
     """Get user's active session"""
     try:
-        # TODO: Get user_id from JWT token
-        user_id = request.args.get('user_id', 'default_user')
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(request.args.get('user_id', 'default_user'))
         
         # Get active session
         session = session_service.get_active_session(user_id)
@@ -71,51 +79,67 @@ def get_active_session():
             'session': session.to_json()
         }), 200
         
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
     except Exception as e:
         logger.error(f"Get active session error: {e}")
         return jsonify({'error': 'Failed to get active session'}), 500
 
 @session_bp.route('/history', methods=['GET'])
 def get_session_history():
-    """Get user's session history"""
+    """
+    Get user's session history
+
+    Query params: limit (capped by SESSION_HISTORY_MAX_PAGE_SIZE), cursor
+    and fields (comma-separated). The cursor of the next page is sent in
+    the X-Next-Cursor header.
+    """
     try:
-        # TODO: Get user_id from JWT token
-        user_id = request.args.get('user_id', 'default_user')
-        limit = int(request.args.get('limit', 20))
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(request.args.get('user_id', 'default_user'))
+        limit = clamp_page_size(
+            request.args.get('limit'),
+            default=20,
+            maximum=Config.SESSION_HISTORY_MAX_PAGE_SIZE
+        )
+        fields = parse_fields(request.args.get('fields'), SESSION_FIELDS)
         
         # Get history
-        sessions = session_service.get_session_history(user_id, limit)
+        sessions, next_cursor = session_service.get_session_history(
+            user_id,
+            limit=limit,
+            cursor=request.args.get('cursor'),
+            fields=fields
+        )
         
-        # Convert to JSON
-        sessions_json = [session.to_json() for session in sessions]
+        response = jsonify(sessions)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
         
-        return jsonify(sessions_json), 200
+        return response, 200
         
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Get session history error: {e}")
         return jsonify({'error': 'Failed to get session history'}), 500
 
 @session_bp.route('/<session_id>/workout-sets', methods=['GET'])
 def get_session_workout_sets_route(session_id):
-    """Get all workout sets for a specific session"""
-    try:
-        from database.workout_sets import get_session_workout_sets
-        
-        workout_sets = get_session_workout_sets(session_id)
-        
-        return jsonify(workout_sets), 200
-        
-    except Exception as e:
-        logger.error(f"Get session workout sets error: {e}")
-        return jsonify({'error': 'Failed to get workout sets'}), 500
+    """Get workout sets for a specific session (paginated, see /api/workout-sets/session)"""
+    from routes.workout_set_routes import session_sets_page_response
+    
+    return session_sets_page_response(session_id)
 
 @session_bp.route('/types', methods=['GET'])
 def get_session_types():
     """Get all available session types"""
     try:
-        session_types = session_service.get_session_types()
+        catalog = catalog_cache.get()
         
-        return jsonify(session_types), 200
+        return cached_json_response(catalog.session_types)
         
     except Exception as e:
         logger.error(f"Get session types error: {e}")
@@ -125,9 +149,9 @@ def get_session_types():
 def get_session_types_categorized():
     """Get session types grouped by category"""
     try:
-        categorized = session_service.get_session_types_by_category()
+        catalog = catalog_cache.get()
         
-        return jsonify(categorized), 200
+        return cached_json_response(catalog.categorized)
         
     except Exception as e:
         logger.error(f"Get categorized session types error: {e}")
@@ -136,35 +160,17 @@ def get_session_types_categorized():
 @session_bp.route('/exercises', methods=['GET'])
 def get_exercises_for_session():
     """Get exercises filtered by session type"""
-    import traceback
     try:
-        logger.info("📋 Exercises endpoint called")
-        from database import get_exercises_collection
-        
         session_type = request.args.get('session_type')
-        logger.info(f"📋 Session type parameter: {session_type}")
         
         if not session_type:
-            logger.error("❌ No session_type parameter provided")
             return jsonify({'error': 'session_type parameter is required'}), 400
         
-        logger.info("📋 Getting exercises collection...")
-        exercises_collection = get_exercises_collection()
-        logger.info(f"✅ Got exercises collection: {exercises_collection}")
+        # Served from the session type -> exercises index of the catalog cache
+        catalog = catalog_cache.get()
         
-        # Find exercises that include this session type
-        logger.info(f"📋 Querying for exercises with session type: {session_type}")
-        exercises = list(exercises_collection.find(
-            {'sessions': session_type},
-            {'_id': 0}
-        ))
-        
-        logger.info(f"✅ Found {len(exercises)} exercises for {session_type}")
-        return jsonify(exercises), 200
+        return cached_json_response(catalog.exercises_for_session(session_type))
         
     except Exception as e:
         logger.error(f"❌ Get exercises for session error: {e}")
-        logger.error(f"❌ Error type: {type(e).__name__}")
-        logger.error(f"❌ Traceback: {traceback.format_exc()}")
         return jsonify({'error': f'Failed to get exercises for session: {str(e)}'}), 500
-
@@ -1,5 +1,12 @@
 from flask import Blueprint, request, jsonify
-from services.workout_service import WorkoutService
+from config import Config
+from services.workout_service import WorkoutService, PENDING_STATE
+from database.pagination import clamp_page_size
+from services.analysis_pipeline import analysis_pipeline
+from services.progress_classifier import progress_classifier
+from services.ai_cache import ai_response_cache
+from services.gemini_client import gemini_client
+from routes.auth_context import current_user_id
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,11 +29,18 @@ def submit_workout():
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        # Submit workout
-        workout = workout_service.submit_workout(data)
+        user_id = current_user_id()
         
-        return jsonify(workout.to_json()), 201
+        # Submit workout (AI analysis runs in the background)
+        workout = workout_service.submit_workout(user_id, data)
         
+        response = workout.to_json()
+        response['analysis_url'] = f"/api/workouts/{workout._id}/analysis"
+        
+        return jsonify(response), 201
+        
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -35,15 +49,81 @@ def submit_workout():
 
 @workout_bp.route('/', methods=['GET'])
 def get_history():
-    """Get workout history endpoint"""
+    """
+    Get workout history endpoint
+
+    Query params: limit (capped by WORKOUT_HISTORY_MAX_PAGE_SIZE) and
+    cursor. The cursor of the next page is sent in the X-Next-Cursor header.
+    """
     try:
-        workouts = workout_service.get_history()
+        user_id = current_user_id()
+        limit = clamp_page_size(
+            request.args.get('limit'),
+            default=20,
+            maximum=Config.WORKOUT_HISTORY_MAX_PAGE_SIZE
+        )
         
-        # Convert to JSON
-        workouts_json = [workout.to_json() for workout in workouts]
+        workouts, next_cursor = workout_service.get_history(
+            user_id,
+            limit=limit,
+            cursor=request.args.get('cursor')
+        )
         
-        return jsonify(workouts_json), 200
+        # Views are shaped by the JSON provider (see database.views)
+        response = jsonify(workouts)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
         
+        return response, 200
+        
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Get history error: {e}")
         return jsonify({'error': 'Failed to fetch history'}), 500
+
+@workout_bp.route('/<workout_id>/analysis', methods=['GET'])
+def get_analysis(workout_id):
+    """
+    Get the AI analysis of a workout
+
+    Pass ?wait=<seconds> to long-poll until the analysis is ready
+    (capped by ANALYSIS_LONG_POLL_MAX_SECONDS).
+    """
+    try:
+        user_id = current_user_id()
+        wait = float(request.args.get('wait', 0))
+        wait = max(0.0, min(wait, Config.ANALYSIS_LONG_POLL_MAX_SECONDS))
+        
+        if wait:
+            workout = workout_service.wait_for_analysis(user_id, workout_id, wait)
+        else:
+            workout = workout_service.get_workout(user_id, workout_id)
+        
+        if not workout:
+            return jsonify({'error': 'Workout not found'}), 404
+        
+        return jsonify({
+            'status': 'pending' if workout.progress_state == PENDING_STATE else 'complete',
+            'workout': workout.to_json()
+        }), 200
+        
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Get analysis error: {e}")
+        return jsonify({'error': 'Failed to fetch analysis'}), 500
+
+@workout_bp.route('/analysis-stats', methods=['GET'])
+def get_analysis_stats():
+    """AI pipeline, fast path / LLM split, response cache and Gemini client counters"""
+    return jsonify({
+        'pipeline': analysis_pipeline.snapshot(),
+        'classifier': progress_classifier.metrics(),
+        'cache': ai_response_cache.metrics(),
+        'gemini': gemini_client.snapshot()
+    }), 200
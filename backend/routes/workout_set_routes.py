@@ -3,74 +3,195 @@ Workout Set Routes
 API endpoints for logging and retrieving workout sets
 """
 from flask import Blueprint, request, jsonify
+from config import Config
 from models.workout_set import WorkoutSet
+from routes.auth_context import current_user_id
 from database.workout_sets import (
-    log_workout_set,
-    get_session_workout_sets,
+    record_workout_set,
+    record_workout_sets_batch,
+    get_session_workout_sets_page,
+    WORKOUT_SET_FIELDS,
     get_last_set_for_exercise,
-    count_sets_for_exercise,
-    update_session_stats
+    count_sets_for_exercise
 )
+from database.pagination import clamp_page_size, parse_fields
+from datetime import datetime, timezone
 import logging
 
 logger = logging.getLogger(__name__)
 
 workout_set_bp = Blueprint('workout_set', __name__, url_prefix='/api/workout-sets')
 
-@workout_set_bp.route('/log', methods=['POST'])
-def log_set():
-    """Log a workout set"""
+REQUIRED_SET_FIELDS = ['session_id', 'exercise_name', 'weight', 'reps']
+
+def _parse_timestamp(value):
+    """Parse an ISO-8601 client timestamp into naive UTC (storage format)"""
+    if not value:
+        return None
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ['session_id', 'exercise_name', 'weight', 'reps']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'{field} is required'}), 400
-        
-        # Get set number
-        set_number = count_sets_for_exercise(
-            data['session_id'],
-            data['exercise_name']
-        ) + 1
-        
-        # Create workout set
-        workout_set = WorkoutSet(
-            session_id=data['session_id'],
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f'Invalid timestamp: {value}')
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def workout_set_from_payload(data):
+    """
+    Validate a set payload and build a WorkoutSet
+
+    Raises:
+        ValueError: If a field is missing or malformed
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Invalid set payload')
+    
+    for field in REQUIRED_SET_FIELDS:
+        if field not in data:
+            raise ValueError(f'{field} is required')
+    
+    try:
+        return WorkoutSet(
+            session_id=str(data['session_id']),
             exercise_name=data['exercise_name'],
             weight=float(data['weight']),
             reps=int(data['reps']),
             rpe=int(data['rpe']) if data.get('rpe') else None,
             notes=data.get('notes'),
-            set_number=set_number
+            timestamp=_parse_timestamp(data.get('timestamp'))
         )
+    except (TypeError, ValueError) as e:
+        raise ValueError(str(e))
+
+@workout_set_bp.route('/log', methods=['POST'])
+def log_set():
+    """Log a workout set"""
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'Invalid request payload'}), 400
+        
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(data.get('user_id', 'default_user'))
+        
+        # Validate and create workout set (set number is assigned when recording)
+        workout_set = workout_set_from_payload(data)
         
-        # Save to database
-        saved_set = log_workout_set(workout_set)
+        # Save to database, update session stats and personal records
+        saved_set = record_workout_set(workout_set, user_id)
+        if saved_set is None:
+            return jsonify({'error': 'Session not found'}), 404
         
-        # Update session stats
-        update_session_stats(data['session_id'])
+        response = saved_set.to_json()
+        response['is_pr'] = bool(saved_set.new_records)
+        response['new_records'] = saved_set.new_records
         
-        return jsonify(saved_set.to_json()), 201
+        return jsonify(response), 201
         
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"❌ Error logging set: {e}")
         return jsonify({'error': 'Failed to log workout set'}), 500
 
-@workout_set_bp.route('/session/<session_id>', methods=['GET'])
-def get_session_sets(session_id):
-    """Get all workout sets for a session"""
+@workout_set_bp.route('/batch', methods=['POST'])
+def log_sets_batch():
+    """
+    Log a batch of workout sets (offline sync)
+
+    Body: {"sets": [{session_id, exercise_name, weight, reps, rpe?, notes?,
+    timestamp?, idempotency_key?}, ...]}. Every item is validated up front;
+    the response reports the outcome of each item by its index. Items for
+    a session the user does not own fail with "Session not found".
+    """
     try:
-        sets = get_session_workout_sets(session_id)
-        return jsonify(sets), 200
+        data = request.get_json()
+        items = data.get('sets') if isinstance(data, dict) else data
+        
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(data.get('user_id', 'default_user') if isinstance(data, dict) else 'default_user')
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'sets must be a non-empty array'}), 400
+        
+        if len(items) > Config.WORKOUT_SET_BATCH_MAX_SIZE:
+            return jsonify({
+                'error': f'Batch too large (max {Config.WORKOUT_SET_BATCH_MAX_SIZE} sets)'
+            }), 413
+        
+        # Validate everything before touching the database
+        valid_items = []
+        invalid = []
+        for index, item in enumerate(items):
+            try:
+                workout_set = workout_set_from_payload(item)
+                key = item.get('idempotency_key')
+                valid_items.append((index, workout_set, str(key) if key else None))
+            except ValueError as e:
+                invalid.append({'index': index, 'status': 'error', 'error': str(e)})
+        
+        results = record_workout_sets_batch(valid_items, user_id) if valid_items else []
+        results = sorted(results + invalid, key=lambda r: r['index'])
+        
+        return jsonify({
+            'created': sum(1 for r in results if r['status'] == 'created'),
+            'duplicates': sum(1 for r in results if r['status'] == 'duplicate'),
+            'failed': sum(1 for r in results if r['status'] == 'error'),
+            'results': results
+        }), 200
+        
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except Exception as e:
+        logger.error(f"❌ Error logging set batch: {e}")
+        return jsonify({'error': 'Failed to log workout set batch'}), 500
+
+def session_sets_page_response(session_id):
+    """
+    Paginated set listing shared by both set listing endpoints
+
+    Query params: limit (capped by WORKOUT_SETS_MAX_PAGE_SIZE), cursor and
+    fields (comma-separated). The next cursor is sent in X-Next-Cursor.
+    """
+    try:
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(request.args.get('user_id', 'default_user'))
+        limit = clamp_page_size(
+            request.args.get('limit'),
+            default=Config.WORKOUT_SETS_DEFAULT_PAGE_SIZE,
+            maximum=Config.WORKOUT_SETS_MAX_PAGE_SIZE
+        )
+        fields = parse_fields(request.args.get('fields'), WORKOUT_SET_FIELDS)
+        
+        sets, next_cursor = get_session_workout_sets_page(
+            session_id,
+            user_id,
+            limit=limit,
+            cursor=request.args.get('cursor'),
+            fields=fields
+        )
+        
+        response = jsonify(sets)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response, 200
         
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"❌ Error getting session sets: {e}")
         return jsonify({'error': 'Failed to get workout sets'}), 500
 
+@workout_set_bp.route('/session/<session_id>', methods=['GET'])
+def get_session_sets(session_id):
+    """Get workout sets for a session"""
+    return session_sets_page_response(session_id)
+
 @workout_set_bp.route('/last-set', methods=['GET'])
 def get_last_set():
     """Get the last set for a specific exercise in a session"""
@@ -81,13 +202,18 @@ def get_last_set():
         if not session_id or not exercise_name:
             return jsonify({'error': 'session_id and exercise_name are required'}), 400
         
-        last_set = get_last_set_for_exercise(session_id, exercise_name)
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(request.args.get('user_id', 'default_user'))
+        
+        last_set = get_last_set_for_exercise(session_id, user_id, exercise_name)
         
         if not last_set:
             return jsonify({'last_set': None}), 200
         
         return jsonify(last_set), 200
         
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
     except Exception as e:
         logger.error(f"❌ Error getting last set: {e}")
         return jsonify({'error': 'Failed to get last set'}), 500
@@ -102,10 +228,15 @@ def get_set_count():
         if not session_id or not exercise_name:
             return jsonify({'error': 'session_id and exercise_name are required'}), 400
         
-        count = count_sets_for_exercise(session_id, exercise_name)
+        # Token holder, else the legacy user_id parameter
+        user_id = current_user_id(request.args.get('user_id', 'default_user'))
+        
+        count = count_sets_for_exercise(session_id, user_id, exercise_name)
         
         return jsonify({'count': count}), 200
         
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
     except Exception as e:
         logger.error(f"❌ Error counting sets: {e}")
         return jsonify({'error': 'Failed to count sets'}), 500
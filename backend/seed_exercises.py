@@ -3,6 +3,7 @@ Seed exercises data to MongoDB with session tags
 Run this script to populate the exercises collection with comprehensive exercise data
 """
 from database import MongoDB
+from database.catalog import bump_catalog_version
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -196,5 +197,7 @@ if __name__ == '__main__':
     logger.info("🌱 Starting database seeding...")
     seed_exercises()
     seed_session_types()
+    # Tell running servers to reload their catalog cache
+    bump_catalog_version()
     MongoDB.close()
     logger.info("🎉 Seeding complete!")
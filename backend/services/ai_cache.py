@@ -0,0 +1,167 @@
+"""
+AI Response Cache
+Content-addressed cache of Gemini analyses. The key is a hash of the
+normalized prompt inputs (current workout + history), so re-submitting the
+same context reuses the earlier answer instead of calling the model again.
+analysis_history() leaves a resubmitted workout's earlier copy out of its
+history, so the resubmission is analyzed against the same context.
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from config import Config
+from models.workout import AIResponse
+import hashlib
+import json
+import threading
+import time
+
+# Bump when the prompt changes so old answers are not reused
+PROMPT_VERSION = 1
+
+# Past workouts in the prompt
+HISTORY_LIMIT = 5
+
+
+class AICacheBackend(ABC):
+    """Storage interface; values are plain dicts so they can be shared across workers"""
+
+    @abstractmethod
+    def get(self, key):
+        """Stored value, or None if missing or expired"""
+
+    @abstractmethod
+    def set(self, key, value, ttl):
+        """Store a value for ttl seconds"""
+
+    @abstractmethod
+    def clear(self):
+        """Drop every entry"""
+
+    @abstractmethod
+    def __len__(self):
+        """Number of stored entries"""
+
+
+class InMemoryAICache(AICacheBackend):
+    """Per-process LRU cache with TTL expiry"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _normalize_workout(workout, with_date=False):
+    """Canonical form of the fields that go into the prompt"""
+    normalized = {
+        'weight': round(float(workout.weight), 2),
+        'reps': int(workout.reps),
+        'sets': int(workout.sets),
+        'feeling': ' '.join((workout.feeling or '').lower().split())
+    }
+    if with_date:
+        normalized['date'] = workout.created_at.strftime('%Y-%m-%d')
+    return normalized
+
+
+def analysis_history(current, recent, limit=HISTORY_LIMIT):
+    """
+    Prompt history for a workout
+
+    Args:
+        current: Workout being analyzed
+        recent: Workouts created before it, newest first (fetch a few more
+            than limit so dropped copies can be made up for)
+        limit: Number of past workouts in the prompt
+
+    Returns:
+        The limit most recent workouts, leaving out earlier copies of the
+        current one submitted the same day (a retried or repeated submit)
+    """
+    same = _normalize_workout(current, with_date=True)
+    skipped = 0
+    while skipped < len(recent) and _normalize_workout(recent[skipped], with_date=True) == same:
+        skipped += 1
+    return recent[skipped:skipped + limit]
+
+
+class AIResponseCache:
+    """AIResponse cache with hit/miss counters"""
+
+    def __init__(self, backend=None, ttl=None):
+        self.backend = backend if backend is not None else InMemoryAICache(Config.AI_CACHE_MAX_ENTRIES)
+        self.ttl = ttl if ttl is not None else Config.AI_CACHE_TTL_SECONDS
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(current, history):
+        """Hash of the normalized prompt inputs"""
+        payload = {
+            'v': PROMPT_VERSION,
+            'current': _normalize_workout(current),
+            'history': [_normalize_workout(w, with_date=True) for w in history]
+        }
+        canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, current, history):
+        """Cached AIResponse for this context, or None"""
+        if self.ttl <= 0:
+            return None
+        value = self.backend.get(self.make_key(current, history))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if value is None:
+            return None
+        return AIResponse(**value)
+
+    def put(self, current, history, ai_response):
+        """Store a successful analysis"""
+        if self.ttl <= 0:
+            return
+        self.backend.set(self.make_key(current, history), ai_response.to_dict(), self.ttl)
+
+    def metrics(self):
+        """Hit/miss counters"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+                'entries': len(self.backend)
+            }
+
+
+ai_response_cache = AIResponseCache()
@@ -1,6 +1,10 @@
-import google.generativeai as genai
 from config import Config
+import metrics
 from models.workout import AIResponse
+from services.progress_classifier import progress_classifier
+from services.ai_cache import ai_response_cache
+from services.gemini_client import CircuitOpen, gemini_client
+import asyncio
 import json
 import logging
 
@@ -10,14 +14,18 @@ class AIService:
     """Google Gemini AI integration for workout analysis"""
     
     def __init__(self):
-        """Initialize Gemini AI client"""
-        genai.configure(api_key=Config.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-pro')
+        """Use the shared Gemini client"""
+        self.client = gemini_client
+        self.classifier = progress_classifier
+        self.cache = ai_response_cache
     
     def analyze_workout(self, current_workout, history):
         """
         Analyze workout progress using AI
         
+        Obvious cases are answered by the local classifier; Gemini is only
+        called when its confidence is below the configured threshold.
+        
         Args:
             current_workout: Current workout object
             history: List of recent workout objects
@@ -25,18 +33,82 @@ class AIService:
         Returns:
             AIResponse object with status, advice, color, and risk
         """
+        answered = self._answer_locally(current_workout, history)
+        if answered is not None:
+            return answered
+        
         try:
-            # Build history string
-            history_str = ""
-            for workout in history:
-                history_str += f"- Date: {workout.created_at.strftime('%Y-%m-%d')}, "
-                history_str += f"Weight: {workout.weight}kg, "
-                history_str += f"Reps: {workout.reps}, "
-                history_str += f"Sets: {workout.sets}, "
-                history_str += f"Feeling: {workout.feeling}\n"
+            # Generate AI response
+            with metrics.timed('gemini'):
+                response = self.client.generate(self._build_prompt(current_workout, history))
+            self.classifier.record(fast_path=False)
+            return self._parse_response(response, current_workout, history)
             
-            # Construct prompt
-            prompt = f"""
+        except CircuitOpen:
+            return self._fallback_response()
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse AI JSON response: {e}")
+            return self._fallback_response()
+        except Exception as e:
+            logger.error(f"AI analysis failed: {e}")
+            return self._fallback_response()
+    
+    async def analyze_workout_async(self, current_workout, history, timeout=None):
+        """
+        analyze_workout for the async entry point: the Gemini call is
+        awaited (no thread held) and abandoned after timeout seconds
+        (retries included, AI_ANALYSIS_TIMEOUT_SECONDS by default) with the
+        fallback answer
+        """
+        answered = self._answer_locally(current_workout, history)
+        if answered is not None:
+            return answered
+        
+        try:
+            with metrics.timed('gemini'):
+                response = await self.client.generate_async(
+                    self._build_prompt(current_workout, history),
+                    deadline=timeout or Config.AI_ANALYSIS_TIMEOUT_SECONDS
+                )
+            self.classifier.record(fast_path=False)
+            return self._parse_response(response, current_workout, history)
+            
+        except CircuitOpen:
+            return self._fallback_response()
+        except (asyncio.TimeoutError, TimeoutError):
+            logger.warning("⚠️ AI analysis timed out, using fallback")
+            return self._fallback_response()
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse AI JSON response: {e}")
+            return self._fallback_response()
+        except Exception as e:
+            logger.error(f"AI analysis failed: {e}")
+            return self._fallback_response()
+    
+    def _answer_locally(self, current_workout, history):
+        """Classifier or cached answer, None when Gemini has to be asked"""
+        # Fast path: deterministic classifier
+        classified, confidence = self.classifier.classify(current_workout, history)
+        if self.classifier.is_confident(confidence):
+            self.classifier.record(fast_path=True, status=classified.status)
+            return classified
+        
+        # Same context analyzed recently (counted by the cache, not as an LLM call)
+        return self.cache.get(current_workout, history)
+    
+    def _build_prompt(self, current_workout, history):
+        """Gemini prompt for a workout and its recent history"""
+        # Build history string
+        history_str = ""
+        for workout in history:
+            history_str += f"- Date: {workout.created_at.strftime('%Y-%m-%d')}, "
+            history_str += f"Weight: {workout.weight}kg, "
+            history_str += f"Reps: {workout.reps}, "
+            history_str += f"Sets: {workout.sets}, "
+            history_str += f"Feeling: {workout.feeling}\n"
+        
+        # Construct prompt
+        prompt = f"""
 You are EverGain AI, a smart fitness coach.
 Analyze the user's latest workout and compare it with history.
 
@@ -68,33 +140,35 @@ Assess risk (Safe / Caution / High Risk).
   "risk": "..."
 }}
 """
-            
-            # Generate AI response
-            response = self.model.generate_content(prompt)
-            
-            if not response or not response.text:
-                return self._fallback_response()
-            
-            # Parse JSON response
-            json_str = response.text.strip()
-            # Clean markdown code blocks if present
-            json_str = json_str.replace('```json', '').replace('```', '').strip()
-            
-            ai_data = json.loads(json_str)
-            
-            return AIResponse(
-                status=ai_data.get('status', 'stagnant'),
-                advice=ai_data.get('advice', 'Good effort. Keep tracking your progress.'),
-                color=ai_data.get('color', '#00D1FF'),
-                risk=ai_data.get('risk', 'Safe')
-            )
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse AI JSON response: {e}")
-            return self._fallback_response()
-        except Exception as e:
-            logger.error(f"AI analysis failed: {e}")
+        
+        return prompt
+    
+    def _parse_response(self, response, current_workout, history):
+        """
+        AIResponse from a Gemini response (cached for the same context)
+        
+        Raises:
+            json.JSONDecodeError: If the model did not answer with JSON
+        """
+        if not response or not response.text:
             return self._fallback_response()
+        
+        # Parse JSON response
+        json_str = response.text.strip()
+        # Clean markdown code blocks if present
+        json_str = json_str.replace('```json', '').replace('```', '').strip()
+        
+        ai_data = json.loads(json_str)
+        
+        ai_response = AIResponse(
+            status=ai_data.get('status', 'stagnant'),
+            advice=ai_data.get('advice', 'Good effort. Keep tracking your progress.'),
+            color=ai_data.get('color', '#00D1FF'),
+            risk=ai_data.get('risk', 'Safe')
+        )
+        self.cache.put(current_workout, history, ai_response)
+        
+        return ai_response
     
     def _fallback_response(self):
         """Fallback response when AI fails"""
@@ -0,0 +1,169 @@
+"""
+AI Analysis Pipeline
+Runs workout analyses on a bounded background worker pool so request
+workers never wait on Gemini. Each job has a deadline, counted from
+submission so time spent queued is included; a watchdog thread completes
+overdue jobs with a fallback result, and a full queue is reported back to
+the caller instead of piling up work.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisJob:
+    """A queued or running analysis"""
+
+    __slots__ = ('key', 'complete', 'fallback', 'deadline', 'done')
+
+    def __init__(self, key, complete, fallback, deadline):
+        self.key = key
+        self.complete = complete
+        self.fallback = fallback
+        self.deadline = deadline
+        self.done = threading.Event()
+
+
+class AnalysisPipeline:
+    """Bounded worker pool with per-call timeouts and a queue-depth limit"""
+
+    def __init__(self, max_workers=None, queue_depth=None, timeout=None):
+        self.max_workers = max_workers or Config.AI_ANALYSIS_WORKERS
+        self.queue_depth = queue_depth if queue_depth is not None else Config.AI_ANALYSIS_QUEUE_DEPTH
+        self.timeout = timeout or Config.AI_ANALYSIS_TIMEOUT_SECONDS
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._slots = None
+        self._executor = None
+        self._pid = None
+        self.stats = {'submitted': 0, 'completed': 0, 'timed_out': 0, 'rejected': 0, 'failed': 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _ensure_started(self):
+        """Create the pool and watchdog once per process (threads do not survive fork)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._jobs = {}
+            self._slots = threading.BoundedSemaphore(self.max_workers + self.queue_depth)
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='ai-analysis'
+            )
+            threading.Thread(target=self._watchdog, name='ai-analysis-watchdog', daemon=True).start()
+            self._pid = os.getpid()
+
+    def submit(self, key, analyze, complete, fallback):
+        """
+        Queue an analysis
+
+        Args:
+            key: Unique job key (the workout id)
+            analyze: Callable returning an AIResponse (runs on a worker)
+            complete: Callable receiving the AIResponse; called exactly once
+            fallback: Callable returning the AIResponse used on timeout or error
+
+        Returns:
+            False if the queue is full (nothing was queued), True otherwise
+        """
+        self._ensure_started()
+
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            logger.warning(f"⚠️ Analysis queue full, skipping AI for {key}")
+            return False
+
+        job = AnalysisJob(key, complete, fallback, time.monotonic() + self.timeout)
+        with self._lock:
+            self._jobs[key] = job
+        self._count('submitted')
+
+        try:
+            self._executor.submit(self._run, job, analyze)
+        except RuntimeError:
+            # Executor shut down (process exiting)
+            self._slots.release()
+            self._finish(job, fallback())
+        return True
+
+    def _run(self, job, analyze):
+        """Worker body: run the analysis unless the job already timed out"""
+        try:
+            if job.done.is_set():
+                # Timed out while queued
+                return
+            try:
+                result = analyze()
+            except Exception as e:
+                logger.error(f"❌ Analysis failed for {job.key}: {e}")
+                self._count('failed')
+                result = job.fallback()
+            if self._finish(job, result):
+                self._count('completed')
+        finally:
+            # The slot is only freed once the worker thread is really free
+            self._slots.release()
+
+    def _finish(self, job, result):
+        """Deliver a result once; later results for the same job are dropped"""
+        with self._lock:
+            if job.done.is_set():
+                return False
+            job.done.set()
+            self._jobs.pop(job.key, None)
+        try:
+            job.complete(result)
+        except Exception as e:
+            logger.error(f"❌ Failed to store analysis for {job.key}: {e}")
+        return True
+
+    def _watchdog(self):
+        """Complete overdue jobs with their fallback result"""
+        interval = min(1.0, self.timeout / 4)
+        while True:
+            time.sleep(interval)
+            now = time.monotonic()
+            with self._lock:
+                overdue = [job for job in self._jobs.values() if job.deadline < now]
+            for job in overdue:
+                if self._finish(job, job.fallback()):
+                    self._count('timed_out')
+                    logger.warning(f"⚠️ Analysis timed out after {self.timeout}s for {job.key}")
+
+    def wait(self, key, timeout):
+        """
+        Wait for a job queued in this process
+
+        Returns:
+            True if the job is finished or unknown here, False on timeout
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+        if job is None:
+            return True
+        return job.done.wait(timeout)
+
+    def is_local(self, key):
+        """Whether the job is queued or running in this process"""
+        with self._lock:
+            return key in self._jobs
+
+    def snapshot(self):
+        """Pool statistics"""
+        with self._lock:
+            in_flight = len(self._jobs)
+            stats = dict(self.stats)
+        return dict(stats, in_flight=in_flight, max_workers=self.max_workers, queue_depth=self.queue_depth)
+
+
+analysis_pipeline = AnalysisPipeline()
@@ -1,10 +1,15 @@
-import bcrypt
 import jwt
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime, timedelta
 from config import Config
 from database import get_users_collection
 from models.user import User
+from services.token_cache import token_cache, user_cache
+from services.password_hasher import HasherSaturated, password_hasher
+from bson import ObjectId
+from bson.errors import InvalidId
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +31,7 @@ class AuthService:
         
         Raises:
             ValueError: If validation fails or user exists
+            HasherSaturated: If the password hashing queue is full
         """
         # Validate request
         errors = register_request.validate()
@@ -37,11 +43,8 @@ class AuthService:
         if existing_user:
             raise ValueError('Email already registered')
         
-        # Hash password
-        password_hash = bcrypt.hashpw(
-            register_request.password.encode('utf-8'), 
-            bcrypt.gensalt()
-        ).decode('utf-8')
+        # Hash password (on the bounded hashing pool)
+        password_hash = password_hasher.hash(register_request.password)
         
         # Create new user
         new_user = User(
@@ -50,14 +53,17 @@ class AuthService:
             full_name=register_request.full_name
         )
         
-        # Save to database
-        result = self.users_collection.insert_one(new_user.to_dict())
+        # Save to database (email is unique-indexed)
+        try:
+            result = self.users_collection.insert_one(new_user.to_dict())
+        except DuplicateKeyError:
+            raise ValueError('Email already registered')
         new_user._id = result.inserted_id
         
         # Generate JWT token
         token = self._generate_token(str(new_user._id))
         
-        logger.info(f"New user registered: {new_user.email}")
+        logger.info("New user registered: %s", new_user.email)
         
         return {
             'token': token,
@@ -76,6 +82,7 @@ class AuthService:
         
         Raises:
             ValueError: If credentials are invalid
+            HasherSaturated: If the password hashing queue is full
         """
         # Validate request
         errors = login_request.validate()
@@ -89,23 +96,101 @@ class AuthService:
         
         user = User.from_dict(user_data)
         
-        # Verify password
-        if not bcrypt.checkpw(
-            login_request.password.encode('utf-8'),
-            user.password_hash.encode('utf-8')
-        ):
+        # Verify password (on the bounded hashing pool)
+        if not password_hasher.verify(login_request.password, user.password_hash):
             raise ValueError('Invalid credentials')
         
+        if password_hasher.needs_rehash(user.password_hash):
+            self._upgrade_hash(user, login_request.password)
+        
         # Generate JWT token
         token = self._generate_token(str(user._id))
         
-        logger.info(f"User logged in: {user.email}")
+        logger.info("User logged in: %s", user.email)
         
         return {
             'token': token,
             'user': user.to_json()
         }
     
+    @staticmethod
+    def verify_token(token):
+        """
+        Verify a JWT issued by _generate_token
+        
+        Returns:
+            user_id from the token
+        
+        Raises:
+            ValueError: If the token is invalid or expired
+        """
+        return AuthService.decode_token(token)['user_id']
+    
+    @staticmethod
+    def decode_token(token):
+        """
+        Verified claims of a JWT issued by _generate_token
+        
+        A token is only verified the first time it is seen; its claims are
+        then served from token_cache until it expires.
+        
+        Raises:
+            ValueError: If the token is invalid or expired
+        """
+        claims = token_cache.get(token)
+        if claims is not None:
+            return claims
+        
+        try:
+            payload = jwt.decode(token, Config.JWT_SECRET, algorithms=['HS256'])
+        except jwt.ExpiredSignatureError:
+            raise ValueError('Token expired')
+        except jwt.InvalidTokenError:
+            raise ValueError('Invalid token')
+        
+        if not payload.get('user_id'):
+            raise ValueError('Invalid token')
+        token_cache.put(token, payload)
+        return payload
+    
+    def get_user(self, user_id):
+        """
+        User record of a token holder (kept in user_cache for
+        AUTH_USER_CACHE_TTL_SECONDS)
+        
+        Returns:
+            User object or None if it does not exist
+        """
+        ttl = Config.AUTH_USER_CACHE_TTL_SECONDS
+        if ttl > 0:
+            user_data = user_cache.get(user_id)
+            if user_data is not None:
+                return User.from_dict(user_data)
+        
+        try:
+            oid = ObjectId(user_id)
+        except (InvalidId, TypeError):
+            return None
+        user_data = self.users_collection.find_one({'_id': oid})
+        if user_data and ttl > 0:
+            user_cache.set(user_id, user_data, time.time() + ttl)
+        return User.from_dict(user_data)
+    
+    def _upgrade_hash(self, user, password):
+        """Re-hash a password stored with an outdated cost (best effort)"""
+        try:
+            password_hash = password_hasher.rehash(password)
+        except HasherSaturated:
+            # Try again on a later login
+            return
+        
+        # Only replace the hash this login was checked against
+        self.users_collection.update_one(
+            {'_id': user._id, 'password_hash': user.password_hash},
+            {'$set': {'password_hash': password_hash}}
+        )
+        logger.info(f"🔐 Upgraded password hash of {user.email} to cost {password_hasher.rounds}")
+    
     def _generate_token(self, user_id):
         """Generate JWT token for user"""
         payload = {
@@ -0,0 +1,143 @@
+"""
+Catalog Cache
+In-process cache for the exercise catalog and session types. Payloads are
+pre-serialized to JSON bytes with strong ETags, so the read endpoints never
+touch MongoDB on the hot path. A background thread reloads the snapshot
+when the catalog version stamp changes.
+"""
+from config import Config
+from database import get_exercises_collection, get_session_types_collection
+from database.catalog import get_catalog_version
+import hashlib
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class CachedPayload:
+    """Pre-serialized JSON response body with its strong ETag"""
+
+    __slots__ = ('body', 'etag')
+
+    def __init__(self, data):
+        self.body = json.dumps(data, separators=(',', ':'), sort_keys=True).encode('utf-8')
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+
+
+class CatalogSnapshot:
+    """Immutable view of the catalog at one version"""
+
+    def __init__(self, version, exercises, session_types):
+        self.version = version
+
+        # Session type -> exercises inverted index
+        by_session = {}
+        for exercise in exercises:
+            for session_type in exercise.get('sessions', []):
+                by_session.setdefault(session_type, []).append(exercise)
+
+        # Session types grouped by category (same shape as SessionService)
+        categorized = {}
+        for session_type in session_types:
+            categorized.setdefault(session_type['category'], []).append(session_type)
+
+        muscle_groups = sorted({e['muscle_group'] for e in exercises if e.get('muscle_group')})
+
+        self.session_type_names = frozenset(t['name'] for t in session_types)
+        self.muscle_group_by_exercise = {e['name']: e.get('muscle_group') for e in exercises}
+        self.exercises = CachedPayload(exercises)
+        self.muscle_groups = CachedPayload(muscle_groups)
+        self.session_types = CachedPayload(session_types)
+        self.categorized = CachedPayload(categorized)
+        self.exercises_by_session = {
+            name: CachedPayload(items) for name, items in by_session.items()
+        }
+        self.no_exercises = CachedPayload([])
+
+    def exercises_for_session(self, session_type):
+        """Pre-serialized exercises for a session type"""
+        return self.exercises_by_session.get(session_type, self.no_exercises)
+
+
+class CatalogCache:
+    """Versioned catalog cache shared by every request in the process"""
+
+    def __init__(self, check_interval=None):
+        self.check_interval = (
+            check_interval if check_interval is not None
+            else Config.CATALOG_VERSION_CHECK_SECONDS
+        )
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._watcher_pid = None
+        self._stop = threading.Event()
+
+    def _load(self, version=None):
+        """Read the whole catalog from MongoDB and build a new snapshot"""
+        if version is None:
+            version = get_catalog_version()
+        exercises = list(get_exercises_collection().find({}, {'_id': 0}))
+        session_types = list(get_session_types_collection().find({}, {'_id': 0}))
+        snapshot = CatalogSnapshot(version, exercises, session_types)
+        logger.info(f"✅ Catalog v{version} cached: {len(exercises)} exercises, {len(session_types)} session types")
+        return snapshot
+
+    def get(self):
+        """
+        Get the current snapshot
+
+        Only the very first call (or the first after a failed load) reads
+        from MongoDB; later version changes are picked up by the watcher.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load()
+                snapshot = self._snapshot
+        self._ensure_watcher()
+        return snapshot
+
+    def refresh(self, force=False):
+        """Reload the snapshot if the version stamp changed"""
+        version = get_catalog_version()
+        current = self._snapshot
+        if force or current is None or current.version != version:
+            snapshot = self._load(version)
+            with self._lock:
+                self._snapshot = snapshot
+            return True
+        return False
+
+    def invalidate(self):
+        """Drop the snapshot; the next get() reloads it"""
+        with self._lock:
+            self._snapshot = None
+
+    def _ensure_watcher(self):
+        """Start the version watcher once per process (threads do not survive fork)"""
+        if self.check_interval <= 0 or self._watcher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
+            thread = threading.Thread(target=self._watch, name='catalog-watcher', daemon=True)
+            thread.start()
+
+    def _watch(self):
+        while not self._stop.wait(self.check_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"⚠️ Catalog version check failed: {e}")
+
+    def stop(self):
+        """Stop the background watcher"""
+        self._stop.set()
+
+
+catalog_cache = CatalogCache()
@@ -0,0 +1,168 @@
+"""
+Training Log Export
+Streams a user's sessions joined with their sets straight from one
+aggregation cursor. Rows are encoded as they arrive and flushed in small
+chunks, so memory stays bounded by the cursor batch no matter how long
+the history is.
+"""
+from database import get_sessions_collection
+from database.workout_sets import WORKOUT_SETS_COLLECTION, set_field, from_storage
+from models.workout_set import WIB
+from datetime import datetime, timezone
+import csv
+import io
+import json
+import zlib
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+# Bytes collected before a chunk is handed to the response
+CHUNK_SIZE = 64 * 1024
+
+SESSION_EXPORT_FIELDS = ('session_type', 'started_at', 'ended_at', 'total_sets', 'total_volume')
+SET_EXPORT_FIELDS = ('exercise_name', 'set_number', 'weight', 'reps', 'rpe', 'volume', 'timestamp', 'notes')
+
+CSV_COLUMNS = ['session_id'] + list(SESSION_EXPORT_FIELDS) + ['set_id'] + list(SET_EXPORT_FIELDS)
+
+
+def _to_wib(value):
+    """Stored naive UTC datetime -> WIB ISO string"""
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=timezone.utc).astimezone(WIB).isoformat()
+    return value
+
+
+def export_pipeline(user_id, since=None, until=None):
+    """
+    Aggregation joining each session with its sets, oldest session first
+
+    Args:
+        user_id: User ID
+        since: Only sessions started at or after this (naive UTC)
+        until: Only sessions started before this (naive UTC)
+    """
+    match = {'user_id': user_id}
+    started_at = {}
+    if since:
+        started_at['$gte'] = since
+    if until:
+        started_at['$lt'] = until
+    if started_at:
+        match['started_at'] = started_at
+
+    # Embedded documents keep _id only when it is asked for
+    set_projection = {f"sets.{field}": 1 for field in SET_EXPORT_FIELDS + ('_id',) if field != 'exercise_name'}
+    set_projection[f"sets.{set_field('exercise_name')}"] = 1
+
+    return [
+        {'$match': match},
+        {'$sort': {'started_at': 1, '_id': 1}},
+        {'$project': dict({field: 1 for field in SESSION_EXPORT_FIELDS}, session_key={'$toString': '$_id'})},
+        {'$lookup': {
+            'from': WORKOUT_SETS_COLLECTION,
+            'localField': 'session_key',
+            'foreignField': set_field('session_id'),
+            'as': 'sets'
+        }},
+        {'$project': dict({field: 1 for field in SESSION_EXPORT_FIELDS}, **set_projection)}
+    ]
+
+
+def iter_sessions(user_id, since=None, until=None, batch_size=200):
+    """
+    Yield export-ready session dicts (with their sets) from one cursor
+
+    The cursor fetches batch_size sessions per round trip; nothing else
+    is buffered.
+    """
+    cursor = get_sessions_collection().aggregate(
+        export_pipeline(user_id, since, until),
+        batchSize=batch_size
+    )
+    with cursor:
+        for session in cursor:
+            sets = []
+            for workout_set in sorted(session.get('sets', []), key=lambda ws: ws.get('timestamp') or datetime.min):
+                from_storage(workout_set)
+                sets.append(dict(
+                    {field: workout_set.get(field) for field in SET_EXPORT_FIELDS},
+                    _id=str(workout_set['_id']),
+                    timestamp=_to_wib(workout_set.get('timestamp'))
+                ))
+            yield dict(
+                {field: _to_wib(session.get(field)) for field in SESSION_EXPORT_FIELDS},
+                _id=str(session['_id']),
+                sets=sets
+            )
+
+
+def _chunked(pieces):
+    """Group small strings into ~CHUNK_SIZE byte chunks"""
+    buffer = []
+    size = 0
+    for piece in pieces:
+        data = piece.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= CHUNK_SIZE:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def ndjson_lines(sessions):
+    """One JSON document per session"""
+    for session in sessions:
+        yield json.dumps(session, separators=(',', ':')) + '\n'
+
+
+def csv_lines(sessions):
+    """One row per set; sessions without sets get one row with empty set columns"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(row):
+        writer.writerow(row)
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    yield line(CSV_COLUMNS)
+    for session in sessions:
+        session_columns = [session['_id']] + [session.get(field) for field in SESSION_EXPORT_FIELDS]
+        if not session['sets']:
+            yield line(session_columns + [None] * (1 + len(SET_EXPORT_FIELDS)))
+        for workout_set in session['sets']:
+            yield line(session_columns + [workout_set['_id']] + [workout_set.get(field) for field in SET_EXPORT_FIELDS])
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a byte stream on the fly (gzip container)"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(user_id, fmt='ndjson', since=None, until=None, batch_size=200, gzip=False):
+    """
+    Byte chunks of a user's export
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+
+    sessions = iter_sessions(user_id, since, until, batch_size)
+    lines = ndjson_lines(sessions) if fmt == 'ndjson' else csv_lines(sessions)
+    chunks = _chunked(lines)
+    return gzip_chunks(chunks) if gzip else chunks
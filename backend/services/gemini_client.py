@@ -0,0 +1,410 @@
+"""
+Gemini Client
+One long-lived Gemini client per process, shared by every AIService, with
+the call policy around it:
+
+- a deadline per call (GEMINI_DEADLINE_SECONDS) and per attempt
+  (GEMINI_ATTEMPT_TIMEOUT_SECONDS), passed down to the transport;
+- bounded retries of transient errors (5xx, 429, timeouts, connection
+  errors) with full-jitter exponential backoff, within the deadline (the
+  SDK's own retry is turned off so the two do not stack);
+- hedging: when an attempt is slower than the GEMINI_HEDGE_PERCENTILE of
+  recent successful calls, a second identical request is sent and the
+  first answer wins;
+- a circuit breaker: after GEMINI_BREAKER_FAILURES failed calls in a row,
+  calls fail fast (CircuitOpen) for GEMINI_BREAKER_COOLDOWN_SECONDS, then
+  a single trial call decides whether to close it again.
+
+Blocking calls run on a bounded pool (GEMINI_MAX_CONCURRENCY); a full pool
+fails fast instead of queueing. GEMINI_API_ENDPOINT points the client at
+another server over REST (a proxy, or benchmarks/fake_gemini.py).
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from config import Config
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class GeminiUnavailable(Exception):
+    """Gemini was not asked (use the fallback answer)"""
+
+
+class CircuitOpen(GeminiUnavailable):
+    """The circuit breaker is open: Gemini is considered unhealthy"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a cool-down and a single trial call"""
+
+    def __init__(self, failure_threshold, cooldown_seconds):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go out now (claims the trial call when half open)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown_seconds:
+                self.state = HALF_OPEN
+                self._trial_running = False
+            if self.state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info("✅ Gemini circuit closed")
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning(f"⚠️ Gemini circuit opened after {self.failures} failures")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self._trial_running = False
+
+    def release_trial(self):
+        """The trial call ended without telling anything about Gemini"""
+        with self._lock:
+            self._trial_running = False
+
+
+class LatencyWindow:
+    """Latencies of the most recent successful calls"""
+
+    def __init__(self, size=200, min_samples=20):
+        self.size = size
+        self.min_samples = min_samples
+        self._samples = []
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            if len(self._samples) < self.size:
+                self._samples.append(seconds)
+            else:
+                self._samples[self._next] = seconds
+                self._next = (self._next + 1) % self.size
+
+    def percentile(self, pct):
+        """Latency percentile in seconds, None until there are enough samples"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            samples = sorted(self._samples)
+        return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def is_transient(error):
+    """Upstream trouble worth another attempt (and counted by the breaker)"""
+    from google.api_core import exceptions
+
+    # OSError covers TimeoutError and the transports' connection errors
+    return isinstance(error, (exceptions.ServerError, exceptions.TooManyRequests, OSError))
+
+
+class GeminiClient:
+    """Shared Gemini client with deadlines, retries, hedging and a circuit breaker"""
+
+    def __init__(self):
+        self.breaker = CircuitBreaker(Config.GEMINI_BREAKER_FAILURES, Config.GEMINI_BREAKER_COOLDOWN_SECONDS)
+        self.latency = LatencyWindow()
+        self.max_concurrency = Config.GEMINI_MAX_CONCURRENCY
+        self._client = None
+        self._async_client = None
+        self._executor = None
+        self._slots = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.stats = {
+            'calls': 0, 'succeeded': 0, 'failed': 0, 'short_circuited': 0,
+            'attempts': 0, 'retries': 0, 'hedges': 0, 'hedge_wins': 0, 'timeouts': 0, 'saturated': 0
+        }
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def _ensure_started(self):
+        """Configure the SDK and create the client and pool once per process"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            import google.generativeai as genai
+            from google.generativeai import client
+
+            options = {'api_key': Config.GEMINI_API_KEY}
+            if Config.GEMINI_API_ENDPOINT:
+                options.update(transport='rest', client_options={'api_endpoint': Config.GEMINI_API_ENDPOINT})
+            genai.configure(**options)
+            self._client = client.get_default_generative_client()
+            self._async_client = None
+            self._slots = threading.BoundedSemaphore(self.max_concurrency)
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='gemini')
+            self._pid = os.getpid()
+
+    def _request(self, prompt):
+        """generateContent request for a prompt"""
+        import google.ai.generativelanguage as glm
+        from google.generativeai.types import content_types
+
+        model = Config.GEMINI_MODEL if '/' in Config.GEMINI_MODEL else f"models/{Config.GEMINI_MODEL}"
+        return glm.GenerateContentRequest(model=model, contents=content_types.to_contents(prompt))
+
+    def _backoff(self, attempt):
+        """Full-jitter exponential backoff before retry number `attempt` (from 1)"""
+        return random.uniform(0, min(Config.GEMINI_RETRY_MAX_SECONDS, Config.GEMINI_RETRY_BASE_SECONDS * 2 ** (attempt - 1)))
+
+    def _hedge_delay(self, timeout):
+        """Seconds after which to hedge an attempt, None for no hedge"""
+        if not Config.GEMINI_HEDGE_PERCENTILE:
+            return None
+        delay = self.latency.percentile(Config.GEMINI_HEDGE_PERCENTILE)
+        return delay if delay is not None and delay < timeout else None
+
+    def _call(self, request, timeout):
+        """One blocking request (on a pool thread)"""
+        from google.generativeai.types import generation_types
+
+        started = time.monotonic()
+        response = self._client.generate_content(request, retry=None, timeout=timeout)
+        self.latency.add(time.monotonic() - started)
+        return generation_types.GenerateContentResponse.from_response(response)
+
+    def _submit(self, request, timeout):
+        """Start _call on the pool (the slot is freed once the call returns)"""
+        if not self._slots.acquire(blocking=False):
+            self._count('saturated')
+            raise GeminiUnavailable('Too many Gemini calls in flight')
+        try:
+            future = self._executor.submit(self._call, request, timeout)
+        except RuntimeError:
+            # Executor shut down (process exiting)
+            self._slots.release()
+            raise GeminiUnavailable('Gemini client is shutting down')
+        future.add_done_callback(lambda _: self._slots.release())
+        self._count('attempts')
+        return future
+
+    def _attempt(self, request, timeout):
+        """
+        One attempt, hedged after the latency percentile; the first
+        successful answer wins
+
+        Raises:
+            TimeoutError: If no answer arrived within timeout seconds
+        """
+        started = time.monotonic()
+        futures = [self._submit(request, timeout)]
+
+        hedge_after = self._hedge_delay(timeout)
+        if hedge_after is not None:
+            done, _ = wait(futures, timeout=hedge_after)
+            if not done:
+                try:
+                    futures.append(self._submit(request, timeout - (time.monotonic() - started)))
+                    self._count('hedges')
+                except GeminiUnavailable:
+                    pass
+
+        error = None
+        pending = set(futures)
+        while pending:
+            remaining = timeout - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not futures[0]:
+                        self._count('hedge_wins')
+                    return future.result()
+                error = future.exception()
+        if error is not None and not pending:
+            raise error
+        self._count('timeouts')
+        raise TimeoutError(f"Gemini did not answer within {timeout:.1f}s")
+
+    def generate(self, prompt, deadline=None):
+        """
+        Ask Gemini (blocking)
+
+        Args:
+            prompt: Prompt text
+            deadline: Seconds for the whole call, retries included
+                (GEMINI_DEADLINE_SECONDS by default)
+
+        Returns:
+            The SDK's GenerateContentResponse
+
+        Raises:
+            CircuitOpen: If Gemini is considered unhealthy
+            GeminiUnavailable, TimeoutError or an SDK error otherwise
+        """
+        self._ensure_started()
+        self._before_call()
+        request = self._request(prompt)
+
+        give_up_at = time.monotonic() + (deadline or Config.GEMINI_DEADLINE_SECONDS)
+        attempt = 0
+        while True:
+            remaining = give_up_at - time.monotonic()
+            try:
+                response = self._attempt(request, min(remaining, Config.GEMINI_ATTEMPT_TIMEOUT_SECONDS))
+            except Exception as e:
+                attempt += 1
+                pause = self._retry_pause(e, attempt, give_up_at)
+                if pause is None:
+                    raise
+                time.sleep(pause)
+                continue
+            self._after_success()
+            return response
+
+    async def _call_async(self, request, timeout):
+        """One request from the event loop (REST has no async transport: pool thread)"""
+        from google.generativeai.types import generation_types
+
+        if Config.GEMINI_API_ENDPOINT:
+            return await asyncio.wrap_future(self._submit(request, timeout))
+
+        if self._async_client is None:
+            from google.generativeai import client
+            self._async_client = client.get_default_generative_async_client()
+        self._count('attempts')
+        started = time.monotonic()
+        response = await self._async_client.generate_content(request, retry=None, timeout=timeout)
+        self.latency.add(time.monotonic() - started)
+        return generation_types.AsyncGenerateContentResponse.from_response(response)
+
+    async def _attempt_async(self, request, timeout):
+        """_attempt for the event loop (losing and late calls are cancelled)"""
+        started = time.monotonic()
+        tasks = [asyncio.ensure_future(self._call_async(request, timeout))]
+        try:
+            hedge_after = self._hedge_delay(timeout)
+            if hedge_after is not None:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+                if not done:
+                    tasks.append(asyncio.ensure_future(self._call_async(request, timeout - (time.monotonic() - started))))
+                    self._count('hedges')
+
+            error = None
+            pending = set(tasks)
+            while pending:
+                remaining = timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            self._count('hedge_wins')
+                        return task.result()
+                    error = task.exception()
+                    if isinstance(error, GeminiUnavailable) and task is not tasks[0]:
+                        # The hedge found the pool full; keep waiting for the first call
+                        error = None
+            if error is not None and not pending:
+                raise error
+            self._count('timeouts')
+            raise TimeoutError(f"Gemini did not answer within {timeout:.1f}s")
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def generate_async(self, prompt, deadline=None):
+        """generate() for the async entry point (same policy)"""
+        self._ensure_started()
+        self._before_call()
+        request = self._request(prompt)
+
+        give_up_at = time.monotonic() + (deadline or Config.GEMINI_DEADLINE_SECONDS)
+        attempt = 0
+        while True:
+            remaining = give_up_at - time.monotonic()
+            try:
+                response = await self._attempt_async(request, min(remaining, Config.GEMINI_ATTEMPT_TIMEOUT_SECONDS))
+            except Exception as e:
+                attempt += 1
+                pause = self._retry_pause(e, attempt, give_up_at)
+                if pause is None:
+                    raise
+                await asyncio.sleep(pause)
+                continue
+            self._after_success()
+            return response
+
+    def _before_call(self):
+        self._count('calls')
+        if not self.breaker.allow():
+            self._count('short_circuited')
+            raise CircuitOpen('Gemini circuit is open')
+
+    def _after_success(self):
+        self.breaker.record_success()
+        self._count('succeeded')
+
+    def _retry_pause(self, error, attempt, give_up_at):
+        """
+        Backoff before retrying after a failed attempt, or None when the
+        call has failed for good (recorded here)
+        """
+        retryable = isinstance(error, GeminiUnavailable) or is_transient(error)
+        pause = self._backoff(attempt)
+        if retryable and attempt <= Config.GEMINI_MAX_RETRIES and time.monotonic() + pause < give_up_at:
+            logger.warning(f"⚠️ Gemini attempt {attempt} failed ({type(error).__name__}), retrying in {pause:.2f}s")
+            self._count('retries')
+            return pause
+
+        self._count('failed')
+        if is_transient(error):
+            self.breaker.record_failure()
+        else:
+            # Bad request, auth error or a full pool: nothing to hold against Gemini
+            self.breaker.release_trial()
+        return None
+
+    def snapshot(self):
+        """Call statistics and breaker state"""
+        with self._lock:
+            stats = dict(self.stats)
+        p95 = self.latency.percentile(95)
+        hedge_after = self._hedge_delay(float('inf'))
+        return dict(
+            stats,
+            circuit=self.breaker.state,
+            consecutive_failures=self.breaker.failures,
+            hedge_after_ms=round(hedge_after * 1000, 1) if hedge_after is not None else None,
+            p95_ms=round(p95 * 1000, 1) if p95 is not None else None,
+            max_concurrency=self.max_concurrency
+        )
+
+
+gemini_client = GeminiClient()
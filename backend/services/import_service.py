@@ -0,0 +1,586 @@
+"""
+Training History Import
+Imports CSV/JSON exports of other trackers (Strong, Hevy, FitNotes, ...)
+and of EverGain itself on a small background worker pool. The file is
+parsed as a stream, exercise names are mapped onto the catalog, rows of
+one workout become a synthesized ended session, and sessions and sets are
+written in chunks with insert_many. Progress is checkpointed on the job
+document after every chunk, so an interrupted job resumes where it stopped.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from database import get_sessions_collection
+from database.import_jobs import (
+    RUNNING,
+    COMPLETED,
+    FAILED,
+    update_import_job,
+    claim_import_job
+)
+from database.personal_records import bulk_update_personal_records
+from database.rollups import rebuild_rollups
+from database.workout_sets import get_workout_sets_collection, storage_filter, set_document, exercise_summary
+from models.strength import estimated_1rm
+from models.session import Session
+from models.workout_set import WorkoutSet, WIB
+from bson import ObjectId
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+import csv
+import difflib
+import io
+import itertools
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('csv', 'json')
+
+# File extension -> format
+EXTENSIONS = {
+    '.csv': 'csv',
+    '.json': 'json',
+    '.ndjson': 'json',
+    '.jsonl': 'json'
+}
+
+# Session type of imported workouts whose name is not a catalog session type
+IMPORTED_SESSION_TYPE = 'Imported'
+
+LBS_TO_KG = 0.45359237
+
+# Accepted column names per field, in order of preference (compared
+# lowercase, with '_', '-' and brackets ignored)
+COLUMN_ALIASES = {
+    'exercise_name': ('exercise name', 'exercise', 'exercise title'),
+    'weight': ('weight', 'weight kg', 'weight kgs'),
+    'weight_lbs': ('weight lbs', 'weight lb'),
+    'weight_unit': ('weight unit', 'unit'),
+    'reps': ('reps', 'repetitions', 'rep'),
+    'rpe': ('rpe',),
+    'notes': ('notes', 'note', 'exercise notes', 'comment'),
+    'timestamp': ('timestamp', 'date', 'start time', 'started at', 'datetime'),
+    'ended_at': ('ended at', 'end time'),
+    'session_id': ('session id', 'workout id'),
+    'session_type': ('session type', 'workout name', 'title', 'routine')
+}
+
+TIMESTAMP_FORMATS = (
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%d %b %Y, %H:%M',
+    '%d %b %Y %H:%M',
+    '%d/%m/%Y %H:%M',
+    '%d/%m/%Y',
+    '%m/%d/%Y %H:%M',
+    '%m/%d/%Y'
+)
+
+# Bytes read per step while scanning a JSON array
+JSON_READ_SIZE = 64 * 1024
+
+# Row errors and exercise matches kept on the job document
+MAX_REPORTED = 50
+
+
+def _column_key(name) -> str:
+    return ' '.join(re.sub(r'[_\-()\[\]]', ' ', str(name).lower()).split())
+
+
+def column_mapping(columns) -> dict:
+    """Field -> source column, for the columns of a file or record"""
+    by_key = {}
+    for column in columns:
+        by_key.setdefault(_column_key(column), column)
+    mapping = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in by_key:
+                mapping[field] = by_key[alias]
+                break
+    return mapping
+
+
+def _number(value, cast=float):
+    """Parse a number cell ('' and None are missing; decimal commas allowed)"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return cast(value)
+    text = str(value).strip()
+    if not text:
+        return None
+    if ',' in text and '.' not in text:
+        text = text.replace(',', '.')
+    return cast(float(text))
+
+
+@lru_cache(maxsize=4096)
+def parse_timestamp(value) -> datetime:
+    """
+    Parse an export timestamp into naive UTC (times without an offset are WIB)
+
+    Cached: exports repeat the workout's date on every set row.
+
+    Raises:
+        ValueError: If the value is not a recognized date
+    """
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        text = str(value or '').strip()
+        if text.endswith('Z'):
+            text = text[:-1] + '+00:00'
+        try:
+            parsed = datetime.fromisoformat(text)
+        except ValueError:
+            for fmt in TIMESTAMP_FORMATS:
+                try:
+                    parsed = datetime.strptime(text, fmt)
+                    break
+                except ValueError:
+                    continue
+            else:
+                raise ValueError(f"Unrecognized date: {value}")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=WIB)
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _name_keys(name: str) -> list:
+    """Comparable forms of an exercise name: all words, then without brackets"""
+    keys = []
+    for text in (name, re.sub(r'\(.*?\)', ' ', name)):
+        key = ' '.join(sorted(re.sub(r'[^a-z0-9]+', ' ', text.lower()).split()))
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+
+class ExerciseMatcher:
+    """
+    Maps exercise names of other apps onto catalog names
+
+    Names are compared as sorted lowercase words (so "Bench Press
+    (Barbell)" meets "Barbell Bench Press"), exactly first and then with
+    difflib. Results are cached per source name.
+    """
+
+    def __init__(self, catalog_names, cutoff=None):
+        self.cutoff = cutoff if cutoff is not None else Config.IMPORT_MATCH_CUTOFF
+        self._by_key = {}
+        for name in catalog_names:
+            for key in _name_keys(name):
+                self._by_key.setdefault(key, name)
+        self._keys = list(self._by_key)
+        self._cache = {}
+
+    def match(self, name: str):
+        """Catalog name for a source name, or None"""
+        if name in self._cache:
+            return self._cache[name]
+        keys = _name_keys(name)
+        result = next((self._by_key[key] for key in keys if key in self._by_key), None)
+        if result is None:
+            for key in keys:
+                close = difflib.get_close_matches(key, self._keys, n=1, cutoff=self.cutoff)
+                if close:
+                    result = self._by_key[close[0]]
+                    break
+        self._cache[name] = result
+        return result
+
+
+def _csv_records(text):
+    """Rows of a CSV file as dicts (',', ';' or tab separated)"""
+    header = text.readline()
+    delimiter = max(',;\t', key=header.count)
+    columns = next(csv.reader([header], delimiter=delimiter), [])
+    return csv.DictReader(text, fieldnames=columns, delimiter=delimiter)
+
+
+def _json_array(text, buffer):
+    """Elements of a JSON array, decoded incrementally"""
+    decoder = json.JSONDecoder()
+    eof = False
+    while True:
+        buffer = buffer.lstrip()
+        if buffer.startswith(','):
+            buffer = buffer[1:].lstrip()
+        if buffer.startswith(']'):
+            return
+        try:
+            value, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise ValueError('Malformed JSON array')
+            chunk = text.read(JSON_READ_SIZE)
+            eof = not chunk
+            buffer += chunk
+            continue
+        yield value
+        buffer = buffer[end:]
+
+
+def _json_records(text):
+    """Records of a JSON array or of newline-delimited JSON"""
+    head = text.read(JSON_READ_SIZE)
+    stripped = head.lstrip()
+    if stripped.startswith('['):
+        yield from _json_array(text, stripped[1:])
+        return
+    for line in itertools.chain((head + text.readline()).splitlines(), text):
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                # Reported as a skipped row
+                yield e
+
+
+def _record_rows(record) -> list:
+    """
+    Flat rows of a record; an EverGain export session (with a 'sets'
+    list) becomes one row per set
+    """
+    if not isinstance(record, dict):
+        raise ValueError('Record is not an object')
+    if not isinstance(record.get('sets'), list):
+        return [record]
+    base = {key: value for key, value in record.items() if key not in ('sets', '_id')}
+    base.setdefault('session_id', record.get('_id'))
+    return [
+        dict(base, **{key: value for key, value in workout_set.items() if key != '_id'})
+        for workout_set in record['sets'] if isinstance(workout_set, dict)
+    ]
+
+
+def parse_row(row: dict, mapping: dict) -> dict:
+    """
+    Normalize one source row
+
+    Returns:
+        dict with exercise_name, weight (kg), reps, rpe, notes, timestamp,
+        ended_at (naive UTC), session_id and session_type
+
+    Raises:
+        ValueError: If a required value is missing or malformed
+    """
+    values = {}
+    for field, column in mapping.items():
+        cell = row.get(column)
+        if isinstance(cell, str):
+            cell = cell.strip()
+        if cell not in (None, ''):
+            values[field] = cell
+
+    exercise_name = values.get('exercise_name')
+    if not exercise_name:
+        raise ValueError('Missing exercise name')
+    reps = _number(values.get('reps'), int)
+    if not reps or reps < 0:
+        raise ValueError('Missing reps')
+    if 'timestamp' not in values:
+        raise ValueError('Missing date')
+
+    weight = _number(values.get('weight'))
+    if weight is None and 'weight_lbs' in values:
+        weight = _number(values['weight_lbs']) * LBS_TO_KG
+    elif weight is not None and str(values.get('weight_unit', '')).lower().startswith('lb'):
+        weight *= LBS_TO_KG
+    rpe = _number(values.get('rpe'))
+
+    return {
+        'exercise_name': str(exercise_name),
+        'weight': round(weight or 0.0, 2),
+        'reps': reps,
+        'rpe': int(round(rpe)) if rpe else None,
+        'notes': str(values['notes']) if 'notes' in values else None,
+        'timestamp': parse_timestamp(values['timestamp']),
+        'ended_at': parse_timestamp(values['ended_at']) if 'ended_at' in values else None,
+        'session_id': str(values['session_id']) if 'session_id' in values else None,
+        'session_type': str(values['session_type']) if 'session_type' in values else None
+    }
+
+
+@lru_cache(maxsize=4096)
+def _wib_date(timestamp: datetime):
+    return timestamp.replace(tzinfo=timezone.utc).astimezone(WIB).date()
+
+
+def _session_key(row: dict):
+    """Rows with the same key in a row belong to one workout"""
+    if row['session_id']:
+        return row['session_id']
+    return (row['session_type'] or '', _wib_date(row['timestamp']))
+
+
+class ImportRun:
+    """One pass over a job's file (a fresh start or a resume)"""
+
+    def __init__(self, job, chunk_size=None):
+        from services.catalog_service import catalog_cache
+
+        catalog = catalog_cache.get()
+        self.job = job
+        self.job_id = job['_id']
+        self.user_id = job['user_id']
+        self.chunk_size = chunk_size or Config.IMPORT_CHUNK_SIZE
+        self.matcher = ExerciseMatcher(catalog.muscle_group_by_exercise)
+        self.session_types = {name.lower(): name for name in catalog.session_type_names}
+
+        self.progress = dict(job['progress'])
+        self.matches = {entry['source']: entry['matched'] for entry in job.get('exercise_matches', [])}
+        self.unmatched = set(job.get('unmatched_exercises', []))
+        # Rows after the checkpoint are read again, and so are their errors
+        self.errors = [error for error in job.get('errors', []) if error['row'] <= self.progress['rows_done']]
+
+        self.current = None
+        self.mark = None
+        self.saved = dict(self.progress)
+        self.pending_sessions = []
+        self.pending_sets = []
+        self.last_report = time.monotonic()
+
+    def _cleanup(self, from_row):
+        """Remove what an interrupted run wrote after the checkpoint"""
+        sessions_collection = get_sessions_collection()
+        query = {'import_job_id': self.job_id, 'import_row': {'$gte': from_row}}
+        session_ids = [str(doc['_id']) for doc in sessions_collection.find(query, {'_id': 1})]
+        if not session_ids:
+            return
+        get_workout_sets_collection().delete_many(storage_filter({'session_id': {'$in': session_ids}}))
+        sessions_collection.delete_many(query)
+        logger.info(f"🗑️  Removed {len(session_ids)} partially imported sessions of job {self.job_id}")
+
+    def _exercise(self, source_name):
+        """Catalog name for a source exercise (the source name if unmatched)"""
+        matched = self.matcher.match(source_name)
+        if matched is None:
+            self.unmatched.add(source_name)
+            return source_name
+        if matched != source_name:
+            self.matches.setdefault(source_name, matched)
+        return matched
+
+    def _skip(self, row_number, error):
+        self.progress['rows_skipped'] += 1
+        if len(self.errors) < MAX_REPORTED:
+            self.errors.append({'row': row_number, 'error': str(error)})
+
+    def _add(self, row_number, row):
+        key = _session_key(row)
+        if self.current is None or self.current['key'] != key:
+            self._close_session()
+            # Everything before this row is complete; a resume starts here
+            self.mark = dict(self.progress, rows_done=row_number - 1)
+            self.current = {'key': key, 'row': row_number, 'title': row['session_type'], 'rows': []}
+        self.current['rows'].append(row)
+
+    def _close_session(self):
+        """Turn the rows of the current workout into a session and its sets"""
+        current, self.current = self.current, None
+        if current is None:
+            return
+        session_oid = ObjectId()
+        session_id = str(session_oid)
+        set_numbers = {}
+        summaries = {}
+        ended_at = None
+        for row in current['rows']:
+            exercise_name = self._exercise(row['exercise_name'])
+            set_numbers[exercise_name] = set_numbers.get(exercise_name, 0) + 1
+            workout_set = WorkoutSet(
+                session_id=session_id,
+                exercise_name=exercise_name,
+                weight=row['weight'],
+                reps=row['reps'],
+                rpe=row['rpe'],
+                notes=row['notes'],
+                set_number=set_numbers[exercise_name],
+                timestamp=row['timestamp'],
+                user_id=self.user_id
+            )
+            self.pending_sets.append(workout_set)
+
+            volume = workout_set.weight * workout_set.reps
+            entry = summaries.setdefault(exercise_name, exercise_summary(exercise_name, 0, 0, 0, 0, 0))
+            entry['sets'] += 1
+            entry['last_set_number'] = workout_set.set_number
+            entry['total_reps'] += workout_set.reps
+            entry['total_volume'] += volume
+            entry['max_weight'] = max(entry['max_weight'], workout_set.weight)
+            entry['best_e1rm'] = max(entry['best_e1rm'], round(estimated_1rm(workout_set.weight, workout_set.reps), 2))
+            ended_at = max(filter(None, (ended_at, row['ended_at'], row['timestamp'])))
+
+        title = current['title']
+        exercises_performed = list(summaries.values())
+        session = Session(
+            user_id=self.user_id,
+            session_type=self.session_types.get((title or '').lower(), IMPORTED_SESSION_TYPE),
+            started_at=min(row['timestamp'] for row in current['rows']),
+            ended_at=ended_at,
+            total_sets=len(current['rows']),
+            total_volume=sum(entry['total_volume'] for entry in exercises_performed),
+            exercises_performed=exercises_performed
+        )
+        doc = session.to_dict()
+        doc.update(_id=session_oid, import_job_id=self.job_id, import_row=current['row'], import_title=title)
+        self.pending_sessions.append(doc)
+
+    def _flush(self):
+        """Write the pending complete sessions and checkpoint"""
+        if self.pending_sessions:
+            # Sessions first: resume cleanup finds stray sets through them
+            get_sessions_collection().insert_many(self.pending_sessions, ordered=False)
+            get_workout_sets_collection().insert_many(
+                [set_document(workout_set) for workout_set in self.pending_sets],
+                ordered=False
+            )
+            groups = {}
+            for workout_set in self.pending_sets:
+                groups.setdefault((self.user_id, workout_set.exercise_name), []).append(workout_set)
+            bulk_update_personal_records(groups)
+
+            self.mark['sessions_created'] += len(self.pending_sessions)
+            self.mark['sets_created'] += len(self.pending_sets)
+            self.progress['sessions_created'] += len(self.pending_sessions)
+            self.progress['sets_created'] += len(self.pending_sets)
+            self.pending_sessions = []
+            self.pending_sets = []
+        self._report(self.mark)
+        self.saved = dict(self.mark)
+
+    def _report(self, progress):
+        update_import_job(
+            self.job_id,
+            progress=progress,
+            exercise_matches=[
+                {'source': source, 'matched': matched}
+                for source, matched in sorted(self.matches.items())[:MAX_REPORTED]
+            ],
+            unmatched_exercises=sorted(self.unmatched)[:MAX_REPORTED],
+            errors=self.errors
+        )
+        self.last_report = time.monotonic()
+
+    def run(self):
+        rows_done = self.progress['rows_done']
+        self._cleanup(rows_done + 1)
+        if rows_done:
+            logger.info(f"⏩ Resuming import {self.job_id} after row {rows_done}")
+
+        with open(self.job['path'], 'rb') as binary:
+            text = io.TextIOWrapper(binary, encoding='utf-8-sig', newline='')
+            records = _csv_records(text) if self.job['format'] == 'csv' else _json_records(text)
+            mappings = {}
+            self.mark = dict(self.progress)
+
+            for row_number, record in enumerate(records, start=1):
+                if row_number <= rows_done:
+                    continue
+                self.progress['rows_read'] = max(self.progress['rows_read'], row_number)
+                try:
+                    if isinstance(record, Exception):
+                        raise record
+                    for row in _record_rows(record):
+                        columns = tuple(row)
+                        if columns not in mappings:
+                            mappings[columns] = column_mapping(columns)
+                        self._add(row_number, parse_row(row, mappings[columns]))
+                except (ValueError, TypeError) as e:
+                    self._skip(row_number, e)
+
+                flush = len(self.pending_sets) >= self.chunk_size
+                # Heartbeat while reading past skipped rows
+                if flush or time.monotonic() - self.last_report > 1:
+                    self.progress['bytes_read'] = self.mark['bytes_read'] = binary.tell()
+                    if flush:
+                        self._flush()
+                    else:
+                        # Closed sessions may still be pending: repeat the last written checkpoint
+                        self._report(dict(self.saved, bytes_read=self.mark['bytes_read']))
+
+            self._close_session()
+            self.mark = dict(self.progress, rows_done=self.progress['rows_read'])
+            self.progress['bytes_read'] = self.job['size_bytes']
+            self.mark['bytes_read'] = self.job['size_bytes']
+            self._flush()
+
+        rebuild_rollups(self.user_id)
+        return self.mark
+
+
+def run_import_job(job_id):
+    """Run (or resume) a job unless another worker is on it"""
+    stale_before = datetime.utcnow() - timedelta(seconds=Config.IMPORT_STALE_SECONDS)
+    job = claim_import_job(job_id, stale_before)
+    if job is None:
+        logger.info(f"⏩ Import {job_id} is already running or finished")
+        return
+
+    started = time.monotonic()
+    try:
+        if not job.get('started_at'):
+            update_import_job(job_id, started_at=datetime.utcnow())
+        progress = ImportRun(job).run()
+        update_import_job(job_id, status=COMPLETED, finished_at=datetime.utcnow())
+        logger.info(
+            f"✅ Import {job_id}: {progress['sets_created']} sets in {progress['sessions_created']} sessions, "
+            f"{progress['rows_skipped']} rows skipped ({time.monotonic() - started:.1f}s)"
+        )
+        try:
+            os.remove(job['path'])
+        except OSError:
+            pass
+    except Exception as e:
+        logger.error(f"❌ Import {job_id} failed: {e}")
+        # Bulk write errors list every failed document
+        update_import_job(job_id, status=FAILED, error=str(e)[:500])
+
+
+def is_resumable(job) -> bool:
+    """Failed, queued or abandoned (running without progress) jobs can be resumed"""
+    if job['status'] == COMPLETED:
+        return False
+    if job['status'] == RUNNING:
+        return job['updated_at'] < datetime.utcnow() - timedelta(seconds=Config.IMPORT_STALE_SECONDS)
+    return True
+
+
+class ImportRunner:
+    """Small background pool running import jobs off the request workers"""
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or Config.IMPORT_WORKERS
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def _ensure_started(self):
+        """Create the pool once per process (threads do not survive fork)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='import'
+            )
+            self._pid = os.getpid()
+
+    def submit(self, job_id):
+        """Queue a job; returns the future"""
+        self._ensure_started()
+        return self._executor.submit(run_import_job, job_id)
+
+
+# Global instance
+import_runner = ImportRunner()
@@ -0,0 +1,173 @@
+"""
+Password Hasher
+Runs bcrypt on a small bounded worker pool so a burst of logins cannot
+take every request worker's CPU. bcrypt releases the GIL while hashing, so
+the pool size caps how many cores password checks may use at once; a full
+queue is reported back (HTTP 429) instead of piling up work.
+
+The cost factor comes from BCRYPT_ROUNDS, or is calibrated once per process
+to the highest cost whose hash takes at most BCRYPT_TARGET_MS. Hashes made
+with a lower cost are upgraded on the next successful login (never
+downgraded, so workers that calibrate differently do not flip-flop).
+"""
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from config import Config
+import metrics
+import bcrypt
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Below this bcrypt is not considered safe, above it a login takes seconds
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+# Cost used for the calibration samples (cheap enough to run at startup)
+CALIBRATION_ROUNDS = 8
+
+
+class HasherSaturated(Exception):
+    """The hashing queue is full; the caller should retry later"""
+
+
+def hash_rounds(password_hash):
+    """Cost factor of a bcrypt hash ('$2b$12$...' -> 12), None if unreadable"""
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def calibrate_rounds(target_ms, samples=3):
+    """
+    Highest cost whose hash takes at most target_ms on this machine
+
+    Each extra round doubles the work, so the cost is extrapolated from the
+    best of a few hashes at CALIBRATION_ROUNDS.
+    """
+    password = b'calibration-password'
+    best = None
+    for _ in range(samples):
+        started = time.perf_counter()
+        bcrypt.hashpw(password, bcrypt.gensalt(rounds=CALIBRATION_ROUNDS))
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+
+    rounds = CALIBRATION_ROUNDS
+    while rounds < MAX_ROUNDS and best * 2 ** (rounds + 1 - CALIBRATION_ROUNDS) <= target_ms:
+        rounds += 1
+    rounds = max(MIN_ROUNDS, rounds)
+    return rounds, best * 2 ** (rounds - CALIBRATION_ROUNDS)
+
+
+class PasswordHasher:
+    """bcrypt on a bounded worker pool with a queue-depth limit"""
+
+    def __init__(self, max_workers=None, queue_depth=None, timeout=None):
+        self.max_workers = max_workers or Config.PASSWORD_HASH_WORKERS
+        self.queue_depth = queue_depth if queue_depth is not None else Config.PASSWORD_HASH_QUEUE_DEPTH
+        self.timeout = timeout or Config.PASSWORD_HASH_TIMEOUT_SECONDS
+        self.rounds = None
+        self._lock = threading.Lock()
+        self._slots = None
+        self._executor = None
+        self._pid = None
+        self.stats = {'hashed': 0, 'verified': 0, 'rehashed': 0, 'rejected': 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def calibrate(self):
+        """Pick the cost factor (configured, or measured against BCRYPT_TARGET_MS)"""
+        if Config.BCRYPT_ROUNDS:
+            self.rounds = min(MAX_ROUNDS, max(4, Config.BCRYPT_ROUNDS))
+            logger.info(f"🔐 bcrypt cost {self.rounds} (configured)")
+            return self.rounds
+
+        rounds, estimate_ms = calibrate_rounds(Config.BCRYPT_TARGET_MS)
+        self.rounds = rounds
+        logger.info(f"🔐 bcrypt cost {rounds} (~{estimate_ms:.0f} ms per hash, target {Config.BCRYPT_TARGET_MS} ms)")
+        return rounds
+
+    def _ensure_started(self):
+        """Create the pool (and pick the cost) once per process (threads do not survive fork)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self.rounds is None:
+                self.calibrate()
+            self._slots = threading.BoundedSemaphore(self.max_workers + self.queue_depth)
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='password-hash'
+            )
+            self._pid = os.getpid()
+
+    def _run(self, fn, *args):
+        """
+        Run fn on the pool and wait for its result
+
+        Raises:
+            HasherSaturated: If the queue is full or the result is overdue
+        """
+        self._ensure_started()
+
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            logger.warning("⚠️ Password hashing queue full, rejecting request")
+            raise HasherSaturated('Too many login attempts in progress, try again shortly')
+
+        try:
+            future = self._executor.submit(fn, *args)
+        except RuntimeError:
+            # Executor shut down (process exiting)
+            self._slots.release()
+            raise HasherSaturated('Server is shutting down')
+        # The slot is only freed once the worker thread is really free
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            # Queue wait included: it is what the request pays
+            with metrics.timed('bcrypt'):
+                return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise HasherSaturated('Password check timed out, try again shortly')
+
+    def hash(self, password):
+        """bcrypt hash (str) of a password at the current cost"""
+        self._ensure_started()
+        hashed = self._run(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds))
+        self._count('hashed')
+        return hashed.decode('utf-8')
+
+    def verify(self, password, password_hash):
+        """Whether the password matches the stored hash"""
+        matches = self._run(bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+        self._count('verified')
+        return matches
+
+    def needs_rehash(self, password_hash):
+        """Whether a stored hash was made with a lower cost than the current one"""
+        self._ensure_started()
+        rounds = hash_rounds(password_hash)
+        return rounds is not None and rounds < self.rounds
+
+    def rehash(self, password):
+        """New hash for a password whose stored hash is outdated"""
+        password_hash = self.hash(password)
+        self._count('rehashed')
+        return password_hash
+
+    def snapshot(self):
+        """Pool statistics"""
+        with self._lock:
+            stats = dict(self.stats)
+        return dict(stats, rounds=self.rounds, max_workers=self.max_workers, queue_depth=self.queue_depth)
+
+
+password_hasher = PasswordHasher()
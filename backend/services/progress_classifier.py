@@ -0,0 +1,184 @@
+"""
+Progress Classifier
+Rule-based fast path for workout analysis. Obvious cases (clear overload,
+identical repeat, sharp drop, pain) are classified locally in microseconds;
+only ambiguous ones are sent to Gemini.
+"""
+from config import Config
+from models.strength import estimated_1rm
+from models.workout import AIResponse
+import re
+import threading
+
+COLORS = {
+    'progress_up': '#C6FF5E',
+    'stagnant': '#00D1FF',
+    'down': '#FF5E5E',
+    'unsafe': '#FF5E5E'
+}
+
+# Words in `feeling` (English + Indonesian), matched as whole words:
+# pain or injury (classified unsafe), a possible tweak (left to the LLM)
+# and a hard effort
+PAIN_PATTERN = re.compile(r"\b(?:pain(?:ful)?|hurts?|hurting|injur(?:y|ies|ed)|dizzy|sakit|nyeri|cedera|pusing)\b")
+DISCOMFORT_PATTERN = re.compile(r"\b(?:strain(?:s|ed)?|tweak(?:ed)?|twinge|sharp|ngilu)\b")
+STRAIN_PATTERN = re.compile(r"\b(?:exhausted|struggl\w*|grind(?:y|ing)?|barely|capek|berat banget|tired)\b")
+
+# "no pain", "didn't really hurt", "tanpa sakit", "tidak terlalu capek": a
+# negation right before the match, at most one word in between
+NEGATED = re.compile(
+    r"\b(?:no|not|without|never|zero|didn'?t|doesn'?t|don'?t|wasn'?t|isn'?t"
+    r"|tanpa|tidak|tak|gak|ga|nggak|enggak|bukan|bebas)\b(?:\s+\w+)?\s*$"
+)
+# "pain-free", "pain free"
+FREE_SUFFIX = re.compile(r"[- ]?free\b")
+
+# Confidence of a classification the LLM should double-check
+UNSURE_CONFIDENCE = 0.5
+
+def volume(workout):
+    """Total volume of a workout (weight x reps x sets)"""
+    return workout.weight * workout.reps * workout.sets
+
+def reports(feeling, pattern):
+    """Whether `feeling` mentions one of the pattern's words, not negated"""
+    text = (feeling or '').lower()
+    for match in pattern.finditer(text):
+        if NEGATED.search(text[max(0, match.start() - 40):match.start()]):
+            continue
+        if FREE_SUFFIX.match(text, match.end()):
+            continue
+        return True
+    return False
+
+
+class ProgressClassifier:
+    """Deterministic classifier returning an AIResponse and a confidence"""
+
+    def __init__(self, threshold=None):
+        self.threshold = threshold if threshold is not None else Config.AI_CLASSIFIER_CONFIDENCE_THRESHOLD
+        self._lock = threading.Lock()
+        self._counts = {'fast_path': 0, 'llm': 0}
+        self._fast_path_by_status = {}
+
+    def classify(self, current, history):
+        """
+        Classify a workout against its recent history
+
+        Args:
+            current: Current workout object
+            history: Recent workouts, newest first
+
+        Returns:
+            (AIResponse, confidence between 0 and 1)
+        """
+        if reports(current.feeling, PAIN_PATTERN):
+            return self._response(
+                'unsafe', 'High Risk',
+                "You reported pain - stop loading this movement and let it recover. Drop the weight until it feels clean again."
+            ), 0.9
+
+        response, confidence = self._classify_progress(current, history)
+        if reports(current.feeling, DISCOMFORT_PATTERN):
+            # Might be a tweak or just a hard set: let the LLM weigh it
+            confidence = min(confidence, UNSURE_CONFIDENCE)
+        return response, confidence
+
+    def _classify_progress(self, current, history):
+        """classify() for a workout without reported pain"""
+        if not history:
+            return self._response(
+                'stagnant', 'Safe',
+                "Baseline recorded. Beat one number next session."
+            ), 0.5
+
+        previous = history[0]
+        current_1rm = estimated_1rm(current.weight, current.reps)
+        previous_1rm = estimated_1rm(previous.weight, previous.reps)
+        delta = (current_1rm - previous_1rm) / previous_1rm if previous_1rm else 0.0
+
+        recent_volumes = [volume(w) for w in history[:3]]
+        average_volume = sum(recent_volumes) / len(recent_volumes)
+        volume_trend = (volume(current) - average_volume) / average_volume if average_volume else 0.0
+        strained = reports(current.feeling, STRAIN_PATTERN)
+
+        identical = (
+            current.weight == previous.weight
+            and current.reps == previous.reps
+            and current.sets == previous.sets
+        )
+        if identical:
+            repeats = sum(
+                1 for w in history[:3]
+                if (w.weight, w.reps, w.sets) == (current.weight, current.reps, current.sets)
+            )
+            return self._response(
+                'stagnant', 'Safe',
+                f"Same as last time at {current.weight:g}kg x {current.reps}. Add 2.5kg or one rep next session."
+            ), 0.95 if repeats >= 2 else 0.85
+
+        if delta > 0.15:
+            # Big jump: ego lifting if it felt like a grind, otherwise let the LLM judge
+            if strained:
+                return self._response(
+                    'unsafe', 'Caution',
+                    f"Estimated 1RM jumped {delta:.0%} and it felt like a grind. Consolidate this weight before adding more."
+                ), 0.85
+            return self._response(
+                'progress_up', 'Caution',
+                f"Big jump in estimated 1RM (+{delta:.0%}). Make sure form held up."
+            ), 0.6
+
+        if delta >= 0.01:
+            confidence = 0.9 if volume_trend > -0.1 and not strained else 0.7
+            return self._response(
+                'progress_up', 'Safe',
+                f"Estimated 1RM up {delta:.0%} to {current_1rm:.1f}kg. Keep the overload going."
+            ), confidence
+
+        if delta <= -0.1:
+            return self._response(
+                'down', 'Caution',
+                f"Estimated 1RM down {abs(delta):.0%} from last session. Check sleep and recovery before pushing again."
+            ), 0.85
+
+        if delta > -0.01:
+            return self._response(
+                'stagnant', 'Safe',
+                "Roughly the same as last session. Change one variable - weight, reps or tempo."
+            ), 0.7
+
+        return self._response(
+            'down', 'Safe',
+            f"Slightly below last session ({delta:.0%}). One off day is fine; watch the trend."
+        ), 0.6
+
+    def is_confident(self, confidence):
+        """Whether a classification is good enough to skip the LLM"""
+        return confidence >= self.threshold
+
+    def record(self, fast_path, status=None):
+        """Count a decision (fast path vs LLM)"""
+        with self._lock:
+            self._counts['fast_path' if fast_path else 'llm'] += 1
+            if fast_path and status:
+                self._fast_path_by_status[status] = self._fast_path_by_status.get(status, 0) + 1
+
+    def metrics(self):
+        """Fast path / LLM split"""
+        with self._lock:
+            total = self._counts['fast_path'] + self._counts['llm']
+            return {
+                'fast_path': self._counts['fast_path'],
+                'llm': self._counts['llm'],
+                'fast_path_ratio': round(self._counts['fast_path'] / total, 4) if total else 0.0,
+                'fast_path_by_status': dict(self._fast_path_by_status),
+                'threshold': self.threshold
+            }
+
+    @staticmethod
+    def _response(status, risk, advice):
+        return AIResponse(status=status, advice=advice, color=COLORS[status], risk=risk)
+
+
+progress_classifier = ProgressClassifier()
@@ -1,10 +1,21 @@
 from database import get_sessions_collection, get_session_types_collection
-from models.session import Session
-from datetime import datetime
+from models.session import Session, WIB
+from database.rollups import record_session_rollups
+from database.pagination import encode_cursor, keyset_filter, page_sort
+from database.views import SessionView
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime, timezone
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Fields selectable with fields= on the session history
+SESSION_FIELDS = (
+    'user_id', 'session_type', 'started_at', 'ended_at', 'total_sets',
+    'total_volume', 'exercises_performed', 'is_active'
+)
+
 class SessionService:
     """Session management service"""
     
@@ -28,8 +39,10 @@ class SessionService:
         if active_session:
             raise ValueError("User already has an active session. Please end it first.")
         
-        # Verify session type exists
-        if not self.session_types_collection.find_one({"name": session_type}):
+        # Verify session type exists (catalog cache first, database if the cache is stale)
+        from services.catalog_service import catalog_cache
+        if (session_type not in catalog_cache.get().session_type_names
+                and not self.session_types_collection.find_one({"name": session_type})):
             raise ValueError(f"Invalid session type: {session_type}")
         
         # Create new session
@@ -38,11 +51,14 @@ class SessionService:
             session_type=session_type
         )
         
-        # Save to database
-        result = self.sessions_collection.insert_one(session.to_dict())
+        # Save to database (a unique partial index rejects a second active session)
+        try:
+            result = self.sessions_collection.insert_one(session.to_dict())
+        except DuplicateKeyError:
+            raise ValueError("User already has an active session. Please end it first.")
         session._id = result.inserted_id
         
-        logger.info(f"✅ Started {session_type} session for user {user_id}")
+        logger.info("✅ Started %s session for user %s", session_type, user_id)
         
         return session
     
@@ -50,71 +66,35 @@ class SessionService:
         """
         End current active session
         
+        The per-exercise summary (exercises_performed) and the totals are
+        kept current as sets are logged, so ending is a single update that
+        does not depend on the number of sets. The session is then counted
+        in the analytics rollups.
+        
         Args:
             user_id: User ID
         
         Returns:
             Updated Session object
         """
-        from database.workout_sets import get_session_workout_sets
-        
-        # Get active session
-        active_session = self.get_active_session(user_id)
-        if not active_session:
-            raise ValueError("No active session found")
+        # Current WIB time, stored as UTC
+        ended_at = datetime.now(WIB).astimezone(timezone.utc).replace(tzinfo=None)
         
-        # Get all workout sets for this session
-        workout_sets = get_session_workout_sets(str(active_session._id))
-        
-        # Calculate exercises performed (unique exercises with their stats)
-        exercises_performed = []
-        exercise_stats = {}
-        
-        for workout_set in workout_sets:
-            exercise_name = workout_set['exercise_name']
-            
-            if exercise_name not in exercise_stats:
-                exercise_stats[exercise_name] = {
-                    'exercise': exercise_name,
-                    'sets': 0,
-                    'total_reps': 0,
-                    'total_volume': 0,
-                    'max_weight': 0
-                }
-            
-            exercise_stats[exercise_name]['sets'] += 1
-            exercise_stats[exercise_name]['total_reps'] += workout_set['reps']
-            exercise_stats[exercise_name]['total_volume'] += workout_set['volume']
-            exercise_stats[exercise_name]['max_weight'] = max(
-                exercise_stats[exercise_name]['max_weight'],
-                workout_set['weight']
-            )
-        
-        # Convert to list
-        exercises_performed = list(exercise_stats.values())
-        
-        # End the session
-        active_session.end_session()
-        
-        # Update in database with exercises_performed
-        self.sessions_collection.update_one(
-            {'_id': active_session._id},
-            {
-                '$set': {
-                    'ended_at': active_session.ended_at,
-                    'is_active': False,
-                    'exercises_performed': exercises_performed
-                }
-            }
+        session_data = self.sessions_collection.find_one_and_update(
+            {'user_id': user_id, 'is_active': True},
+            {'$set': {'ended_at': ended_at, 'is_active': False}},
+            return_document=ReturnDocument.AFTER
         )
+        if not session_data:
+            raise ValueError("No active session found")
         
-        duration = (active_session.ended_at - active_session.started_at).total_seconds() / 60
-        logger.info(f"✅ Ended session for user {user_id}. Duration: {duration:.1f} minutes, Exercises: {len(exercises_performed)}")
+        ended_session = Session.from_dict(session_data)
+        record_session_rollups(session_data)
         
-        # Update the session object
-        active_session.exercises_performed = exercises_performed
+        duration = (ended_session.ended_at - ended_session.started_at).total_seconds() / 60
+        logger.info("✅ Ended session for user %s. Duration: %.1f minutes, Exercises: %s", user_id, duration, len(ended_session.exercises_performed))
         
-        return active_session
+        return ended_session
     
     def get_active_session(self, user_id):
         """
@@ -136,23 +116,41 @@ class SessionService:
         
         return Session.from_dict(session_data)
     
-    def get_session_history(self, user_id, limit=20):
+    def get_session_history(self, user_id, limit=20, cursor=None, fields=None):
         """
-        Get user's session history
+        Get one page of a user's session history, newest first
         
         Args:
             user_id: User ID
-            limit: Maximum number of sessions to retrieve
+            limit: Page size
+            cursor: Opaque cursor from the previous page
+            fields: Optional set of fields to load (see SESSION_FIELDS)
         
         Returns:
-            List of Session objects
+            (list of SessionView, next cursor or None)
+        
+        Raises:
+            ValueError: If the cursor is malformed
         """
-        sessions_data = self.sessions_collection.find({
-            'user_id': user_id
-        }).sort('started_at', -1).limit(limit)
+        query = {'user_id': user_id}
+        if cursor:
+            query.update(keyset_filter('started_at', cursor))
+        
+        # is_active and duration are derived from ended_at
+        projection = SessionView.projection(fields)
+        
+        # One extra document tells whether there is a next page
+        sessions_data = list(self.sessions_collection.find(query, projection)
+                             .sort(page_sort('started_at'))
+                             .limit(limit + 1))
+        
+        next_cursor = None
+        if len(sessions_data) > limit:
+            sessions_data = sessions_data[:limit]
+            last = sessions_data[-1]
+            next_cursor = encode_cursor(last['started_at'], last['_id'])
         
-        sessions = [Session.from_dict(data) for data in sessions_data]
-        return sessions
+        return [SessionView(doc, fields) for doc in sessions_data], next_cursor
     
     def get_session_types(self):
         """
@@ -207,4 +205,4 @@ class SessionService:
             }
         )
         
-        logger.info(f"Updated session stats: +{sets} sets, +{volume}kg volume")
+        logger.debug("Updated session stats: +%s sets, +%skg volume", sets, volume)
@@ -0,0 +1,101 @@
+"""
+Token Claims Cache
+Verified JWT claims keyed by a hash of the token, so each token pays for
+HS256 verification once and later requests only for a dict lookup. An
+entry expires with the token's own exp claim; the cache is bounded (LRU).
+A second, short-TTL cache keeps recently loaded user records.
+"""
+from collections import OrderedDict
+from config import Config
+import hashlib
+import threading
+import time
+
+
+class ExpiringCache:
+    """Per-process LRU cache whose entries carry an absolute expiry (epoch seconds)"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at):
+        if self.max_entries <= 0 or expires_at <= time.time():
+            return
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TokenClaimsCache:
+    """Decoded claims of verified tokens, with hit/miss counters"""
+
+    def __init__(self, max_entries=None):
+        self.entries = ExpiringCache(
+            max_entries if max_entries is not None else Config.AUTH_TOKEN_CACHE_MAX_ENTRIES
+        )
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(token):
+        """The raw token is never kept in memory"""
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def get(self, token):
+        """Claims of a token verified earlier and not yet expired, or None"""
+        claims = self.entries.get(self.make_key(token))
+        # Counters are best effort (no lock on the hot path)
+        if claims is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return claims
+
+    def put(self, token, claims):
+        """Remember verified claims until the token expires"""
+        expires_at = claims.get('exp')
+        if isinstance(expires_at, (int, float)):
+            self.entries.set(self.make_key(token), claims, expires_at)
+
+    def metrics(self):
+        """Hit/miss counters"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            'entries': len(self.entries)
+        }
+
+
+token_cache = TokenClaimsCache()
+
+# User documents by id, kept for AUTH_USER_CACHE_TTL_SECONDS
+user_cache = ExpiringCache(Config.AUTH_TOKEN_CACHE_MAX_ENTRIES)
@@ -1,73 +1,228 @@
 from database import get_workouts_collection
+from database.pagination import encode_cursor, keyset_filter, page_sort
+from database.views import WorkoutView
 from models.workout import Workout
 from services.ai_service import AIService
+from services.ai_cache import HISTORY_LIMIT, analysis_history
+from services.analysis_pipeline import analysis_pipeline
+from bson import ObjectId
+from bson.errors import InvalidId
+from config import Config
+from datetime import datetime, timedelta
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+PENDING_STATE = 'pending'
+
+# Fields the AI prompt needs from past workouts
+AI_HISTORY_PROJECTION = {'weight': 1, 'reps': 1, 'sets': 1, 'feeling': 1, 'created_at': 1}
+
+def stale_analysis_cutoff():
+    """
+    Workouts created before this and still pending have no analysis
+    running anywhere: jobs end at their deadline (AI_ANALYSIS_TIMEOUT_SECONDS
+    after submission), so they were left behind by a process that stopped
+    (deploy, crash) before storing the result. Twice the timeout leaves
+    room for clock differences between hosts.
+    """
+    return datetime.utcnow() - timedelta(seconds=2 * Config.AI_ANALYSIS_TIMEOUT_SECONDS)
+
+def is_stale_analysis(workout):
+    """Whether a workout's analysis was abandoned (see stale_analysis_cutoff)"""
+    return workout.progress_state == PENDING_STATE and workout.created_at < stale_analysis_cutoff()
+
 class WorkoutService:
     """Workout management service"""
-    
+
     def __init__(self):
         self.workouts_collection = get_workouts_collection()
         self.ai_service = AIService()
-    
-    def submit_workout(self, workout_data):
+
+    def submit_workout(self, user_id, workout_data):
         """
-        Submit a new workout session with AI analysis
-        
+        Submit a new workout session
+
+        The workout is saved right away with progress_state='pending'; the
+        AI analysis runs on the background pipeline and is written back to
+        the document when it finishes.
+
         Args:
+            user_id: Owner of the workout (from the JWT)
             workout_data: dict with weight, reps, sets, feeling
-        
+
         Returns:
-            Workout object with AI analysis
+            Workout object (analysis pending)
         """
         # Create workout object
         workout = Workout(
             weight=workout_data.get('weight'),
             reps=workout_data.get('reps'),
             sets=workout_data.get('sets'),
-            feeling=workout_data.get('feeling', '')
+            feeling=workout_data.get('feeling', ''),
+            progress_state=PENDING_STATE,
+            user_id=user_id
         )
-        
-        # Get recent history for AI context
-        history = self.get_recent_workouts(limit=5)
-        
-        # AI analysis
-        try:
-            ai_response = self.ai_service.analyze_workout(workout, history)
-            workout.advice = ai_response.advice
-            workout.color = ai_response.color
-            workout.progress_state = ai_response.status
-        except Exception as e:
-            logger.error(f"AI analysis failed: {e}")
-            # Fallback values
-            workout.advice = "Recorded. Keep pushing!"
-            workout.color = "#E0E0E0"
-            workout.progress_state = "unknown"
-        
+
         # Save to database
         result = self.workouts_collection.insert_one(workout.to_dict())
         workout._id = result.inserted_id
-        
-        logger.info(f"Workout submitted: {workout.weight}kg x {workout.reps} x {workout.sets}")
-        
+
+        logger.info("Workout submitted: %skg x %s x %s", workout.weight, workout.reps, workout.sets)
+
+        # Queue AI analysis
+        queued = analysis_pipeline.submit(
+            str(workout._id),
+            analyze=lambda: self._analyze(workout),
+            complete=lambda ai_response: self._store_analysis(workout._id, ai_response),
+            fallback=self.ai_service._fallback_response
+        )
+        if not queued:
+            # Pipeline saturated: record the fallback now instead of waiting
+            ai_response = self.ai_service._fallback_response()
+            self._store_analysis(workout._id, ai_response)
+            self._apply_analysis(workout, ai_response)
+
+        return workout
+
+    def _analyze(self, workout):
+        """Run the AI analysis for a workout (on a pipeline worker)"""
+        recent = self.get_recent_workouts(workout.user_id, limit=2 * HISTORY_LIMIT, before=workout.created_at)
+        history = analysis_history(workout, recent)
+        return self.ai_service.analyze_workout(workout, history)
+
+    @staticmethod
+    def _apply_analysis(workout, ai_response):
+        workout.advice = ai_response.advice
+        workout.color = ai_response.color
+        workout.progress_state = ai_response.status
+
+    def _store_analysis(self, workout_id, ai_response):
+        """Write the analysis back, unless another writer already did"""
+        self.workouts_collection.update_one(
+            {'_id': workout_id, 'progress_state': PENDING_STATE},
+            {'$set': {
+                'advice': ai_response.advice,
+                'color': ai_response.color,
+                'progress_state': ai_response.status
+            }}
+        )
+
+    def recover_stale_analyses(self):
+        """
+        Store the fallback analysis for every abandoned pending workout
+        (run at startup)
+
+        Returns:
+            Number of workouts recovered
+        """
+        ai_response = self.ai_service._fallback_response()
+        result = self.workouts_collection.update_many(
+            {'progress_state': PENDING_STATE, 'created_at': {'$lt': stale_analysis_cutoff()}},
+            {'$set': {
+                'advice': ai_response.advice,
+                'color': ai_response.color,
+                'progress_state': ai_response.status
+            }}
+        )
+        if result.modified_count:
+            logger.warning(f"⚠️ Recovered {result.modified_count} abandoned workout analyses")
+        return result.modified_count
+
+    def get_workout(self, user_id, workout_id):
+        """
+        Get a single workout owned by the user
+
+        Returns:
+            Workout object or None
+
+        Raises:
+            ValueError: If the id is malformed
+        """
+        try:
+            oid = ObjectId(workout_id)
+        except (InvalidId, TypeError):
+            raise ValueError(f"Invalid workout id: {workout_id}")
+
+        return Workout.from_dict(self.workouts_collection.find_one({'_id': oid, 'user_id': user_id}))
+
+    def wait_for_analysis(self, user_id, workout_id, timeout):
+        """
+        Long-poll for a workout's analysis
+
+        Waits on the in-process job when it runs here, otherwise re-reads
+        the document every half second, until the analysis is stored or
+        the timeout expires. An abandoned analysis gets the fallback.
+
+        Returns:
+            Workout object (possibly still pending) or None if not found
+        """
+        deadline = time.monotonic() + timeout
+        workout = self.get_workout(user_id, workout_id)
+
+        while workout and workout.progress_state == PENDING_STATE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if analysis_pipeline.is_local(workout_id):
+                analysis_pipeline.wait(workout_id, remaining)
+            elif is_stale_analysis(workout):
+                self._store_analysis(workout._id, self.ai_service._fallback_response())
+            else:
+                time.sleep(min(0.5, remaining))
+            workout = self.get_workout(user_id, workout_id)
+
         return workout
-    
-    def get_recent_workouts(self, limit=20):
+
+    def get_recent_workouts(self, user_id, limit=5, before=None):
         """
-        Get recent workout history
-        
+        Get a user's most recent workouts for the AI prompt
+
         Args:
+            user_id: User ID
             limit: Number of workouts to retrieve
-        
+            before: Only include workouts created before this datetime
+
+        Returns:
+            List of Workout objects (prompt fields only), newest first
+        """
+        query = {'user_id': user_id}
+        if isinstance(before, datetime):
+            query['created_at'] = {'$lt': before}
+        workouts_data = self.workouts_collection.find(
+            query, AI_HISTORY_PROJECTION
+        ).sort(page_sort('created_at')).limit(limit)
+        return [Workout.from_dict(data) for data in workouts_data]
+
+    def get_history(self, user_id, limit=20, cursor=None):
+        """
+        Get one page of a user's workout history
+
+        Args:
+            user_id: User ID
+            limit: Page size
+            cursor: Opaque cursor from the previous page
+
         Returns:
-            List of Workout objects
+            (list of WorkoutView, next cursor or None)
+
+        Raises:
+            ValueError: If the cursor is malformed
         """
-        workouts_data = self.workouts_collection.find().sort('created_at', -1).limit(limit)
-        workouts = [Workout.from_dict(data) for data in workouts_data]
-        return workouts
-    
-    def get_history(self):
-        """Get workout history (last 20 sessions)"""
-        return self.get_recent_workouts(limit=20)
+        query = {'user_id': user_id}
+        if cursor:
+            query.update(keyset_filter('created_at', cursor))
+
+        # Fetch one extra document to know whether there is a next page
+        workouts_data = list(self.workouts_collection.find(
+            query, WorkoutView.projection()
+        ).sort(page_sort('created_at')).limit(limit + 1))
+
+        next_cursor = None
+        if len(workouts_data) > limit:
+            workouts_data = workouts_data[:limit]
+            last = workouts_data[-1]
+            next_cursor = encode_cursor(last['created_at'], last['_id'])
+
+        return [WorkoutView(doc) for doc in workouts_data], next_cursor
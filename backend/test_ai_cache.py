@@ -0,0 +1,101 @@
+"""
+Test the AI response cache (no server or database needed)
+"""
+from datetime import datetime, timedelta
+from models.workout import AIResponse, Workout
+from services.ai_cache import AICacheBackend, AIResponseCache, InMemoryAICache, analysis_history
+import time
+
+def workout(weight, reps, sets=3, feeling='Good', created_at=None):
+    return Workout(weight=weight, reps=reps, sets=sets, feeling=feeling,
+                   created_at=created_at or datetime(2026, 1, 10, 8))
+
+def past(days):
+    """Workouts created before 2026-01-10, newest first"""
+    return [workout(60 - i * 2.5, 8, created_at=datetime(2026, 1, 10, 8) - timedelta(days=3 * (i + 1))) for i in range(days)]
+
+ANSWER = AIResponse(status='progress_up', advice='Keep going.', color='#C6FF5E', risk='Safe')
+
+def test_resubmit_hits():
+    """Resubmitting the same workout reuses the first analysis"""
+    cache = AIResponseCache(backend=InMemoryAICache(16), ttl=60)
+    recent = past(10)
+
+    first = workout(62.5, 8, feeling='Solid')
+    cache.put(first, analysis_history(first, recent), ANSWER)
+
+    # The first copy is now the newest workout before the resubmission
+    again = workout(62.5, 8, feeling='  solid ', created_at=first.created_at + timedelta(minutes=2))
+    history = analysis_history(again, [first] + recent)
+    assert len(history) == 5
+    assert cache.get(again, history).advice == ANSWER.advice
+    assert cache.metrics()['hits'] == 1
+    print("✅ Resubmit -> cache hit")
+
+def test_other_context_misses():
+    """A different workout or a repeat on another day is a new context"""
+    cache = AIResponseCache(backend=InMemoryAICache(16), ttl=60)
+    recent = past(10)
+    first = workout(62.5, 8)
+    cache.put(first, analysis_history(first, recent), ANSWER)
+
+    heavier = workout(65, 8, created_at=first.created_at + timedelta(minutes=2))
+    assert cache.get(heavier, analysis_history(heavier, [first] + recent)) is None
+
+    next_week = workout(62.5, 8, created_at=first.created_at + timedelta(days=7))
+    history = analysis_history(next_week, [first] + recent)
+    assert history[0] is first
+    assert cache.get(next_week, history) is None
+    print("✅ Other context -> cache miss")
+
+def test_lru_eviction():
+    """The least recently used entry goes first"""
+    backend = InMemoryAICache(2)
+    backend.set('a', 1, 60)
+    backend.set('b', 2, 60)
+    backend.get('a')
+    backend.set('c', 3, 60)
+    assert backend.get('b') is None
+    assert backend.get('a') == 1 and backend.get('c') == 3
+    assert len(backend) == 2
+    print("✅ LRU eviction")
+
+def test_ttl_expiry():
+    """Entries expire after their TTL; TTL 0 disables the cache"""
+    backend = InMemoryAICache(4)
+    backend.set('a', 1, 0.05)
+    time.sleep(0.1)
+    assert backend.get('a') is None and len(backend) == 0
+
+    disabled = AIResponseCache(backend=InMemoryAICache(4), ttl=0)
+    current = workout(62.5, 8)
+    disabled.put(current, [], ANSWER)
+    assert disabled.get(current, []) is None
+    print("✅ TTL expiry")
+
+def test_backend_interface():
+    """Backends must implement the whole interface"""
+    class Partial(AICacheBackend):
+        def get(self, key):
+            return None
+
+    try:
+        Partial()
+    except TypeError:
+        print("✅ Backend interface")
+    else:
+        raise AssertionError("incomplete backend was instantiated")
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("🧪 AI RESPONSE CACHE TESTS")
+    print("=" * 60)
+
+    test_resubmit_hits()
+    test_other_context_misses()
+    test_lru_eviction()
+    test_ttl_expiry()
+    test_backend_interface()
+
+    print("\n" + "=" * 60)
+    print("✅ All tests completed!")
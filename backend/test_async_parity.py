@@ -0,0 +1,138 @@
+"""
+Test that the Flask (app.py) and async (aio/app.py) servers behave the same
+
+Start both against the same database, then run:
+    python app.py                                    # :8080
+    PORT=8081 python -m aio.app                      # :8081
+    python test_async_parity.py http://localhost:8080/api http://localhost:8081/api
+
+Under pytest the URLs come from SYNC_API_URL / ASYNC_API_URL instead.
+
+The same scenario runs against each server (with its own user) and every
+response is compared after masking ids and timestamps.
+"""
+import os
+import requests
+import sys
+import uuid
+
+SYNC_URL = os.getenv('SYNC_API_URL', "http://localhost:8080/api")
+ASYNC_URL = os.getenv('ASYNC_API_URL', "http://localhost:8081/api")
+
+# Values that differ between two runs by construction
+MASKED_KEYS = {
+    '_id', 'id', 'session_id', 'user_id', 'started_at', 'ended_at',
+    'timestamp', 'created_at', 'duration_minutes', 'analysis_url', 'token'
+}
+
+def normalize(value):
+    """Response body with ids and timestamps masked"""
+    if isinstance(value, dict):
+        return {
+            key: ('<masked>' if key in MASKED_KEYS and value[key] is not None else normalize(item))
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [normalize(item) for item in value]
+    return value
+
+def scenario(api_url):
+    """Run the scenario against one server; returns [(step, status, body)]"""
+    user_id = f"parity_{uuid.uuid4().hex[:8]}"
+    results = []
+
+    def call(step, method, path, **kwargs):
+        response = requests.request(method, f"{api_url}{path}", allow_redirects=False, **kwargs)
+        try:
+            body = response.json()
+        except ValueError:
+            body = response.text
+        results.append((step, response.status_code, normalize(body), 'X-Next-Cursor' in response.headers))
+        return response
+
+    call('active (none)', 'GET', f"/sessions/active?user_id={user_id}")
+    call('start (no type)', 'POST', "/sessions/start", json={"user_id": user_id})
+    call('start (bad type)', 'POST', "/sessions/start", json={"user_id": user_id, "session_type": "Nope"})
+    session_id = call('start', 'POST', "/sessions/start", json={"user_id": user_id, "session_type": "Push"}).json()['_id']
+    call('start (again)', 'POST', "/sessions/start", json={"user_id": user_id, "session_type": "Push"})
+
+    for weight, reps in [(60, 10), (65, 8), (70, 6)]:
+        call(f'log {weight}x{reps}', 'POST', "/workout-sets/log",
+             json={"session_id": session_id, "user_id": user_id, "exercise_name": "Bench Press", "weight": weight, "reps": reps, "rpe": 8})
+    call('log (other exercise)', 'POST', "/workout-sets/log",
+         json={"session_id": session_id, "user_id": user_id, "exercise_name": "Overhead Press", "weight": 40, "reps": 8})
+    call('log (missing reps)', 'POST', "/workout-sets/log",
+         json={"session_id": session_id, "user_id": user_id, "exercise_name": "Bench Press", "weight": 60})
+    call('log (bad session)', 'POST', "/workout-sets/log",
+         json={"session_id": "nope", "user_id": user_id, "exercise_name": "Bench Press", "weight": 60, "reps": 5})
+    call('log (other user)', 'POST', "/workout-sets/log",
+         json={"session_id": session_id, "user_id": "someone_else", "exercise_name": "Bench Press", "weight": 60, "reps": 5})
+
+    first = call('sets page 1', 'GET', f"/workout-sets/session/{session_id}?limit=2&user_id={user_id}")
+    call('sets page 2', 'GET', f"/workout-sets/session/{session_id}?limit=2&cursor={first.headers.get('X-Next-Cursor', '')}&user_id={user_id}")
+    call('sets (fields)', 'GET', f"/workout-sets/session/{session_id}?fields=weight,reps&user_id={user_id}")
+    call('sets (bad field)', 'GET', f"/workout-sets/session/{session_id}?fields=nope&user_id={user_id}")
+    call('sets (session route)', 'GET', f"/sessions/{session_id}/workout-sets?user_id={user_id}")
+    call('sets (other user)', 'GET', f"/workout-sets/session/{session_id}?user_id=someone_else")
+    call('last set', 'GET', f"/workout-sets/last-set?session_id={session_id}&exercise_name=Bench Press&user_id={user_id}")
+    call('last set (none)', 'GET', f"/workout-sets/last-set?session_id={session_id}&exercise_name=Squat&user_id={user_id}")
+    call('count', 'GET', f"/workout-sets/count?session_id={session_id}&exercise_name=Bench Press&user_id={user_id}")
+    call('count (missing)', 'GET', "/workout-sets/count")
+
+    call('active', 'GET', f"/sessions/active?user_id={user_id}")
+    call('end', 'POST', "/sessions/end", json={"user_id": user_id})
+    call('end (again)', 'POST', "/sessions/end", json={"user_id": user_id})
+    call('history', 'GET', f"/sessions/history?user_id={user_id}")
+    call('history (fields)', 'GET', f"/sessions/history?user_id={user_id}&fields=session_type,total_sets")
+    call('history (bad cursor)', 'GET', f"/sessions/history?user_id={user_id}&cursor=nope")
+
+    call('workouts (no token)', 'GET', "/workouts/")
+    token = call('register', 'POST', "/auth/register", json={
+        "full_name": "Parity Test", "email": f"{user_id}@example.com", "password": "password123"
+    }).json()['token']
+    headers = {'Authorization': f"Bearer {token}"}
+    call('workouts (bad token)', 'GET', "/workouts/", headers={'Authorization': 'Bearer nope'})
+    call('submit (missing sets)', 'POST', "/workouts/", json={"weight": 80, "reps": 10}, headers=headers)
+    workout = call('submit', 'POST', "/workouts/", json={"weight": 80, "reps": 10, "sets": 3, "feeling": "Good"}, headers=headers).json()
+    call('analysis', 'GET', f"/workouts/{workout['id']}/analysis?wait=25", headers=headers)
+    call('analysis (bad id)', 'GET', "/workouts/nope/analysis", headers=headers)
+    call('workouts', 'GET', "/workouts/", headers=headers)
+
+    return results
+
+def test_parity():
+    """Compare every step of both runs"""
+    sync_results = scenario(SYNC_URL)
+    async_results = scenario(ASYNC_URL)
+
+    mismatches = 0
+    for sync_step, async_step in zip(sync_results, async_results):
+        if sync_step == async_step:
+            print(f"✅ {sync_step[0]} ({sync_step[1]})")
+        else:
+            mismatches += 1
+            print(f"❌ {sync_step[0]}")
+            print(f"   sync:  {sync_step[1:]}")
+            print(f"   async: {async_step[1:]}")
+
+    assert mismatches == 0, f"{mismatches} responses differ"
+
+if __name__ == '__main__':
+    SYNC_URL = sys.argv[1] if len(sys.argv) > 1 else SYNC_URL
+    ASYNC_URL = sys.argv[2] if len(sys.argv) > 2 else ASYNC_URL
+
+    print("=" * 60)
+    print("🧪 SYNC / ASYNC PARITY TESTS")
+    print("=" * 60)
+    print(f"sync:  {SYNC_URL}")
+    print(f"async: {ASYNC_URL}\n")
+
+    try:
+        test_parity()
+        ok = True
+    except AssertionError:
+        ok = False
+
+    print("\n" + "=" * 60)
+    print("✅ Both modes behave the same" if ok else "❌ Responses differ")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,99 @@
+"""
+Test the history import parser (no server or database needed)
+"""
+from datetime import datetime
+from services.import_service import ExerciseMatcher, column_mapping, parse_row, parse_timestamp
+
+STRONG_COLUMNS = ['Date', 'Workout Name', 'Duration', 'Exercise Name', 'Set Order', 'Weight', 'Reps', 'RPE', 'Notes']
+HEVY_COLUMNS = ['title', 'start_time', 'end_time', 'exercise_title', 'weight_lbs', 'reps', 'rpe']
+
+def test_column_mapping():
+    """Column names of other apps map onto import fields"""
+    mapping = column_mapping(STRONG_COLUMNS)
+    assert mapping['exercise_name'] == 'Exercise Name'
+    assert mapping['timestamp'] == 'Date'
+    assert mapping['session_type'] == 'Workout Name'
+    assert mapping['weight'] == 'Weight' and mapping['rpe'] == 'RPE'
+
+    mapping = column_mapping(HEVY_COLUMNS)
+    assert mapping['exercise_name'] == 'exercise_title'
+    assert mapping['timestamp'] == 'start_time' and mapping['ended_at'] == 'end_time'
+    assert mapping['weight_lbs'] == 'weight_lbs' and 'weight' not in mapping
+    print("✅ Column mapping")
+
+def test_parse_timestamp():
+    """Times without an offset are WIB; everything is returned as naive UTC"""
+    assert parse_timestamp('2026-01-10 08:30:00') == datetime(2026, 1, 10, 1, 30)
+    assert parse_timestamp('2026-01-10T08:30:00Z') == datetime(2026, 1, 10, 8, 30)
+    assert parse_timestamp('2026-01-10T08:30:00+09:00') == datetime(2026, 1, 9, 23, 30)
+    assert parse_timestamp('10 Jan 2026, 08:30') == datetime(2026, 1, 10, 1, 30)
+    assert parse_timestamp('10/01/2026') == datetime(2026, 1, 9, 17)
+    for value in ('', 'yesterday', None):
+        try:
+            parse_timestamp(value)
+        except ValueError:
+            continue
+        raise AssertionError(f"{value!r} was parsed")
+    print("✅ Timestamps")
+
+def test_parse_row():
+    """Rows are normalized: kg, decimal commas, rounded RPE, optional fields"""
+    mapping = column_mapping(STRONG_COLUMNS)
+    row = parse_row({
+        'Date': '2026-01-10 08:30:00', 'Workout Name': 'Push', 'Exercise Name': ' Bench Press (Barbell) ',
+        'Weight': '62,5', 'Reps': '8', 'RPE': '7.6', 'Notes': ''
+    }, mapping)
+    assert row['exercise_name'] == 'Bench Press (Barbell)'
+    assert row['weight'] == 62.5 and row['reps'] == 8 and row['rpe'] == 8
+    assert row['notes'] is None and row['session_type'] == 'Push'
+    assert row['timestamp'] == datetime(2026, 1, 10, 1, 30) and row['ended_at'] is None
+
+    row = parse_row({'start_time': '2026-01-10T08:30:00+07:00', 'exercise_title': 'Pull Up',
+                     'weight_lbs': '100', 'reps': 5}, column_mapping(HEVY_COLUMNS))
+    assert row['weight'] == 45.36
+
+    # Bodyweight sets have no weight
+    row = parse_row({'Date': '2026-01-10', 'Exercise Name': 'Push Up', 'Reps': '20'}, mapping)
+    assert row['weight'] == 0.0
+    print("✅ Row parsing")
+
+def test_parse_row_errors():
+    """Rows without an exercise, reps or date are rejected"""
+    mapping = column_mapping(STRONG_COLUMNS)
+    for row, error in (
+        ({'Date': '2026-01-10', 'Reps': '5'}, 'Missing exercise name'),
+        ({'Date': '2026-01-10', 'Exercise Name': 'Squat', 'Reps': '0'}, 'Missing reps'),
+        ({'Exercise Name': 'Squat', 'Reps': '5'}, 'Missing date'),
+        ({'Date': '2026-01-10', 'Exercise Name': 'Squat', 'Reps': 'five'}, None),
+    ):
+        try:
+            parse_row(row, mapping)
+        except ValueError as e:
+            assert error is None or str(e) == error, str(e)
+            continue
+        raise AssertionError(f"{row} was parsed")
+    print("✅ Row errors")
+
+def test_exercise_matcher():
+    """Word order, brackets and small typos still find the catalog exercise"""
+    matcher = ExerciseMatcher(['Bench Press', 'Barbell Squat', 'Lat Pulldown'], cutoff=0.8)
+    assert matcher.match('Bench Press (Barbell)') == 'Bench Press'
+    assert matcher.match('Squat (Barbell)') == 'Barbell Squat'
+    assert matcher.match('lat-pulldown') == 'Lat Pulldown'
+    assert matcher.match('Lat Pulldwn') == 'Lat Pulldown'
+    assert matcher.match('Zumba') is None
+    print("✅ Exercise matching")
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("🧪 IMPORT PARSER TESTS")
+    print("=" * 60)
+
+    test_column_mapping()
+    test_parse_timestamp()
+    test_parse_row()
+    test_parse_row_errors()
+    test_exercise_matcher()
+
+    print("\n" + "=" * 60)
+    print("✅ All tests completed!")
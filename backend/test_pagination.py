@@ -0,0 +1,67 @@
+"""
+Test keyset pagination cursors (no server or database needed)
+"""
+from bson import ObjectId
+from datetime import datetime
+from database.pagination import clamp_page_size, decode_cursor, encode_cursor, keyset_filter, parse_fields
+
+def test_cursor_round_trip():
+    """A cursor decodes to the document it was built from and is URL safe"""
+    started_at = datetime(2026, 1, 10, 8, 30, 15, 123000)
+    doc_id = ObjectId()
+    cursor = encode_cursor(started_at, doc_id)
+    assert decode_cursor(cursor) == (started_at, doc_id)
+    assert '=' not in cursor and '+' not in cursor and '/' not in cursor
+    print("✅ Cursor round trip")
+
+def test_malformed_cursor():
+    """Tampered or foreign cursors are a ValueError (400), not a crash"""
+    valid = encode_cursor(datetime(2026, 1, 10), ObjectId())
+    for cursor in ('', 'nope', valid[:-4], 'W10', encode_cursor(datetime(2026, 1, 10), 'x' * 24)):
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            assert str(e) == 'Invalid cursor'
+            continue
+        raise AssertionError(f"{cursor!r} was decoded")
+    print("✅ Malformed cursors")
+
+def test_keyset_filter():
+    """Ties on the sort field are broken by _id in the page direction"""
+    started_at = datetime(2026, 1, 10)
+    doc_id = ObjectId()
+    cursor = encode_cursor(started_at, doc_id)
+    assert keyset_filter('started_at', cursor) == {'$or': [
+        {'started_at': {'$lt': started_at}},
+        {'started_at': started_at, '_id': {'$lt': doc_id}}
+    ]}
+    assert keyset_filter('timestamp', cursor, descending=False)['$or'][1]['_id'] == {'$gt': doc_id}
+    print("✅ Keyset filter")
+
+def test_page_size_and_fields():
+    """Page sizes are clamped; only whitelisted fields are accepted"""
+    assert clamp_page_size(None, default=20, maximum=100) == 20
+    assert clamp_page_size('500', default=20, maximum=100) == 100
+    assert clamp_page_size('0', default=20, maximum=100) == 1
+    assert parse_fields(None, ('weight', 'reps')) is None
+    assert parse_fields(' weight, reps ,', ('weight', 'reps')) == {'weight', 'reps'}
+    for call in (lambda: clamp_page_size('ten', 20, 100), lambda: parse_fields('weight,password', ('weight',))):
+        try:
+            call()
+        except ValueError:
+            continue
+        raise AssertionError('no ValueError')
+    print("✅ Page size and fields")
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("🧪 PAGINATION TESTS")
+    print("=" * 60)
+
+    test_cursor_round_trip()
+    test_malformed_cursor()
+    test_keyset_filter()
+    test_page_size_and_fields()
+
+    print("\n" + "=" * 60)
+    print("✅ All tests completed!")
@@ -0,0 +1,80 @@
+"""
+Test the local progress classifier (no server or database needed)
+"""
+from datetime import datetime, timedelta
+from models.workout import Workout
+from services.progress_classifier import ProgressClassifier
+
+classifier = ProgressClassifier(threshold=0.8)
+
+def workout(weight, reps, sets=3, feeling='Good', days_ago=0):
+    return Workout(
+        weight=weight, reps=reps, sets=sets, feeling=feeling,
+        created_at=datetime(2026, 1, 10) - timedelta(days=days_ago)
+    )
+
+HISTORY = [workout(60, 8, days_ago=3), workout(57.5, 8, days_ago=6), workout(55, 8, days_ago=9)]
+
+def test_reported_pain_is_unsafe():
+    """Pain or injury in `feeling` is classified unsafe without the LLM"""
+    for feeling in ('knee pain', 'my shoulder hurts', 'injured my back', 'agak sakit', 'nyeri di siku',
+                    'no pain but my knee hurts', 'no warmup, back hurts'):
+        response, confidence = classifier.classify(workout(62.5, 8, feeling=feeling), HISTORY)
+        assert response.status == 'unsafe', feeling
+        assert response.risk == 'High Risk', feeling
+        assert classifier.is_confident(confidence), feeling
+    print("✅ Reported pain -> unsafe")
+
+def test_negated_pain_is_not_unsafe():
+    """Negated or unrelated words do not raise a false injury warning"""
+    for feeling in ('no pain', 'painless', 'pain-free', 'pain free today', "didn't really hurt",
+                    'tanpa sakit', 'tidak sakit', 'bebas cedera', 'Solid, no pain at all'):
+        response, _ = classifier.classify(workout(62.5, 8, feeling=feeling), HISTORY)
+        assert response.status == 'progress_up', feeling
+    print("✅ Negated pain -> normal classification")
+
+def test_possible_tweak_goes_to_llm():
+    """Ambiguous discomfort is not classified unsafe and is left to the LLM"""
+    for feeling in ('felt sharp today', 'strained a bit but fine', 'small twinge'):
+        response, confidence = classifier.classify(workout(62.5, 8, feeling=feeling), HISTORY)
+        assert response.status != 'unsafe', feeling
+        assert not classifier.is_confident(confidence), feeling
+    print("✅ Possible tweak -> LLM")
+
+def test_progress_cases():
+    """Overload, repeat, drop and first workout"""
+    response, confidence = classifier.classify(workout(62.5, 8), HISTORY)
+    assert response.status == 'progress_up' and classifier.is_confident(confidence)
+
+    response, confidence = classifier.classify(workout(60, 8), [workout(60, 8), workout(60, 8), workout(57.5, 8)])
+    assert response.status == 'stagnant' and confidence == 0.95
+
+    response, confidence = classifier.classify(workout(50, 8), HISTORY)
+    assert response.status == 'down' and classifier.is_confident(confidence)
+
+    response, confidence = classifier.classify(workout(60, 8), [])
+    assert response.status == 'stagnant' and not classifier.is_confident(confidence)
+    print("✅ Progress cases")
+
+def test_grind_on_big_jump():
+    """A big jump that felt like a grind is unsafe; 'not tired' is not a grind"""
+    response, _ = classifier.classify(workout(72.5, 8, feeling='barely made it, exhausted'), HISTORY)
+    assert response.status == 'unsafe' and response.risk == 'Caution'
+
+    response, _ = classifier.classify(workout(72.5, 8, feeling='not tired'), HISTORY)
+    assert response.status == 'progress_up'
+    print("✅ Grind on a big jump")
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("🧪 PROGRESS CLASSIFIER TESTS")
+    print("=" * 60)
+
+    test_reported_pain_is_unsafe()
+    test_negated_pain_is_not_unsafe()
+    test_possible_tweak_goes_to_llm()
+    test_progress_cases()
+    test_grind_on_big_jump()
+
+    print("\n" + "=" * 60)
+    print("✅ All tests completed!")
@@ -0,0 +1,81 @@
+"""
+Test analytics rollup bucketing (no server or database needed)
+"""
+from datetime import datetime
+from database.rollups import bucket_label, bucket_start, session_increments, set_increments
+from models.workout_set import WorkoutSet
+
+MUSCLE_GROUPS = {'Bench Press': 'Chest', 'Incline Bench Press': 'Chest', 'Squat': 'Quads'}
+
+def workout_set(exercise_name, weight, reps, timestamp):
+    return WorkoutSet(session_id='s1', exercise_name=exercise_name, weight=weight, reps=reps,
+                      set_number=1, timestamp=timestamp, user_id='u1')
+
+def test_wib_day_boundary():
+    """Buckets follow WIB days: 17:00 UTC is already the next day"""
+    assert bucket_start(datetime(2026, 1, 9, 16, 59), 'day') == datetime(2026, 1, 8, 17)
+    assert bucket_start(datetime(2026, 1, 9, 17, 0), 'day') == datetime(2026, 1, 9, 17)
+    assert bucket_label(bucket_start(datetime(2026, 1, 9, 17, 0), 'day'), 'day') == '2026-01-10'
+    print("✅ WIB day boundary")
+
+def test_week_and_month():
+    """Weeks start Monday (WIB) and are labelled with the ISO week"""
+    # Sunday 2026-01-04 23:30 UTC is Monday 06:30 WIB
+    start = bucket_start(datetime(2026, 1, 4, 23, 30), 'week')
+    assert start == datetime(2026, 1, 4, 17)
+    assert bucket_label(start, 'week') == '2026-W02'
+
+    # Monday 2025-12-29 WIB belongs to ISO week 1 of 2026
+    start = bucket_start(datetime(2025, 12, 28, 18), 'week')
+    assert start == datetime(2025, 12, 28, 17)
+    assert bucket_label(start, 'week') == '2026-W01'
+
+    start = bucket_start(datetime(2026, 1, 31, 18), 'month')
+    assert start == datetime(2026, 1, 31, 17)
+    assert bucket_label(start, 'month') == '2026-02'
+    print("✅ Weeks and months")
+
+def test_set_increments():
+    """Every set lands in each period at the total, muscle group and exercise level"""
+    sets = [
+        workout_set('Bench Press', 60, 8, datetime(2026, 1, 10, 1)),
+        workout_set('Incline Bench Press', 40, 10, datetime(2026, 1, 10, 1, 10)),
+        workout_set('Lunge', 20, 12, datetime(2026, 1, 10, 1, 20)),
+    ]
+    increments = set_increments(sets, MUSCLE_GROUPS)
+    day = bucket_start(sets[0].timestamp, 'day')
+    assert increments[('u1', 'day', 'total', day, None, None)] == {'sets': 3, 'reps': 30, 'volume': 1120}
+    assert increments[('u1', 'day', 'muscle_group', day, 'Chest', None)] == {'sets': 2, 'reps': 18, 'volume': 880}
+    assert ('u1', 'day', 'muscle_group', day, 'Other', None) in increments
+    assert len(increments) == 3 * (1 + 2 + 3)
+
+    sets[0].user_id = None
+    assert set_increments(sets[:1], MUSCLE_GROUPS) == {}
+    print("✅ Set increments")
+
+def test_session_increments():
+    """A session counts once per bucket, however many exercises it touched"""
+    session = {
+        'user_id': 'u1',
+        'started_at': datetime(2026, 1, 10, 1),
+        'exercises_performed': [{'exercise': 'Bench Press'}, {'exercise': 'Incline Bench Press'}, {'exercise': 'Squat'}]
+    }
+    increments = session_increments([session], MUSCLE_GROUPS)
+    week = bucket_start(session['started_at'], 'week')
+    assert increments[('u1', 'week', 'total', week, None, None)] == {'sessions': 1}
+    assert increments[('u1', 'week', 'muscle_group', week, 'Chest', None)] == {'sessions': 1}
+    assert increments[('u1', 'week', 'exercise', week, 'Quads', 'Squat')] == {'sessions': 1}
+    print("✅ Session increments")
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("🧪 ROLLUP TESTS")
+    print("=" * 60)
+
+    test_wib_day_boundary()
+    test_week_and_month()
+    test_set_increments()
+    test_session_increments()
+
+    print("\n" + "=" * 60)
+    print("✅ All tests completed!")
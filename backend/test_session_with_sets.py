@@ -50,6 +50,7 @@ def test_complete_session_flow():
                 f"{API_URL}/workout-sets/log",
                 json={
                     "session_id": session_id,
+                    "user_id": "test_user",
                     "exercise_name": exercise['name'],
                     **set_data
                 }
@@ -74,7 +75,7 @@ def test_complete_session_flow():
     
     # 4. Get workout sets for session
     print("\n4️⃣ Getting workout sets...")
-    response = requests.get(f"{API_URL}/sessions/{session_id}/workout-sets")
+    response = requests.get(f"{API_URL}/sessions/{session_id}/workout-sets?user_id=test_user")
     workout_sets = response.json()
     print(f"  ✅ Found {len(workout_sets)} workout sets")
     
@@ -0,0 +1,66 @@
+"""
+Test the token claims and user caches (no server or database needed)
+"""
+from services.token_cache import ExpiringCache, TokenClaimsCache
+import time
+
+def test_expiry():
+    """Entries are dropped once their absolute expiry has passed"""
+    cache = ExpiringCache(4)
+    cache.set('a', 1, time.time() + 0.05)
+    assert cache.get('a') == 1
+    time.sleep(0.1)
+    assert cache.get('a') is None and len(cache) == 0
+
+    # Already expired values are never stored
+    cache.set('b', 2, time.time() - 1)
+    assert cache.get('b') is None and len(cache) == 0
+    print("✅ Expiry")
+
+def test_lru_eviction():
+    """The least recently used entry is evicted first; size 0 disables the cache"""
+    later = time.time() + 60
+    cache = ExpiringCache(2)
+    cache.set('a', 1, later)
+    cache.set('b', 2, later)
+    cache.get('a')
+    cache.set('c', 3, later)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+
+    cache.discard('a')
+    assert cache.get('a') is None and len(cache) == 1
+
+    disabled = ExpiringCache(0)
+    disabled.set('a', 1, later)
+    assert disabled.get('a') is None
+    print("✅ LRU eviction")
+
+def test_claims_cache():
+    """Claims are keyed by a hash of the token and live until exp"""
+    cache = TokenClaimsCache(max_entries=8)
+    claims = {'user_id': 'u1', 'exp': time.time() + 60}
+    cache.put('header.payload.signature', claims)
+    assert cache.get('header.payload.signature') == claims
+    assert cache.get('other.token.value') is None
+    assert len(cache.make_key('header.payload.signature')) == 32
+
+    # Claims without exp are not cached
+    cache.put('no.exp.token', {'user_id': 'u2'})
+    assert cache.get('no.exp.token') is None
+
+    metrics = cache.metrics()
+    assert metrics['hits'] == 1 and metrics['misses'] == 2 and metrics['entries'] == 1
+    print("✅ Claims cache")
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("🧪 TOKEN CACHE TESTS")
+    print("=" * 60)
+
+    test_expiry()
+    test_lru_eviction()
+    test_claims_cache()
+
+    print("\n" + "=" * 60)
+    print("✅ All tests completed!")
@@ -22,6 +22,7 @@ def test_log_workout_set():
     # Log a workout set
     set_data = {
         "session_id": session_id,
+        "user_id": "test_user",
         "exercise_name": "Bench Press",
         "weight": 60,
         "reps": 10,
@@ -49,7 +50,7 @@ def test_get_session_sets(session_id):
     """Test getting all sets for a session"""
     print(f"\n📋 Testing get session sets for {session_id}...")
     
-    response = requests.get(f"{API_URL}/workout-sets/session/{session_id}")
+    response = requests.get(f"{API_URL}/workout-sets/session/{session_id}?user_id=test_user")
     
     print(f"Status: {response.status_code}")
     if response.status_code == 200:
@@ -68,7 +69,7 @@ def test_get_last_set(session_id):
     
     response = requests.get(
         f"{API_URL}/workout-sets/last-set",
-        params={"session_id": session_id, "exercise_name": "Bench Press"}
+        params={"session_id": session_id, "exercise_name": "Bench Press", "user_id": "test_user"}
     )
     
     print(f"Status: {response.status_code}")
@@ -89,7 +90,7 @@ def test_count_sets(session_id):
     
     response = requests.get(
         f"{API_URL}/workout-sets/count",
-        params={"session_id": session_id, "exercise_name": "Bench Press"}
+        params={"session_id": session_id, "exercise_name": "Bench Press", "user_id": "test_user"}
     )
     
     print(f"Status: {response.status_code}")
@@ -116,6 +117,7 @@ def test_multiple_sets(session_id):
             f"{API_URL}/workout-sets/log",
             json={
                 "session_id": session_id,
+                "user_id": "test_user",
                 "exercise_name": "Bench Press",
                 **set_data
             }
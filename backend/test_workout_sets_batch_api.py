@@ -0,0 +1,108 @@
+"""
+Test batch workout set logging (offline sync)
+"""
+import requests
+import uuid
+
+API_URL = "http://192.168.1.4:8080/api"
+
+def start_session():
+    """Start a session for the batch tests"""
+    response = requests.post(
+        f"{API_URL}/sessions/start",
+        json={"user_id": "test_user", "session_type": "Push"}
+    )
+    session = response.json()
+    print(f"✅ Started session: {session['_id']}")
+    return session['_id']
+
+def build_batch(session_id):
+    """Build a queued batch like the app would replay after reconnecting"""
+    return {
+        "user_id": "test_user",
+        "sets": [
+            {
+                "session_id": session_id,
+                "exercise_name": "Bench Press",
+                "weight": 60 + i * 2.5,
+                "reps": 8,
+                "rpe": 7,
+                "timestamp": f"2026-01-01T10:0{i}:00+07:00",
+                "idempotency_key": str(uuid.uuid4())
+            }
+            for i in range(5)
+        ] + [
+            # Invalid item: reported per item, the rest still goes through
+            {"session_id": session_id, "exercise_name": "Bench Press", "reps": 8}
+        ]
+    }
+
+def test_batch_log(session_id, batch):
+    """Test logging a batch of sets"""
+    print("\n📦 Testing batch log...")
+
+    response = requests.post(f"{API_URL}/workout-sets/batch", json=batch)
+
+    print(f"Status: {response.status_code}")
+    if response.status_code == 200:
+        data = response.json()
+        print(f"✅ Created: {data['created']}, Duplicates: {data['duplicates']}, Failed: {data['failed']}")
+        for result in data['results']:
+            if result['status'] == 'created':
+                s = result['set']
+                print(f"  - [{result['index']}] Set {s['set_number']}: {s['weight']}kg x {s['reps']}")
+            else:
+                print(f"  - [{result['index']}] {result['status']}: {result.get('error', '')}")
+        return data['created'] == 5 and data['failed'] == 1
+    else:
+        print(f"❌ Error: {response.text}")
+        return False
+
+def test_batch_retry(batch):
+    """Test that replaying the same batch does not insert twice"""
+    print("\n🔁 Testing batch retry (idempotency)...")
+
+    response = requests.post(f"{API_URL}/workout-sets/batch", json=batch)
+
+    print(f"Status: {response.status_code}")
+    if response.status_code == 200:
+        data = response.json()
+        print(f"✅ Created: {data['created']}, Duplicates: {data['duplicates']}")
+        return data['created'] == 0 and data['duplicates'] == 5
+    else:
+        print(f"❌ Error: {response.text}")
+        return False
+
+def test_session_totals():
+    """Test that session totals count each set once"""
+    print("\n📈 Testing session totals...")
+
+    response = requests.get(f"{API_URL}/sessions/active?user_id=test_user")
+
+    if response.status_code == 200:
+        session = response.json()['session']
+        print(f"✅ Total sets: {session['total_sets']}, Total volume: {session['total_volume']} kg")
+        return session['total_sets'] == 5
+
+    print(f"❌ Error: {response.text}")
+    return False
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("🧪 WORKOUT SET BATCH API TESTS")
+    print("=" * 60)
+
+    session_id = start_session()
+    batch = build_batch(session_id)
+
+    test_batch_log(session_id, batch)
+    test_batch_retry(batch)
+    test_session_totals()
+
+    # Clean up - end session
+    print("\n🏁 Ending session...")
+    requests.post(f"{API_URL}/sessions/end", json={"user_id": "test_user"})
+    print("✅ Session ended")
+
+    print("\n" + "=" * 60)
+    print("✅ All tests completed!")
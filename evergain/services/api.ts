@@ -1,4 +1,5 @@
 import { Platform } from 'react-native';
+import { getToken } from './authService';
 
 // API URL Configuration - Must match authService.ts
 // IMPORTANT: Update LOCAL_IP if your computer's IP changes
@@ -36,8 +37,20 @@ export interface WorkoutResponse {
     advice: string;
     color: string;
     created_at: string;
+    analysis_url?: string;
 }
 
+export interface AnalysisResponse {
+    status: 'pending' | 'complete';
+    workout: WorkoutResponse;
+}
+
+// Workout endpoints are scoped to the logged-in user (JWT)
+const authHeaders = async (): Promise<Record<string, string>> => {
+    const token = await getToken();
+    return token ? { 'Authorization': `Bearer ${token}` } : {};
+};
+
 export const WorkoutAPI = {
     submitWorkout: async (workout: WorkoutInput): Promise<WorkoutResponse> => {
         try {
@@ -45,6 +58,7 @@ export const WorkoutAPI = {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
+                    ...(await authHeaders()),
                 },
                 body: JSON.stringify(workout),
             });
@@ -60,9 +74,28 @@ export const WorkoutAPI = {
         }
     },
 
+    // AI analysis runs in the background: submitWorkout returns with
+    // progress_state 'pending', then long-poll here until it is complete.
+    getAnalysis: async (workoutId: string | number, waitSeconds: number = 20): Promise<AnalysisResponse> => {
+        try {
+            const response = await fetch(`${BASE_URL}/${workoutId}/analysis?wait=${waitSeconds}`, {
+                headers: await authHeaders(),
+            });
+            if (!response.ok) {
+                throw new Error('Failed to fetch analysis');
+            }
+            return await response.json();
+        } catch (error) {
+            console.error("API Error:", error);
+            throw error;
+        }
+    },
+
     getHistory: async (): Promise<WorkoutResponse[]> => {
         try {
-            const response = await fetch(BASE_URL + '/');
+            const response = await fetch(BASE_URL + '/', {
+                headers: await authHeaders(),
+            });
             if (!response.ok) {
                 throw new Error('Failed to fetch history');
             }